@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Porovnání hledání shodných obrázků: smyčka přes `ImageHash` vs. `HashIndex`
+
+Spuštění: `python3 src/bench_hash_index.py [velikost dávky]`
+"""
+import sys
+from time import perf_counter
+
+import numpy as np
+from imagehash import ImageHash
+
+from hash_index import HashIndex
+
+STORED_SIZES = (10_000, 100_000)
+THRESHOLD = 5
+LOOP_SAMPLE = 2_000
+"""Smyčka v Pythonu se měří jen na části uložených hashů a výsledek se přepočítá"""
+
+
+def random_hashes(rng: np.random.Generator, count: int, kinds: int) -> np.ndarray:
+    return rng.integers(0, 2**64, size=(count, kinds), dtype=np.uint64)
+
+
+def to_image_hash(value: np.uint64) -> ImageHash:
+    bits = np.unpackbits(np.array([value], dtype=">u8").view(np.uint8))
+    return ImageHash(bits.reshape(8, 8).astype(bool))
+
+
+def bench_loop(stored: np.ndarray, batch: np.ndarray) -> float:
+    sample = [to_image_hash(v) for v in stored[:LOOP_SAMPLE, 0]]
+    new = [to_image_hash(v) for v in batch[:, 0]]
+
+    start = perf_counter()
+    for photo_hash in new:
+        for existing_hash in sample:
+            existing_hash - photo_hash < THRESHOLD
+    elapsed = perf_counter() - start
+
+    return elapsed * len(stored) / len(sample)
+
+
+def bench_index(stored: np.ndarray, batch: np.ndarray, repeat: int = 5) -> float:
+    index = HashIndex(stored.shape[1])
+    index.add(stored)
+
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        index.match(batch, THRESHOLD)
+        best = min(best, perf_counter() - start)
+
+    return best
+
+
+if __name__ == "__main__":
+    batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rng = np.random.default_rng(42)
+
+    print(f"batch of {batch_size} new hashes, threshold {THRESHOLD}")
+    print(f"{'stored':>8} {'kinds':>6} {'loop [ms]':>12} {'index [ms]':>12} {'speedup':>9}")
+
+    for stored_size in STORED_SIZES:
+        for kinds in (1, 3):
+            stored = random_hashes(rng, stored_size, kinds)
+            batch = random_hashes(rng, batch_size, kinds)
+
+            # Smyčka porovnává jen jeden druh hashe, stejně jako původní deduplikace
+            loop_time = bench_loop(stored, batch) if kinds == 1 else None
+            index_time = bench_index(stored, batch)
+
+            loop_text = f"{loop_time * 1000:>12.1f}" if loop_time else f"{'-':>12}"
+            speedup = f"{loop_time / index_time:>8.0f}x" if loop_time else f"{'-':>9}"
+            print(f"{stored_size:>8} {kinds:>6} {loop_text} {index_time * 1000:>12.2f} {speedup}")
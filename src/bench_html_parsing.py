@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""Odezva event loopu při zpracování velké HTML stránky v jednotlivých režimech `PARSE_EXECUTOR`
+
+Stránka napodobuje výpis BRAVIS se zadaným počtem nabídek. Během zpracování běží v loopu
+heartbeat a měří se největší zpoždění, které by pocítil např. heartbeat Discord gateway.
+
+Spuštění: `python3 src/bench_html_parsing.py [počet nabídek]`
+"""
+import asyncio
+import sys
+from time import perf_counter
+
+from config import config
+from disposition import Disposition
+from scrapers.scraper_bravis import ScraperBravis
+
+ITEM_HTML = """
+<div class="item"><a href="/pronajem-bytu/{i}">
+  <picture><img src="/img/{i}.jpg"></picture>
+  <ul class="params"><li>bytu 2+kk</li><li>{area} m²</li></ul>
+  <div class="location">Brno - Královo Pole, ulice {i}</div>
+  <div class="price">{price} Kč <small>+ poplatky</small></div>
+</a></div>
+"""
+
+
+def build_page(count: int) -> str:
+    items = "".join(
+        ITEM_HTML.format(i=i, area=40 + i % 50, price=12000 + i % 9000) for i in range(count)
+    )
+    return f'<html><body><div id="search"><div class="in"><content><div class="itemslist">{items}</div></content></div></div></body></html>'
+
+
+async def measure(scraper: ScraperBravis, html: str) -> tuple[float, float, int]:
+    max_lag = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal max_lag
+        while not done:
+            expected = perf_counter() + 0.005
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, perf_counter() - expected)
+
+    heartbeat_task = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0.01)
+
+    start = perf_counter()
+    offers = await scraper.parse_offers(html)
+    elapsed = perf_counter() - start
+
+    done = True
+    await heartbeat_task
+
+    return elapsed, max_lag, len(offers)
+
+
+async def main(count: int):
+    scraper = ScraperBravis(Disposition.FLAT_2KK)
+    html = build_page(count)
+
+    print(f"page with {count} offers, {len(html) / 1024:.0f} KiB")
+    print(f"{'executor':>9} {'parse [ms]':>11} {'max lag [ms]':>13} {'offers':>7}")
+
+    for executor in ("inline", "thread", "process"):
+        config.parse_executor = executor
+        # První zpracování v procesu zahrnuje i start procesu a import modulů
+        await scraper.parse_offers(html)
+
+        elapsed, max_lag, offers = await measure(scraper, html)
+        print(f"{executor:>9} {elapsed * 1000:>11.0f} {max_lag * 1000:>13.1f} {offers:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000))
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Měří čas startu a paměť podle zapnutých scraperů a deduplikace
+
+Každý scénář běží v samostatném procesu, aby se neovlivňovaly načtené moduly.
+Spouštět z kořene repozitáře (kvůli `.env` souborům): `python3 src/bench_imports.py`
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SCENARIOS = {
+    "all scrapers, dedup": {"SCRAPERS": "all", "IMAGE_DEDUPLICATION": "1"},
+    "all scrapers, no dedup": {"SCRAPERS": "all", "IMAGE_DEDUPLICATION": "0"},
+    "API scrapers, no dedup": {
+        "SCRAPERS": "sreality,realingo,bezrealitky,ulov_domov",
+        "IMAGE_DEDUPLICATION": "0",
+    },
+    "sreality only, no dedup": {"SCRAPERS": "sreality", "IMAGE_DEDUPLICATION": "0"},
+}
+
+CHILD_CODE = """
+import json, resource, sys, time
+start = time.perf_counter()
+from config import config
+import pipeline, scrapers_manager
+scrapers = scrapers_manager.create_scrapers(config.dispositions)
+if config.image_deduplication:
+    import imagehash, PIL.Image
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": len(sys.modules),
+    "scrapers": len(scrapers),
+}))
+"""
+
+
+def run_scenario(env_overrides: dict[str, str], repeat: int) -> dict:
+    env = dict(os.environ, **env_overrides)
+    env["PYTHONPATH"] = str(Path(__file__).parent)
+    runs = []
+
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD_CODE],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        runs.append(json.loads(output))
+
+    best = min(runs, key=lambda r: r["seconds"])
+    return best
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f"{'scenario':<28} {'import [ms]':>12} {'max RSS [MB]':>13} {'modules':>8}")
+    for name, env_overrides in SCENARIOS.items():
+        result = run_scenario(env_overrides, repeat)
+        print(
+            f"{name:<28} {result['seconds'] * 1000:>12.1f} "
+            f"{result['max_rss_kb'] / 1024:>13.1f} {result['modules']:>8}"
+        )
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Porovnání dekódování JSON odpovědí: knihovny a postupné procházení pole nabídek
+
+Bez argumentů se měří na vygenerované odpovědi ve tvaru Realinga (300 nabídek),
+jinak na uložené odpovědi serveru (tělo odpovědi v souboru) a zadané cestě k poli.
+
+Spuštění: `python3 src/bench_json_decoding.py [soubor klíč1.klíč2...]`
+"""
+import json
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+
+import json_decoding
+from config import config
+
+REPEAT = 20
+
+
+def build_realingo_response(count: int) -> bytes:
+    rng = random.Random(42)
+    items = [
+        {
+            "id": str(10_000_000 + i),
+            "adId": f"ad-{i}",
+            "category": "FLAT2_KK",
+            "url": f"/pronajem/byt-2+kk-brno/{10_000_000 + i}",
+            "property": "FLAT",
+            "purpose": "RENT",
+            "location": {
+                "address": f"Ulice {i}, Brno - Královo Pole",
+                "latitude": 49.2 + rng.random() / 10,
+                "longitude": 16.6 + rng.random() / 10,
+            },
+            "price": {"total": rng.randint(9_000, 30_000), "currency": "CZK", "vat": None},
+            "area": {"main": rng.randint(30, 90), "plot": None, "garden": None},
+            "photos": {"main": f"{i:08x}.jpg", "list": [f"{i:08x}-{p}.jpg" for p in range(12)]},
+            "description": "Pronájem světlého bytu po rekonstrukci. " * 15,
+            "createdAt": "2024-01-01T12:00:00Z",
+        }
+        for i in range(count)
+    ]
+    return json.dumps({"data": {"searchOffer": {"total": count, "items": items}}}).encode()
+
+
+def bench(body: bytes, path: tuple[str, ...], decoder: str, streaming: bool) -> tuple[float, float]:
+    config.json_decoder = decoder
+    config.json_streaming = streaming
+
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = perf_counter()
+        for _ in json_decoding.iter_items(body, path):
+            pass
+        best = min(best, perf_counter() - start)
+
+    tracemalloc.start()
+    for _ in json_decoding.iter_items(body, path):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return best, peak
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        body = Path(sys.argv[1]).read_bytes()
+        path = tuple(sys.argv[2].split("."))
+    else:
+        body = build_realingo_response(300)
+        path = ("data", "searchOffer", "items")
+
+    print(f"response {len(body) / 1024:.0f} KiB, array {'.'.join(path)}")
+    print(f"{'decoder':>8} {'streaming':>10} {'time [ms]':>10} {'peak [KiB]':>11}")
+
+    for decoder in json_decoding.BACKENDS:
+        for streaming in (False, True):
+            if streaming and decoder != "json":
+                continue  # Postupné procházení vždy používá standardní `json`
+            try:
+                elapsed, peak = bench(body, path, decoder, streaming)
+            except ImportError:
+                print(f"{decoder:>8} {'-':>10} {'not installed':>22}")
+                continue
+            print(f"{decoder:>8} {str(streaming):>10} {elapsed * 1000:>10.2f} {peak / 1024:>11.0f}")
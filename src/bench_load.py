@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Zátěžový test celého kola proti lokálnímu náhradnímu serveru (`synthetic_portal.py`)
+
+Spustí náhradní server v samostatném procesu, přesměruje na něj všechny scrapery
+a provede zadaný počet kol. Pro každou fázi kola vypíše medián a 99. percentil doby
+trvání, propustnost (nabídek za sekundu) a nejvyšší RSS procesu po dané fázi.
+
+Spuštění: `python3 src/bench_load.py [--cycles 5] [--volume 200] [--duplicate-rate 0.1] ...`
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import resource
+import socket
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from time import perf_counter
+
+from config import config
+from http_client import HostOverrideTransport, get_http_client
+from synthetic_portal import add_options_arguments, options_from_args, serve
+
+STAGES = ("fetch", "storage", "filter", "deduplicate", "snapshot", "delivery")
+
+
+class StageStats:
+    def __init__(self):
+        self.durations: dict[str, list[float]] = {stage: [] for stage in STAGES}
+        self.items: dict[str, int] = {stage: 0 for stage in STAGES}
+        self.peak_rss: dict[str, float] = {stage: 0 for stage in STAGES}
+
+    @contextmanager
+    def measure(self, stage: str, items: int):
+        start = perf_counter()
+        yield
+        self.durations[stage].append(perf_counter() - start)
+        self.items[stage] += items
+        self.peak_rss[stage] = max(self.peak_rss[stage], peak_rss_mib())
+
+    def report(self):
+        print(f"{'stage':>12} {'p50 [ms]':>9} {'p99 [ms]':>9} {'offers/s':>10} {'peak RSS [MiB]':>15}")
+        for stage in STAGES:
+            durations = sorted(self.durations[stage])
+            total = sum(durations)
+            throughput = self.items[stage] / total if total else 0
+            print(
+                f"{stage:>12} {percentile(durations, 50) * 1000:>9.1f} "
+                f"{percentile(durations, 99) * 1000:>9.1f} {throughput:>10.0f} "
+                f"{self.peak_rss[stage]:>15.1f}"
+            )
+
+
+def percentile(values: list[float], percent: float) -> float:
+    if not values:
+        return 0
+    index = min(len(values) - 1, max(0, round(percent / 100 * len(values) + 0.5) - 1))
+    return values[index]
+
+
+def peak_rss_mib() -> float:
+    # Linux vrací KiB, macOS bajty
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(base_url: str, timeout: float = 20):
+    client = get_http_client()
+    deadline = perf_counter() + timeout
+    while True:
+        try:
+            await client.transport.inner.send("POST", f"{base_url}/_control/cycle?n=0", None, None, None)
+            return
+        except OSError:
+            if perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.2)
+
+
+def build_embeds(offers: list) -> int:
+    """Sestaví Discord embedy po dávkách stejně jako bot, bez odeslání"""
+    from embeds import build_embed, chunk_offers
+
+    batches = 0
+    for batch in chunk_offers(offers, config.embed_batch_size):
+        for offer in batch:
+            build_embed(offer)
+        batches += 1
+    return batches
+
+
+async def run(cycles: int, base_url: str, data_dir: Path) -> StageStats:
+    from offers_storage import OffersStorage
+    from scrapers_manager import create_scrapers, fetch_latest_offers
+    from snapshot import save_cycle_state
+    from transformations import deduplicate_offers, filter_offers
+
+    client = get_http_client()
+    client.transport = HostOverrideTransport(client.transport, base_url)
+    await wait_for_server(base_url)
+
+    scrapers = create_scrapers(config.dispositions)
+    storage = OffersStorage(str(data_dir / "found_offers.txt"))
+    stats = StageStats()
+
+    for cycle in range(cycles):
+        await client.transport.inner.send(
+            "POST", f"{base_url}/_control/cycle?n={cycle}", None, None, None
+        )
+        start = perf_counter()
+
+        with stats.measure("fetch", 0):
+            offers = await fetch_latest_offers(scrapers)
+        stats.items["fetch"] += len(offers)
+
+        with stats.measure("storage", len(offers)):
+            new_offers = [o for o in offers if not storage.contains(o)]
+            storage.save_offers(new_offers)
+
+        with stats.measure("filter", len(new_offers)):
+            filtered = filter_offers(new_offers)
+
+        with stats.measure("deduplicate", len(filtered)):
+            deduplicated = await deduplicate_offers(filtered)
+
+        with stats.measure("snapshot", len(offers)):
+            save_cycle_state(storage, offers)
+
+        with stats.measure("delivery", len(deduplicated)):
+            batches = build_embeds(deduplicated)
+
+        print(
+            f"cycle {cycle}: {len(offers)} fetched, {len(new_offers)} new, "
+            f"{len(deduplicated)} after deduplication in {batches} messages, "
+            f"{(perf_counter() - start) * 1000:.0f} ms",
+            file=sys.stderr,
+        )
+
+    await client.close()
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=5)
+    add_options_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    port = free_port()
+    server = multiprocessing.get_context("spawn").Process(
+        target=serve, args=(port, options_from_args(args)), daemon=True
+    )
+    server.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            config.scrapers = None
+            config.capture_responses = False
+            config.host_rate_limit = 0
+            config.detail_enrichment = False
+            config.snapshot_dir = Path(data_dir) / "state"
+            config.geocode_cache_file = Path(data_dir) / "geocode_cache.sqlite"
+
+            stats = asyncio.run(run(args.cycles, f"http://127.0.0.1:{port}", Path(data_dir)))
+
+        print(f"{args.cycles} cycles, {args.volume} offers per portal")
+        stats.report()
+    finally:
+        server.terminate()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Porovnání transportů HTTP klienta na stažení nabídek a jejich obrázků
+
+Pro každou variantu (HTTP/1.1 bez komprese, s gzip, brotli, zstd a HTTP/2 přes httpx,
+pokud jsou knihovny nainstalované) stáhne všechny servery a obrázky nalezených nabídek
+a vypíše počet požadavků, přenesená data, data po dekompresi a dobu trvání. Úspora se
+počítá vůči HTTP/1.1 bez komprese.
+
+Výchozí cíl je lokální náhradní server (`synthetic_portal.py`), který umí jen HTTP/1.1
+bez TLS, takže ukáže úsporu komprese. Přínos HTTP/2 (jedno TLS spojení na CDN obrázků
+místo mnoha) je vidět jen proti skutečným serverům s `--live`.
+
+Spuštění: `python3 src/bench_transport.py [--rounds 3] [--live] [--volume 200] ...`
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import sys
+import tempfile
+from collections.abc import Callable
+from pathlib import Path
+from time import perf_counter
+
+from bench_load import free_port, percentile, wait_for_server
+from config import config
+from http_client import (
+    USER_AGENT,
+    AiohttpTransport,
+    HostOverrideTransport,
+    HttpxTransport,
+    Transport,
+    accept_encoding,
+    get_http_client,
+)
+from synthetic_portal import add_options_arguments, options_from_args, serve
+
+
+def transport_variants() -> dict[str, Callable[[], Transport]]:
+    """Varianty dostupné v tomto prostředí"""
+    headers = {"User-Agent": USER_AGENT}
+    available = accept_encoding().split(", ")
+
+    variants: dict[str, Callable[[], Transport]] = {
+        "http1 identity": lambda: AiohttpTransport(headers, "identity"),
+        "http1 gzip": lambda: AiohttpTransport(headers, "gzip, deflate"),
+    }
+    for encoding in ("br", "zstd"):
+        if encoding in available:
+            variants[f"http1 {encoding}"] = lambda e=encoding: AiohttpTransport(headers, e)
+
+    try:
+        HttpxTransport(headers)
+        variants["http2 " + available[0]] = lambda: HttpxTransport(headers)
+    except ImportError:
+        print("httpx[http2] is not installed, skipping HTTP/2", file=sys.stderr)
+
+    return variants
+
+
+async def fetch_round(scrapers: list) -> int:
+    """Stáhne všechny servery a obrázky nabídek, vrátí počet nabídek"""
+    from scrapers_manager import fetch_latest_offers
+
+    offers = await fetch_latest_offers(scrapers)
+    client = get_http_client()
+    await asyncio.gather(*[client.get(o.image_url) for o in offers if o.image_url])
+    return len(offers)
+
+
+async def run(rounds: int, base_url: str | None) -> list[tuple[str, dict]]:
+    from scrapers_manager import create_scrapers
+
+    client = get_http_client()
+    if base_url:
+        client.transport = HostOverrideTransport(client.transport, base_url)
+        await wait_for_server(base_url)
+        await client.transport.close()
+
+    scrapers = create_scrapers(config.dispositions)
+    results = []
+
+    for name, create in transport_variants().items():
+        transport = create()
+        client.transport = (
+            HostOverrideTransport(transport, base_url) if base_url else transport
+        )
+        durations = []
+        offers = 0
+
+        # První kolo naváže spojení a naplní mezipaměti, neměří se
+        await fetch_round(scrapers)
+        client.stats.reset()
+
+        for _ in range(rounds):
+            start = perf_counter()
+            offers = await fetch_round(scrapers)
+            durations.append(perf_counter() - start)
+
+        await client.transport.close()
+        results.append((name, {
+            "offers": offers,
+            "requests": client.stats.requests / rounds,
+            "transferred": client.stats.bytes_transferred / rounds,
+            "received": client.stats.bytes_received / rounds,
+            "p50": percentile(sorted(durations), 50),
+        }))
+        print(f"{name}: done", file=sys.stderr)
+
+    return results
+
+
+def report(results: list[tuple[str, dict]]):
+    baseline = results[0][1]
+    print(
+        f"{'transport':>16} {'requests':>9} {'wire [KiB]':>11} {'decoded [KiB]':>14} "
+        f"{'saved':>6} {'p50 [ms]':>9} {'saved':>6}"
+    )
+    for name, r in results:
+        bytes_saved = 1 - r["transferred"] / baseline["transferred"]
+        time_saved = 1 - r["p50"] / baseline["p50"]
+        print(
+            f"{name:>16} {r['requests']:>9.0f} {r['transferred'] / 1024:>11.1f} "
+            f"{r['received'] / 1024:>14.1f} {bytes_saved:>6.0%} {r['p50'] * 1000:>9.1f} "
+            f"{time_saved:>6.0%}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--live", action="store_true", help="fetch the real portals")
+    add_options_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    server = None
+    base_url = None
+    if not args.live:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = multiprocessing.get_context("spawn").Process(
+            target=serve, args=(port, options_from_args(args)), daemon=True
+        )
+        server.start()
+
+    try:
+        with tempfile.TemporaryDirectory() as data_dir:
+            config.scrapers = None
+            config.capture_responses = False
+            config.host_rate_limit = 0
+            config.snapshot_dir = Path(data_dir) / "state"
+            results = asyncio.run(run(args.rounds, base_url))
+
+        print(f"{args.rounds} rounds, {results[0][1]['offers']} offers per round")
+        report(results)
+    finally:
+        if server is not None:
+            server.terminate()
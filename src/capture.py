@@ -0,0 +1,266 @@
+"""Záznam a přehrání odpovědí serverů
+
+Při zapnutém `config.capture_responses` se každé kolo stahování uloží do jednoho
+komprimovaného archivu (JSON řádky, gzip nebo zstd) ve složce `captures`. Seznam archivů
+s přehledem zaznamenaných požadavků je v `index.jsonl`, nejstarší archivy se mažou.
+
+Archiv lze přehrát skriptem `replay.py`, který stejné odpovědi podstrčí scraperům bez
+přístupu k síti.
+"""
+import base64
+import dataclasses
+import gzip
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import IO, Any
+
+from config import config, data_path
+from http_client import HttpResponse, Transport, normalize_url
+from query_filter import QueryFilter
+
+ARCHIVE_SUFFIXES = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+INDEX_FILE = "index.jsonl"
+
+
+def request_key(method: str, url: str, data: bytes | None) -> str:
+    body_hash = hashlib.sha1(data).hexdigest() if data else ""
+    return f"{method} {normalize_url(url)} {body_hash}"
+
+
+def _open_archive(path: Path, mode: str) -> IO[bytes]:
+    if path.name.endswith(ARCHIVE_SUFFIXES["zstd"]):
+        # zstandard je volitelná závislost, potřeba jen při CAPTURE_COMPRESSION=zstd
+        import zstandard
+
+        return zstandard.open(path, mode)
+
+    return gzip.open(path, mode)
+
+
+def _encode_bytes(data: bytes | None) -> str | None:
+    return base64.b64encode(data).decode() if data is not None else None
+
+
+def _decode_bytes(data: str | None) -> bytes | None:
+    return base64.b64decode(data) if data is not None else None
+
+
+@dataclass
+class CapturedExchange:
+    """Zaznamenaný požadavek a odpověď serveru"""
+
+    scraper: str | None
+    method: str
+    url: str
+    request_body: bytes | None
+    response: HttpResponse
+    elapsed_ms: float = 0
+
+    @property
+    def key(self) -> str:
+        return request_key(self.method, self.url, self.request_body)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "scraper": self.scraper,
+            "method": self.method,
+            "url": self.url,
+            "request_body": _encode_bytes(self.request_body),
+            "status": self.response.status,
+            "response_url": self.response.url,
+            "headers": self.response.headers,
+            "body": _encode_bytes(self.response.body),
+            "encoding": self.response.encoding,
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CapturedExchange":
+        return cls(
+            scraper=data["scraper"],
+            method=data["method"],
+            url=data["url"],
+            request_body=_decode_bytes(data["request_body"]),
+            response=HttpResponse(
+                status=data["status"],
+                url=data["response_url"],
+                headers=data["headers"],
+                body=_decode_bytes(data["body"]),
+                encoding=data["encoding"],
+            ),
+            elapsed_ms=data["elapsed_ms"],
+        )
+
+
+def query_filter_to_dict(query_filter: QueryFilter) -> dict[str, Any]:
+    data = dataclasses.asdict(query_filter)
+    data["dispositions"] = query_filter.dispositions.value
+    return data
+
+
+@dataclass
+class CaptureArchive:
+    """Archiv jednoho kola stahování, otevřený pro zápis"""
+
+    store: "CaptureStore"
+    path: Path
+    query_filter: dict[str, Any]
+    started_at: str
+    entries: list[dict[str, Any]] = field(default_factory=list)
+
+    def __post_init__(self):
+        self._file = _open_archive(self.path, "wb")
+        self._write({"query_filter": self.query_filter, "started_at": self.started_at})
+
+    def _write(self, record: dict[str, Any]):
+        self._file.write(json.dumps(record).encode() + b"\n")
+
+    def add(self, exchange: CapturedExchange):
+        self._write(exchange.to_dict())
+        self.entries.append({
+            "scraper": exchange.scraper,
+            "method": exchange.method,
+            "url": exchange.url,
+            "status": exchange.response.status,
+            "bytes": len(exchange.response.body),
+        })
+
+    def close(self):
+        self._file.close()
+        self.store._add_to_index({
+            "file": self.path.name,
+            "started_at": self.started_at,
+            "query_filter": self.query_filter,
+            "exchanges": self.entries,
+            "bytes": self.path.stat().st_size,
+        })
+
+
+class CaptureStore:
+    """Složka s archivy zaznamenaných odpovědí a jejich indexem"""
+
+    def __init__(self, directory: Path, max_archives: int = 50, compression: str = "gzip"):
+        self.directory = directory
+        self.max_archives = max_archives
+        self.compression = compression
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_FILE
+
+    def archives(self) -> list[dict[str, Any]]:
+        """Záznamy indexu od nejstaršího archivu"""
+        if not self.index_path.exists():
+            return []
+
+        with open(self.index_path) as index_file:
+            return [json.loads(line) for line in index_file if line.strip()]
+
+    def start_cycle(self, query_filter: QueryFilter) -> CaptureArchive:
+        started_at = datetime.now()
+        name = f"cycle-{started_at:%Y%m%d-%H%M%S-%f}{ARCHIVE_SUFFIXES[self.compression]}"
+
+        return CaptureArchive(
+            self, self.directory / name, query_filter_to_dict(query_filter), started_at.isoformat()
+        )
+
+    def _add_to_index(self, entry: dict[str, Any]):
+        archives = self.archives() + [entry]
+        removed, kept = archives[: -self.max_archives], archives[-self.max_archives :]
+
+        # Index se přepisuje atomicky, aby po pádu neukazoval na smazané archivy
+        temp_path = self.index_path.with_suffix(".tmp")
+        with open(temp_path, "w") as index_file:
+            for archive in kept:
+                index_file.write(json.dumps(archive) + "\n")
+        os.replace(temp_path, self.index_path)
+
+        for archive in removed:
+            (self.directory / archive["file"]).unlink(missing_ok=True)
+
+    def load(self, file_name: str) -> tuple[dict[str, Any], list[CapturedExchange]]:
+        """Načte archiv
+
+        Args:
+            file_name (str): Název souboru archivu ve složce
+
+        Returns:
+            tuple[dict[str, Any], list[CapturedExchange]]: Hlavička archivu a zaznamenané odpovědi
+        """
+        with _open_archive(self.directory / file_name, "rb") as archive_file:
+            header = json.loads(archive_file.readline())
+            exchanges = [CapturedExchange.from_dict(json.loads(line)) for line in archive_file]
+
+        return header, exchanges
+
+
+def get_capture_store() -> CaptureStore:
+    return CaptureStore(
+        config.capture_dir or data_path("captures"),
+        config.capture_max_archives,
+        config.capture_compression,
+    )
+
+
+class RecordingTransport(Transport):
+    """Odesílá požadavky přes jiný transport a odpovědi zapisuje do archivu"""
+
+    def __init__(self, inner: Transport, archive: CaptureArchive, scraper: str | None = None):
+        self.inner = inner
+        self.archive = archive
+        self.scraper = scraper
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> HttpResponse:
+        start = perf_counter()
+        response = await self.inner.send(method, url, data, headers, cookies)
+
+        self.archive.add(CapturedExchange(
+            self.scraper, method, url, data, response, (perf_counter() - start) * 1000
+        ))
+        return response
+
+    async def close(self):
+        # Sdílený transport zavírá jeho vlastník, archiv zavírá ten, kdo kolo zahájil
+        pass
+
+
+class ReplayMissError(LookupError):
+    """Požadavek, ke kterému v archivu není zaznamenaná odpověď"""
+
+
+class ReplayTransport(Transport):
+    """Vrací zaznamenané odpovědi místo přístupu k síti"""
+
+    def __init__(self, exchanges: list[CapturedExchange]):
+        self._responses: dict[str, list[HttpResponse]] = {}
+        for exchange in exchanges:
+            self._responses.setdefault(exchange.key, []).append(exchange.response)
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> HttpResponse:
+        responses = self._responses.get(request_key(method, url, data))
+        if not responses:
+            raise ReplayMissError(f"No captured response for {method} {normalize_url(url)}")
+
+        # Opakované požadavky dostávají odpovědi postupně, poslední zůstává pro další opakování
+        return responses.pop(0) if len(responses) > 1 else responses[0]
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Headless režim bez Discordu
+
+Stahuje nabídky stejně jako bot, ale výsledky posílá na standardní výstup (JSONL),
+do souboru, na webhook nebo přes Discord webhook (bez připojení ke gateway).
+Modul záměrně neimportuje `discord`.
+"""
+import argparse
+import asyncio
+import logging
+
+from config import config
+from config_watcher import SCRAPER_FIELDS, ConfigWatcher
+from digest import create_digest_sender
+from distributed import create_coordinator, get_queue_path, run_worker
+from http_client import get_http_client
+from loop_monitor import start_loop_monitor
+from profiling import install_signal_handler
+from offers_storage import OffersStorage
+from outbox import Outbox, OutboxSender
+from pipeline import get_outbox_path, get_refresh_interval, run_cycle
+from scrapers_manager import create_scrapers
+from snapshot import warm_start
+from sinks import OfferSink, create_sink, sink_target
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="run a single fetch cycle and exit",
+    )
+    parser.add_argument(
+        "--sink",
+        action="append",
+        metavar="SPEC",
+        help=(
+            "where to send new offers: stdout, file:PATH, webhook:URL or discord:WEBHOOK_URL "
+            "(repeatable, default DISCORD_WEBHOOK_URL if set, otherwise stdout)"
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="spread scraping and image hashing over N local worker processes",
+    )
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help="only consume jobs from the shared work queue (for additional worker nodes)",
+    )
+    return parser.parse_args()
+
+
+async def notify_cycle_finished(sinks: dict[str, OfferSink]):
+    for target, sink in sinks.items():
+        try:
+            await sink.cycle_finished()
+        except Exception:
+            logging.exception(f"Updating {target} after the fetch failed")
+
+
+async def run(once: bool, sinks: dict[str, OfferSink]):
+    scrapers = create_scrapers(config.dispositions)
+    storage = OffersStorage(config.found_offers_file, warm_start())
+    config_watcher = ConfigWatcher()
+    coordinator = create_coordinator()
+    outbox = Outbox(get_outbox_path(), list(sinks))
+    senders = [
+        create_digest_sender(outbox, target, sink.emit, scrapers)
+        if sink.digest
+        else OutboxSender(outbox, target, sink.emit, scrapers, config.embed_batch_size)
+        for target, sink in sinks.items()
+    ]
+    start_loop_monitor()
+    install_signal_handler()
+
+    logging.info("Available scrapers: " + ", ".join([s.name for s in scrapers]))
+
+    # Ve smyčce odesílají nabídky samostatné úlohy, které po chybě zkoušejí znovu.
+    # Při jednom stažení se fronta jen jednou vyprázdní, co selže, odešle příští běh.
+    sender_tasks = [] if once else [asyncio.create_task(s.run()) for s in senders]
+
+    try:
+        while True:
+            if config_watcher.check() & SCRAPER_FIELDS:
+                # Seznam se nahrazuje na místě, sdílí ho i odesílání z fronty
+                try:
+                    scrapers[:] = create_scrapers(config.dispositions)
+                except Exception:
+                    logging.exception("Failed to rebuild scrapers, keeping the previous ones")
+
+            logging.info("Fetching offers")
+            result = await run_cycle(scrapers, storage, coordinator, outbox)
+            logging.info(f"Offers fetched ({result.summary()})")
+
+            if result.first_time:
+                logging.info("No previous offers, first fetch is running silently")
+
+            if once:
+                for sender in senders:
+                    await sender.drain()
+                await notify_cycle_finished(sinks)
+                return
+
+            for sender in senders:
+                sender.wake()
+            await notify_cycle_finished(sinks)
+
+            interval_time = get_refresh_interval()
+            logging.info("Next fetch in {} minutes".format(interval_time))
+            await asyncio.sleep(interval_time * 60)
+    finally:
+        for task in sender_tasks:
+            task.cancel()
+        for sink in sinks.values():
+            await sink.close()
+        outbox.close()
+        await get_http_client().close()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    logging.basicConfig(
+        level=(logging.DEBUG if config.debug else logging.INFO),
+        format="%(asctime)s - [%(levelname)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    if args.worker:
+        run_worker(str(get_queue_path()))
+        raise SystemExit()
+
+    if args.workers is not None:
+        config.scrape_workers = args.workers
+
+    default_sink = f"discord:{config.discord_webhook_url}" if config.discord_webhook_url else "stdout"
+    sinks = {sink_target(spec): create_sink(spec) for spec in (args.sink or [default_sink])}
+    asyncio.run(run(args.once, sinks))
@@ -2,7 +2,7 @@ import functools
 import operator
 import os
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Literal
 
 import environ
 from pydantic import BeforeValidator
@@ -47,13 +47,83 @@ class Config(BaseSettings):
     refresh_interval_nighttime_minutes: int
     dispositions: Annotated[Disposition, BeforeValidator(dispositions_converter)]
     embed_batch_size: int = 10
+    digest_window_minutes: int = 0
+    digest_price_band: int = 5000
     min_price: int | None = None
     max_price: int | None = None
+    min_area: int | None = None
+    max_area: int | None = None
+    filter_center: str | None = None
+    filter_radius_km: float | None = None
+    filter_polygon: str | None = None
+    filter_unknown_location: bool = True
+    image_deduplication: bool = True
     image_deduplication_threshold: int = 5
+    image_deduplication_history: int = 0
+    image_hash_kinds: str = "average"
+    metadata_deduplication: bool = True
+    metadata_similarity_threshold: float = 0.5
+    scrapers: str | None = None
+    config_reload_interval_seconds: int = 30
+    detail_enrichment: bool = False
+    detail_concurrency: int = 4
+    detail_cache_file: Path | None = None
+    scrape_workers: int = 0
+    work_queue_file: Path | None = None
+    parse_executor: Literal["thread", "process", "inline"] = "thread"
+    loop_lag_threshold_ms: int = 500
+    json_decoder: Literal["auto", "orjson", "msgspec", "json"] = "auto"
+    json_streaming: Literal["auto"] | bool = "auto"
+    capture_responses: bool = False
+    capture_dir: Path | None = None
+    capture_max_archives: int = 50
+    capture_compression: Literal["gzip", "zstd"] = "gzip"
+    profile_every_n_cycles: int = 0
+    profile_dir: Path | None = None
+    state_snapshot: bool = True
+    snapshot_dir: Path | None = None
+    outbox_file: Path | None = None
+    market_stats: bool = True
+    market_stats_file: Path | None = None
+    offer_index: bool = True
+    offer_index_file: Path | None = None
+    geocode_cache_file: Path | None = None
+    gazetteer_file: Path | None = None
+    http2_hosts: str | None = None
+    host_rate_limit: float = 10.0
+    host_rate_burst: int = 20
+    host_rate_limits: str | None = None
 
     discord_token: str = environ.var()
     discord_offers_channel: int = environ.var(converter=int)
     discord_dev_channel: int = environ.var(converter=int)
+    discord_webhook_url: str | None = None
 
 
 config = Config()
+
+
+def data_path(file_name: str) -> Path:
+    """Cesta k pomocnému souboru aplikace ve stejné složce jako `found_offers_file`"""
+    return config.found_offers_file.parent / file_name
+
+
+def reload_config() -> set[str]:
+    """Znovu načte konfiguraci a změněné hodnoty přepíše přímo v objektu `config`
+
+    Ostatní moduly si drží odkaz na stejnou instanci, takže změny vidí okamžitě.
+
+    Returns:
+        set[str]: Názvy změněných položek
+    """
+    new_config = Config()
+    changed = {
+        name
+        for name in Config.model_fields
+        if getattr(new_config, name) != getattr(config, name)
+    }
+
+    for name in changed:
+        setattr(config, name, getattr(new_config, name))
+
+    return changed
@@ -0,0 +1,72 @@
+import logging
+import os
+
+from config import env_files, reload_config
+
+SCRAPER_FIELDS = {
+    "dispositions",
+    "min_price",
+    "max_price",
+    "min_area",
+    "max_area",
+    "scrapers",
+}
+"""Položky konfigurace, po jejichž změně je nutné znovu vytvořit scrapery"""
+
+INTERVAL_FIELDS = {
+    "refresh_interval_daytime_minutes",
+    "refresh_interval_nighttime_minutes",
+}
+"""Položky konfigurace ovlivňující interval stahování"""
+
+RESTART_FIELDS = {"discord_token", "discord_offers_channel", "discord_dev_channel"}
+"""Položky konfigurace, jejichž změna se projeví až po restartu"""
+
+
+class ConfigWatcher:
+    """Hlídá změny `.env` souborů a při změně znovu načte konfiguraci"""
+
+    def __init__(self, paths: tuple[str, ...] = env_files):
+        self.paths = paths
+        """Sledované soubory s konfigurací"""
+
+        self._mtimes = self._stat()
+
+    def _stat(self) -> dict[str, int | None]:
+        mtimes: dict[str, int | None] = {}
+
+        for path in self.paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                mtimes[path] = None
+
+        return mtimes
+
+    def check(self) -> set[str]:
+        """Zkontroluje soubory a pokud se změnily, znovu načte konfiguraci
+
+        Returns:
+            set[str]: Názvy změněných položek konfigurace (prázdné, pokud se nic nezměnilo)
+        """
+        mtimes = self._stat()
+        if mtimes == self._mtimes:
+            return set()
+
+        self._mtimes = mtimes
+
+        try:
+            changed = reload_config()
+        except Exception:
+            logging.exception("Failed to reload configuration, keeping the previous one")
+            return set()
+
+        if changed:
+            logging.info("Configuration reloaded, changed: " + ", ".join(sorted(changed)))
+        if changed & RESTART_FIELDS:
+            logging.warning(
+                "Changes of " + ", ".join(sorted(changed & RESTART_FIELDS))
+                + " take effect only after restart"
+            )
+
+        return changed
@@ -0,0 +1,165 @@
+"""Souhrnné zprávy s nabídkami
+
+Při `DIGEST_WINDOW_MINUTES` > 0 se nabídky neposílají po každém kole jednotlivě.
+Čekají ve frontě k odeslání, dokud nejstarší z nich nečeká celé okno, a pak se odešlou
+všechny najednou v kompaktních zprávách: jeden embed pro každou dispozici a cenové
+pásmo (`DIGEST_PRICE_BAND`), každá nabídka je v něm jeden řádek a její duplicity jen
+odkazy na konci řádku. Nabídky ze stejného okna, které jsou zjevně stejné (viz
+`fingerprint.deduplicate_by_fingerprint`), se sloučí do jednoho řádku.
+
+Nabídka tak dorazí nejvýše o okno později, ale místo desítek zpráv (a čekání na limity
+Discordu mezi nimi) se pošle několik.
+"""
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from config import config
+from embeds import MAX_EMBEDS_PER_MESSAGE
+from fingerprint import deduplicate_by_fingerprint, parse_disposition, parse_price
+from outbox import Outbox, OutboxSender
+from scrapers.rental_offer import RentalOffer
+from scrapers.scraper_base import ScraperBase
+
+DIGEST_MAX_OFFERS = 250
+"""Kolik nabídek z fronty se nejvýše načte a rozdělí do zpráv najednou"""
+
+MAX_DESCRIPTION_LENGTH = 4096
+MAX_MESSAGE_LENGTH = 6000
+"""Limity Discordu na popis embedu a na součet textů všech embedů ve zprávě"""
+
+MAX_LINE_LENGTH = 500
+
+DIGEST_COLOR = 0x5865F2
+
+_OTHER_DISPOSITION = "ostatní"
+
+
+def digest_enabled() -> bool:
+    return config.digest_window_minutes > 0
+
+
+def _group_key(offer: RentalOffer) -> tuple[str, int | None]:
+    """Dispozice a dolní hranice cenového pásma"""
+    price = parse_price(offer.price)
+    band = price // config.digest_price_band * config.digest_price_band if price else None
+    return parse_disposition(offer.title) or _OTHER_DISPOSITION, band
+
+
+def _sort_key(key: tuple[str, int | None]) -> tuple:
+    disposition, band = key
+    return disposition == _OTHER_DISPOSITION, disposition, band is None, band or 0
+
+
+def _group_title(key: tuple[str, int | None], count: int) -> str:
+    disposition, band = key
+    if band is None:
+        price = "cena neuvedena"
+    else:
+        price = f"{band:,}–{band + config.digest_price_band:,} Kč".replace(",", " ")
+    return f"{disposition} · {price} ({count})"
+
+
+def _link_text(text: str) -> str:
+    # Hranaté závorky by ukončily text odkazu v Markdownu
+    return text.replace("[", "(").replace("]", ")")
+
+
+def digest_line(offer: RentalOffer) -> str:
+    """Jeden řádek souhrnu: odkaz, cena, lokalita a odkazy na duplicity"""
+    line = f"[{_link_text(offer.title)}]({offer.link}) · {offer.price} Kč · {offer.location}"
+    if offer.duplicate_offers:
+        line += " · také " + ", ".join(
+            f"[{d.scraper.name}]({d.link})" for d in offer.duplicate_offers
+        )
+    if len(line) > MAX_LINE_LENGTH:
+        line = line[: MAX_LINE_LENGTH - 1] + "…"
+    return line
+
+
+def build_digest_embeds(
+    offers: list[RentalOffer], timestamp: datetime | None = None
+) -> list[dict[str, Any]]:
+    """Embedy souhrnu, jeden pro každou dispozici a cenové pásmo
+
+    Skupina, která se nevejde do popisu jednoho embedu, pokračuje v dalším.
+    """
+    groups: dict[tuple[str, int | None], list[RentalOffer]] = {}
+    for offer in offers:
+        groups.setdefault(_group_key(offer), []).append(offer)
+
+    timestamp = (timestamp or datetime.now(tz=timezone.utc)).isoformat()
+    embeds = []
+
+    for key in sorted(groups, key=_sort_key):
+        title = _group_title(key, len(groups[key]))
+        description = ""
+
+        for line in map(digest_line, groups[key]):
+            if description and len(description) + len(line) + 1 > MAX_DESCRIPTION_LENGTH:
+                embeds.append(_embed(title, description, timestamp))
+                description = ""
+            description += ("\n" if description else "") + line
+
+        embeds.append(_embed(title, description, timestamp))
+
+    return embeds
+
+
+def _embed(title: str, description: str, timestamp: str) -> dict[str, Any]:
+    return {
+        "type": "rich",
+        "title": title,
+        "description": description,
+        "timestamp": timestamp,
+        "color": DIGEST_COLOR,
+    }
+
+
+def _fits_message(embeds: list[dict[str, Any]]) -> bool:
+    length = sum(len(e["title"]) + len(e["description"]) for e in embeds)
+    return len(embeds) <= MAX_EMBEDS_PER_MESSAGE and length <= MAX_MESSAGE_LENGTH
+
+
+def split_digest(offers: list[RentalOffer]) -> list[list[RentalOffer]]:
+    """Sloučí zjevné duplicity a rozdělí nabídky do zpráv podle limitů Discordu
+
+    Sloučené nabídky jsou v `duplicate_offers` ponechané nabídky, ne ve výsledku.
+
+    Returns:
+        list[list[RentalOffer]]: Nabídky jednotlivých zpráv (pro `build_digest_embeds`)
+    """
+    if config.metadata_deduplication:
+        offers = deduplicate_by_fingerprint(offers, config.metadata_similarity_threshold)
+
+    messages: list[list[RentalOffer]] = []
+    current: list[RentalOffer] = []
+
+    for offer in sorted(offers, key=lambda o: _sort_key(_group_key(o))):
+        candidate = current + [offer]
+        if current and not _fits_message(build_digest_embeds(candidate)):
+            messages.append(current)
+            candidate = [offer]
+        current = candidate
+
+    if current:
+        messages.append(current)
+    return messages
+
+
+def create_digest_sender(
+    outbox: Outbox,
+    target: str,
+    send: Callable[[list[RentalOffer]], Awaitable[None]],
+    scrapers: list[ScraperBase],
+) -> OutboxSender:
+    """Odesílání z fronty po oknech `DIGEST_WINDOW_MINUTES`, `send` dostane nabídky
+    jedné zprávy souhrnu"""
+    return OutboxSender(
+        outbox,
+        target,
+        send,
+        scrapers,
+        DIGEST_MAX_OFFERS,
+        window_seconds=config.digest_window_minutes * 60,
+        split=split_digest,
+    )
@@ -0,0 +1,117 @@
+"""Odesílání nabídek přes Discord webhook bez připojení ke gateway
+
+Požadavky jdou přes sdílený HTTP klient. Dodržují se limity z hlaviček
+`X-RateLimit-Remaining` a `X-RateLimit-Reset-After`, při odpovědi 429 se čeká
+`retry_after` sekund a požadavek se zopakuje. Při chybě serveru se požadavek zopakuje
+nejvýše `SERVER_ERROR_RETRIES`krát, pak se vyhodí `DiscordWebhookError` a další pokusy
+s rostoucím odstupem řídí volající (`OutboxSender`), aby zámek nedržel navždy.
+
+Místo tématu kanálu (webhook ho nemůže měnit) se čas poslední aktualizace zobrazuje
+ve stavové zprávě, která se upravuje na místě.
+"""
+import asyncio
+import logging
+from pathlib import Path
+from time import monotonic
+from typing import Any
+
+from embeds import MAX_EMBEDS_PER_MESSAGE, chunk_offers
+from http_client import HttpResponse, get_http_client
+
+SERVER_ERROR_RETRY_SECONDS = 5.0
+SERVER_ERROR_RETRIES = 2
+
+
+class DiscordWebhookError(Exception):
+    """Discord odmítl požadavek nebo opakovaně odpověděl chybou serveru"""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"Discord webhook responded with status {status}: {body}")
+        self.status = status
+
+
+class DiscordWebhook:
+    """Discord webhook zadaný URL `https://discord.com/api/webhooks/<id>/<token>`"""
+
+    def __init__(self, url: str, status_message_file: Path | None = None):
+        self.url = url.rstrip("/")
+        self.status_message_file = status_message_file
+        """Soubor s ID stavové zprávy, aby se po restartu upravovala stejná zpráva"""
+
+        self._lock = asyncio.Lock()
+        self._blocked_until = 0.0
+        self._status_message_id: str | None = None
+
+        if status_message_file is not None and status_message_file.exists():
+            self._status_message_id = status_message_file.read_text().strip() or None
+
+    async def _execute(self, method: str, url: str, payload: dict[str, Any]) -> HttpResponse:
+        # Zprávy se posílají postupně, aby zůstalo zachováno pořadí a sdílený limit
+        async with self._lock:
+            server_errors = 0
+            while True:
+                delay = self._blocked_until - monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                response = await get_http_client().request(method, url, json_data=payload)
+                self._update_limit(response)
+
+                if response.status == 429:
+                    retry_after = self._retry_after(response)
+                    logging.warning(
+                        f"Discord webhook rate limited, retrying in {retry_after:.1f}s"
+                    )
+                    self._blocked_until = monotonic() + retry_after
+                    continue
+
+                if response.status >= 500 and server_errors < SERVER_ERROR_RETRIES:
+                    server_errors += 1
+                    logging.warning(
+                        f"Discord server error {response.status}, "
+                        f"retrying in {SERVER_ERROR_RETRY_SECONDS:.1f}s"
+                    )
+                    await asyncio.sleep(SERVER_ERROR_RETRY_SECONDS)
+                    continue
+
+                if response.status > 299:
+                    raise DiscordWebhookError(response.status, response.text())
+
+                return response
+
+    def _update_limit(self, response: HttpResponse):
+        remaining = response.header("X-RateLimit-Remaining")
+        reset_after = response.header("X-RateLimit-Reset-After")
+
+        if remaining == "0" and reset_after:
+            self._blocked_until = max(self._blocked_until, monotonic() + float(reset_after))
+
+    @staticmethod
+    def _retry_after(response: HttpResponse) -> float:
+        try:
+            return float(response.json()["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            return float(response.header("Retry-After") or 1)
+
+    async def send(self, embeds: list[dict[str, Any]]):
+        """Pošle embedy, po nejvýše 10 v jedné zprávě"""
+        for chunk in chunk_offers(embeds, MAX_EMBEDS_PER_MESSAGE):
+            await self._execute("POST", self.url + "?wait=true", {"embeds": chunk})
+        logging.info(f"{len(embeds)} embeds sent through webhook")
+
+    async def update_status(self, content: str):
+        """Upraví stavovou zprávu, případně pošle novou (při prvním volání nebo po jejím smazání)"""
+        if self._status_message_id:
+            try:
+                await self._execute(
+                    "PATCH", f"{self.url}/messages/{self._status_message_id}", {"content": content}
+                )
+                return
+            except DiscordWebhookError as e:
+                if e.status != 404:
+                    raise
+
+        response = await self._execute("POST", self.url + "?wait=true", {"content": content})
+        self._status_message_id = response.json()["id"]
+        if self.status_message_file is not None:
+            self.status_message_file.write_text(self._status_message_id)
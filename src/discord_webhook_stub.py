@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Lokální náhrada Discord webhooku pro vyzkoušení doručování bez Discordu
+
+Přijímá zprávy (`POST /api/webhooks/<id>/<token>`) a úpravy zpráv
+(`PATCH /api/webhooks/<id>/<token>/messages/<id>`) a vypisuje názvy embedů. Omezuje počet
+požadavků stejně jako Discord: posílá hlavičky `X-RateLimit-Remaining`
+a `X-RateLimit-Reset-After` a po vyčerpání limitu odpovídá 429 s `retry_after`.
+
+Spuštění: `python3 src/discord_webhook_stub.py [--port 8090] [--limit 5] [--per 2]`
+"""
+import argparse
+import itertools
+from time import monotonic
+
+from aiohttp import web
+
+
+class RateLimitBucket:
+    """Nejvýše `limit` požadavků v okně `per` sekund"""
+
+    def __init__(self, limit: int, per: float):
+        self.limit = limit
+        self.per = per
+        self.remaining = limit
+        self.reset_at = monotonic() + per
+
+    def take(self) -> bool:
+        now = monotonic()
+        if now >= self.reset_at:
+            self.remaining = self.limit
+            self.reset_at = now + self.per
+
+        if self.remaining == 0:
+            return False
+
+        self.remaining -= 1
+        return True
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset-After": f"{max(self.reset_at - monotonic(), 0):.3f}",
+        }
+
+
+def create_app(limit: int, per: float) -> web.Application:
+    bucket = RateLimitBucket(limit, per)
+    message_ids = itertools.count(1)
+    messages: dict[str, dict] = {}
+
+    def rate_limited() -> web.Response | None:
+        if bucket.take():
+            return None
+        retry_after = max(bucket.reset_at - monotonic(), 0)
+        print(f"429, retry after {retry_after:.2f}s")
+        return web.json_response(
+            {"message": "You are being rate limited.", "retry_after": retry_after, "global": False},
+            status=429,
+            headers=bucket.headers(),
+        )
+
+    async def execute(request: web.Request) -> web.Response:
+        if (response := rate_limited()) is not None:
+            return response
+
+        payload = await request.json()
+        message_id = str(next(message_ids))
+        messages[message_id] = payload
+
+        for embed in payload.get("embeds", []):
+            print(f"[{message_id}] {embed.get('title')} {embed.get('url')}")
+        if payload.get("content"):
+            print(f"[{message_id}] {payload['content']}")
+
+        if request.query.get("wait") == "true":
+            return web.json_response({"id": message_id, **payload}, headers=bucket.headers())
+        return web.Response(status=204, headers=bucket.headers())
+
+    async def edit(request: web.Request) -> web.Response:
+        if (response := rate_limited()) is not None:
+            return response
+
+        message_id = request.match_info["message_id"]
+        if message_id not in messages:
+            return web.json_response(
+                {"message": "Unknown Message", "code": 10008}, status=404, headers=bucket.headers()
+            )
+
+        messages[message_id].update(await request.json())
+        print(f"[{message_id}] edited: {messages[message_id].get('content')}")
+        return web.json_response({"id": message_id, **messages[message_id]}, headers=bucket.headers())
+
+    app = web.Application()
+    app.router.add_post("/api/webhooks/{webhook_id}/{token}", execute)
+    app.router.add_patch("/api/webhooks/{webhook_id}/{token}/messages/{message_id}", edit)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--limit", type=int, default=5, help="requests per rate limit window")
+    parser.add_argument("--per", type=float, default=2.0, help="rate limit window in seconds")
+    args = parser.parse_args()
+
+    print(f"Serving webhook stub on http://127.0.0.1:{args.port}/api/webhooks/1/token")
+    web.run_app(create_app(args.limit, args.per), host="127.0.0.1", port=args.port, print=None)
@@ -0,0 +1,206 @@
+"""Rozložení stahování nabídek a hashování obrázků mezi více procesů
+
+Koordinátor (bot nebo headless režim) vkládá úlohy do sdílené fronty `WorkQueue`
+a workery je zpracovávají. Výsledky se slučují zpět v koordinátoru, takže úložiště
+nabídek i deduplikace zůstávají na jednom místě.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import time
+import traceback
+import uuid
+from pathlib import Path
+
+from config import config, data_path
+from config_watcher import SCRAPER_FIELDS, ConfigWatcher
+from disposition import Disposition
+from http_client import HttpClient, create_rate_limiter
+from scrapers.rental_offer import RentalOffer
+from scrapers.scraper_base import ScraperBase
+from scrapers_manager import create_scraper
+from transformations import ImageHashes, _get_image_hash
+from work_queue import Job, WorkQueue
+
+JOB_SCRAPE = "scrape"
+JOB_IMAGE_HASH = "image_hash"
+
+IMAGE_HASH_CHUNK_SIZE = 20
+"""Počet obrázků v jedné úloze hashování"""
+
+BATCH_TIMEOUT_SECONDS = 180
+"""Maximální doba čekání koordinátoru na dokončení dávky"""
+
+POLL_INTERVAL_SECONDS = 0.2
+
+
+def get_queue_path() -> Path:
+    return config.work_queue_file or data_path("work_queue.sqlite")
+
+
+def _scraper_target(scraper: ScraperBase) -> str:
+    return scraper.registry_name or f"{type(scraper).__module__}:{type(scraper).__name__}"
+
+
+class Coordinator:
+    """Rozesílá úlohy workerům a slučuje jejich výsledky"""
+
+    def __init__(self, queue: WorkQueue):
+        self.queue = queue
+        self.queue.purge()
+
+    async def _run_batch(self, kind: str, payloads: list[dict]) -> list[Job]:
+        batch = uuid.uuid4().hex
+        self.queue.enqueue(batch, kind, payloads)
+        deadline = time.monotonic() + BATCH_TIMEOUT_SECONDS
+
+        while self.queue.unfinished_count(batch):
+            if time.monotonic() > deadline:
+                logging.error(f"Timed out waiting for {kind} jobs, using partial results")
+                break
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+        jobs = self.queue.results(batch)
+        self.queue.delete_batch(batch)
+        return jobs
+
+    async def fetch_latest_offers(self, scrapers: list[ScraperBase]) -> list[RentalOffer]:
+        """Stejné jako `scrapers_manager.fetch_latest_offers`, ale stahují workery"""
+        scrapers_by_name = {s.name: s for s in scrapers}
+        jobs = await self._run_batch(
+            JOB_SCRAPE,
+            [
+                {"scraper": _scraper_target(s), "disposition": s.disposition.value}
+                for s in scrapers
+            ],
+        )
+
+        offers: list[RentalOffer] = []
+        for job in jobs:
+            if job.status != "done":
+                logging.error(f"Scrape job {job.payload['scraper']} {job.status}: {job.result}")
+                continue
+
+            offers.extend(RentalOffer.from_dict(o, scrapers_by_name) for o in job.result)
+            logging.info(f"Fetched {len(job.result)} offers from {job.payload['scraper']}")
+
+        return offers
+
+    async def get_image_hashes(
+        self, offers: list[RentalOffer]
+    ) -> list[tuple[RentalOffer, ImageHashes | None]]:
+        """Stejné jako `transformations.get_image_hashes`, ale obrázky stahují workery"""
+        urls = sorted({o.image_url for o in offers if o.image_url})
+        jobs = await self._run_batch(
+            JOB_IMAGE_HASH,
+            [
+                {"urls": urls[i : i + IMAGE_HASH_CHUNK_SIZE]}
+                for i in range(0, len(urls), IMAGE_HASH_CHUNK_SIZE)
+            ],
+        )
+
+        hashes: dict[str, list[int] | None] = {}
+        for job in jobs:
+            if job.status == "done":
+                hashes.update(zip(job.payload["urls"], job.result))
+
+        return [
+            (o, tuple(hashes[o.image_url]) if hashes.get(o.image_url) else None)
+            for o in offers
+        ]
+
+
+async def _run_job(
+    job: Job,
+    client: HttpClient,
+    scrapers: dict[tuple[str, int], ScraperBase],
+) -> list:
+    if job.kind == JOB_SCRAPE:
+        key = (job.payload["scraper"], job.payload["disposition"])
+        if key not in scrapers:
+            scrapers[key] = create_scraper(key[0], Disposition(key[1]))
+
+        offers = await scrapers[key].get_latest_offers(client)
+        return [o.to_dict() for o in offers]
+
+    if job.kind == JOB_IMAGE_HASH:
+        hashes = await asyncio.gather(
+            *[_get_image_hash(client, url) for url in job.payload["urls"]],
+            return_exceptions=True,
+        )
+        return [None if isinstance(h, BaseException) or h is None else list(h) for h in hashes]
+
+    raise ValueError(f"Unknown job kind: {job.kind}")
+
+
+async def _worker_loop(queue: WorkQueue, worker_id: str):
+    scrapers: dict[tuple[str, int], ScraperBase] = {}
+    config_watcher = ConfigWatcher()
+
+    async with HttpClient(rate_limiter=create_rate_limiter()) as client:
+        while True:
+            if config_watcher.check() & SCRAPER_FIELDS:
+                scrapers.clear()
+
+            job = queue.claim(worker_id)
+            if job is None:
+                await asyncio.sleep(POLL_INTERVAL_SECONDS)
+                continue
+
+            try:
+                queue.complete(job.id, await _run_job(job, client, scrapers))
+            except Exception:
+                logging.error(traceback.format_exc())
+                queue.fail(job.id, traceback.format_exc())
+
+
+def run_worker(queue_path: str, worker_id: str | None = None):
+    """Spustí worker, který zpracovává úlohy z fronty až do ukončení procesu"""
+    logging.basicConfig(
+        level=(logging.DEBUG if config.debug else logging.INFO),
+        format="%(asctime)s - [%(levelname)s] %(processName)s: %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    logging.info(f"Worker {worker_id} consuming jobs from {queue_path}")
+    asyncio.run(_worker_loop(WorkQueue(queue_path), worker_id))
+
+
+def start_local_workers(count: int, queue_path: Path) -> list[multiprocessing.Process]:
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(str(queue_path),),
+            name=f"scrape-worker-{i}",
+            daemon=True,
+        )
+        for i in range(count)
+    ]
+
+    for process in processes:
+        process.start()
+
+    return processes
+
+
+def create_coordinator() -> Coordinator | None:
+    """Podle konfigurace vytvoří koordinátor a spustí lokální workery
+
+    Returns:
+        Coordinator | None: Koordinátor, nebo None pokud se stahuje v jednom procesu
+    """
+    if config.scrape_workers <= 0 and config.work_queue_file is None:
+        return None
+
+    queue_path = get_queue_path()
+    coordinator = Coordinator(WorkQueue(queue_path))
+
+    if config.scrape_workers > 0:
+        start_local_workers(config.scrape_workers, queue_path)
+        logging.info(f"Started {config.scrape_workers} local scrape workers")
+
+    return coordinator
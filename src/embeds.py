@@ -0,0 +1,49 @@
+"""Discord embedy nabídek
+
+Embed se sestavuje jako slovník ve formátu Discord API, takže ho lze poslat přes bota
+(`discord.Embed.from_dict`) i přes webhook bez připojení ke gateway.
+"""
+from datetime import datetime, timezone
+from typing import Any, Iterator
+
+from scrapers.rental_offer import RentalOffer
+
+MAX_EMBEDS_PER_MESSAGE = 10
+"""Discord povoluje nejvýše 10 embedů v jedné zprávě"""
+
+
+def build_embed(offer: RentalOffer, timestamp: datetime | None = None) -> dict[str, Any]:
+    """Embed jedné nabídky včetně detailů a odkazů na duplicitní nabídky
+
+    Prázdné detaily se vynechají, Discord by jinak odmítl celou zprávu.
+    """
+    fields = [{"name": "Cena", "value": f"{offer.price} Kč", "inline": True}]
+    fields += [
+        {"name": n, "value": v, "inline": True}
+        for n, v in offer.details.items()
+        if n.strip() and v.strip()
+    ]
+    fields += [
+        {"name": "Alternativní odkaz", "value": duplicate.link, "inline": True}
+        for duplicate in offer.duplicate_offers
+    ]
+
+    embed = {
+        "type": "rich",
+        "title": offer.title,
+        "url": offer.link,
+        "description": offer.location,
+        "timestamp": (timestamp or datetime.now(tz=timezone.utc)).isoformat(),
+        "color": offer.scraper.color,
+        "fields": fields,
+        "author": {"name": offer.scraper.name, "icon_url": offer.scraper.logo_url},
+    }
+    if offer.image_url:
+        embed["image"] = {"url": offer.image_url}
+
+    return embed
+
+
+def chunk_offers(offers: list, size: int) -> Iterator[list]:
+    for i in range(0, len(offers), size):
+        yield offers[i : i + size]
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from pathlib import Path
+
+from http_client import HttpClient, get_http_client
+from scrapers.rental_offer import RentalOffer
+
+
+class DetailCache:
+    """Trvalá mezipaměť údajů z detailů nabídek, klíčem je odkaz na nabídku"""
+
+    def __init__(self, path: Path | str):
+        self.path = path
+        """Cesta k databázi"""
+
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS details (
+                link TEXT PRIMARY KEY,
+                details TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, link: str) -> dict[str, str] | None:
+        row = self._connection.execute(
+            "SELECT details FROM details WHERE link = ?", (link,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, link: str, details: dict[str, str]):
+        with self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO details (link, details, fetched_at) VALUES (?, ?, ?)",
+                (link, json.dumps(details, ensure_ascii=False), time.time()),
+            )
+
+
+async def _enrich_offer(
+    client: HttpClient,
+    semaphore: asyncio.Semaphore,
+    cache: DetailCache,
+    offer: RentalOffer,
+):
+    cached = cache.get(offer.link)
+    if cached is not None:
+        offer.details = cached
+        return
+
+    async with semaphore:
+        try:
+            offer.details = await offer.scraper.get_offer_details(client, offer)
+        except Exception:
+            logging.warning(f"Failed to fetch details of {offer.link}", exc_info=True)
+            return
+
+    cache.put(offer.link, offer.details)
+
+
+async def enrich_offers(
+    offers: list[RentalOffer], cache: DetailCache, concurrency: int
+) -> None:
+    """Doplní údaje z detailu nabídek, které to podporují
+
+    Volá se jen pro nové, vyfiltrované nabídky bez duplicit, takže počet požadavků
+    neroste s celkovým počtem stažených nabídek.
+
+    Args:
+        offers (list[RentalOffer]): Nabídky určené k odeslání
+        cache (DetailCache): Mezipaměť již stažených detailů
+        concurrency (int): Maximální počet souběžně stahovaných detailů
+    """
+    supported = [o for o in offers if o.scraper.supports_details]
+    if not supported:
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+    client = get_http_client()
+    await asyncio.gather(
+        *[_enrich_offer(client, semaphore, cache, o) for o in supported]
+    )
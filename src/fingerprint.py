@@ -0,0 +1,224 @@
+"""Deduplikace nabídek podle textových údajů (bez stahování obrázků)
+
+Z nabídky se vytvoří otisk z normalizované adresy, čísla domu, plochy, dispozice
+a cenového pásma. Nabídky se shodným otiskem jsou zjevné duplicity. Pro adresy zapsané
+na různých serverech jinak se navíc porovnává podobnost slov titulku a lokality pomocí
+MinHash a LSH. Nabídky ze stejného serveru se nikdy neslučují (jeden server stejný byt
+nevypisuje dvakrát, jde spíš o dva stejné byty v jednom domě), stejně jako nabídky
+s různým číslem domu.
+"""
+import re
+import unicodedata
+import zlib
+from dataclasses import dataclass, field
+
+from scrapers.rental_offer import RentalOffer
+
+PRICE_BUCKET_SIZE = 500
+"""Šířka cenového pásma v Kč"""
+
+PRICE_TOLERANCE = 0.05
+"""Povolený relativní rozdíl ceny u podobných nabídek"""
+
+MINHASH_PERMUTATIONS = 32
+LSH_BANDS = 8
+_LSH_ROWS = MINHASH_PERMUTATIONS // LSH_BANDS
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_PERMUTATIONS = [
+    (zlib.crc32(f"a{i}".encode()) | 1, zlib.crc32(f"b{i}".encode()))
+    for i in range(MINHASH_PERMUTATIONS)
+]
+
+_STOP_WORDS = {
+    "brno", "mesto", "venkov", "okres", "ulice", "ul", "cast", "obec", "cr", "cz",
+    "pronajem", "bytu", "byt", "bytove", "jednotky", "mesicne", "m2", "kc", "kk",
+}
+
+_AREA_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*m(?:2|²)")
+_DISPOSITION_RE = re.compile(r"(\d)\s*\+\s*(kk|\d)")
+_HOUSE_NUMBER_RE = re.compile(r"([a-z]+)\s+(\d+[a-z]?(?:\s*/\s*\d+[a-z]?)?)\b")
+_POSTAL_CODE_RE = re.compile(r"\b\d{3}\s?\d{2}\b")
+
+
+def normalize_text(text: str) -> str:
+    """Malá písmena bez diakritiky, jen písmena a číslice oddělené mezerou"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+
+def parse_area(text: str) -> int | None:
+    match = _AREA_RE.search(text.lower())
+    return round(float(match.group(1).replace(",", "."))) if match else None
+
+
+def parse_disposition(text: str) -> str | None:
+    match = _DISPOSITION_RE.search(text.lower())
+    return f"{match.group(1)}+{match.group(2)}" if match else None
+
+
+def parse_price(price: int | str) -> int | None:
+    if isinstance(price, int):
+        return price or None
+
+    # Např. "15000 / 3500" (nájem / poplatky) nebo "15 000 Kč"
+    match = re.search(r"\d[\d\s]*", str(price))
+    return int(re.sub(r"\s", "", match.group())) or None if match else None
+
+
+def parse_house_number(location: str) -> str | None:
+    """Číslo domu za názvem ulice (`Veveří 12` nebo `Veveří 1234/12`)
+
+    Hledá se jen v ulici (část adresy před první čárkou). PSČ (`602 00`) ani číslo
+    městské části (`Brno 2`) se za číslo domu nepovažují.
+    """
+    street = location.split(",", 1)[0]
+    text = unicodedata.normalize("NFKD", street.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    match = _HOUSE_NUMBER_RE.search(_POSTAL_CODE_RE.sub(" ", text))
+    if match is None or match.group(1) in _STOP_WORDS:
+        return None
+    return re.sub(r"\s", "", match.group(2))
+
+
+def _tokens(text: str) -> set[str]:
+    # Čísla (plocha, dispozice, číslo popisné) se porovnávají zvlášť nebo se na serverech liší
+    return {
+        t for t in normalize_text(text).split() if t not in _STOP_WORDS and not t.isdigit()
+    }
+
+
+@dataclass
+class OfferFingerprint:
+    """Otisk textových údajů nabídky"""
+
+    address: str
+    house_number: str | None
+    area: int | None
+    disposition: str | None
+    price: int | None
+    signature: list[int] = field(repr=False)
+
+    @classmethod
+    def of(cls, offer: RentalOffer) -> "OfferFingerprint":
+        address = " ".join(sorted(_tokens(offer.location)))
+        tokens = _tokens(offer.title) | _tokens(offer.location)
+
+        return cls(
+            address=address,
+            house_number=parse_house_number(offer.location),
+            area=parse_area(offer.title),
+            disposition=parse_disposition(offer.title),
+            price=parse_price(offer.price),
+            signature=minhash(tokens),
+        )
+
+    @property
+    def key(self) -> tuple | None:
+        """Klíč pro přesnou shodu, pokud jsou známy všechny údaje"""
+        if not (self.address and self.area and self.disposition and self.price):
+            return None
+
+        return (
+            self.address,
+            self.house_number,
+            self.area,
+            self.disposition,
+            self.price // PRICE_BUCKET_SIZE,
+        )
+
+    def band_keys(self) -> list[tuple]:
+        return [
+            (band, tuple(self.signature[band * _LSH_ROWS : (band + 1) * _LSH_ROWS]))
+            for band in range(LSH_BANDS)
+        ]
+
+    def similarity(self, other: "OfferFingerprint") -> float:
+        """Odhad Jaccardovy podobnosti slov podle MinHash podpisů"""
+        same = sum(a == b for a, b in zip(self.signature, other.signature))
+        return same / MINHASH_PERMUTATIONS
+
+    def compatible(self, other: "OfferFingerprint") -> bool:
+        """Shodná dispozice, plocha a cena (s tolerancí), všechny údaje musí být známé
+
+        Číslo domu se porovnává, jen pokud ho uvádějí obě nabídky.
+        """
+        if not (self.area and self.disposition and self.price):
+            return False
+        if self.disposition != other.disposition or other.area is None or other.price is None:
+            return False
+        if self.house_number and other.house_number and self.house_number != other.house_number:
+            return False
+
+        return (
+            abs(self.area - other.area) <= 1
+            and abs(self.price - other.price) <= PRICE_TOLERANCE * self.price
+        )
+
+
+def minhash(tokens: set[str]) -> list[int]:
+    if not tokens:
+        return [_MERSENNE_PRIME] * MINHASH_PERMUTATIONS
+
+    hashes = [zlib.crc32(t.encode()) for t in tokens]
+    return [
+        min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in _PERMUTATIONS
+    ]
+
+
+def deduplicate_by_fingerprint(
+    offers: list[RentalOffer], similarity_threshold: float
+) -> list[RentalOffer]:
+    """Sloučí zjevné duplicity podle textových údajů
+
+    Duplicitní nabídky se přidají do `duplicate_offers` první nalezené nabídky a nejsou
+    ve výsledku, takže se pro ně nemusí stahovat obrázky.
+
+    Args:
+        offers (list[RentalOffer]): Nabídky
+        similarity_threshold (float): Minimální podobnost slov pro shodu přes LSH
+
+    Returns:
+        list[RentalOffer]: Nabídky bez zjevných duplicit
+    """
+    kept: list[tuple[RentalOffer, OfferFingerprint]] = []
+    scrapers: list[set[str]] = []
+    """Servery nabídek v každé skupině, do skupiny se nepřidá druhá nabídka stejného serveru"""
+    exact: dict[tuple, list[int]] = {}
+    buckets: dict[tuple, list[int]] = {}
+
+    for offer in offers:
+        fingerprint = OfferFingerprint.of(offer)
+        scraper = offer.scraper.name
+        exact_matches = exact.get(fingerprint.key, []) if fingerprint.key else []
+        match = next((i for i in exact_matches if scraper not in scrapers[i]), None)
+
+        if match is None:
+            candidates = {i for band in fingerprint.band_keys() for i in buckets.get(band, [])}
+            for i in sorted(candidates):
+                other = kept[i][1]
+                if (
+                    scraper not in scrapers[i]
+                    and fingerprint.compatible(other)
+                    and fingerprint.similarity(other) >= similarity_threshold
+                ):
+                    match = i
+                    break
+
+        if match is not None:
+            kept[match][0].duplicate_offers.append(offer)
+            scrapers[match].add(scraper)
+            continue
+
+        index = len(kept)
+        kept.append((offer, fingerprint))
+        scrapers.append(
+            {scraper} | {d.scraper.name for d in offer.duplicate_offers}
+        )
+        if fingerprint.key:
+            exact.setdefault(fingerprint.key, []).append(index)
+        for band in fingerprint.band_keys():
+            buckets.setdefault(band, []).append(index)
+
+    return [offer for offer, _ in kept]
@@ -0,0 +1,246 @@
+"""Určení polohy nabídky bez online geokódování
+
+Poloha se hledá v tomto pořadí:
+
+1. souřadnice od serveru (Sreality, UlovDomov, Realingo vracejí GPS přímo v nabídce)
+2. trvalá mezipaměť adres - každá adresa, ke které server někdy poslal souřadnice
+3. ulice ze souboru `GAZETTEER_FILE` (řádky `název;šířka;délka`, např. export ulic
+   Brna z RÚIAN nebo OpenStreetMap)
+4. ulice naučené z předchozích nabídek (průměr souřadnic nabídek ze stejné ulice)
+5. střed městské části nebo katastrálního území Brna (přesnost zhruba 1 km)
+
+Mezipaměť i naučené ulice jsou v SQLite databázi `GEOCODE_CACHE_FILE`.
+"""
+import csv
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from config import config, data_path
+from fingerprint import normalize_text
+from scrapers.rental_offer import RentalOffer
+
+BRNO_DISTRICTS: dict[str, tuple[float, float]] = {
+    "Bohunice": (49.1720, 16.5830),
+    "Bosonohy": (49.1800, 16.5200),
+    "Brno-město": (49.1950, 16.6080),
+    "Brno-střed": (49.1925, 16.6030),
+    "Bystrc": (49.2260, 16.5080),
+    "Černá Pole": (49.2080, 16.6260),
+    "Černovice": (49.1820, 16.6470),
+    "Chrlice": (49.1320, 16.6520),
+    "Dolní Heršpice": (49.1560, 16.6100),
+    "Horní Heršpice": (49.1660, 16.6050),
+    "Husovice": (49.2130, 16.6250),
+    "Ivanovice": (49.2580, 16.5650),
+    "Jehnice": (49.2640, 16.5840),
+    "Jih": (49.1700, 16.6200),
+    "Juliánov": (49.1990, 16.6520),
+    "Jundrov": (49.2080, 16.5450),
+    "Kníničky": (49.2350, 16.5300),
+    "Kohoutovice": (49.1950, 16.5350),
+    "Komárov": (49.1730, 16.6230),
+    "Komín": (49.2200, 16.5500),
+    "Královo Pole": (49.2280, 16.5970),
+    "Lesná": (49.2280, 16.6240),
+    "Líšeň": (49.2080, 16.6870),
+    "Maloměřice a Obřany": (49.2220, 16.6480),
+    "Medlánky": (49.2380, 16.5710),
+    "Nový Lískovec": (49.1800, 16.5600),
+    "Ořešín": (49.2720, 16.5950),
+    "Pisárky": (49.1900, 16.5700),
+    "Ponava": (49.2130, 16.6040),
+    "Řečkovice a Mokrá Hora": (49.2480, 16.5850),
+    "Sever": (49.2200, 16.6200),
+    "Slatina": (49.1780, 16.6850),
+    "Soběšice": (49.2530, 16.6100),
+    "Staré Brno": (49.1925, 16.5960),
+    "Starý Lískovec": (49.1680, 16.5660),
+    "Střed": (49.1950, 16.6070),
+    "Štýřice": (49.1830, 16.5890),
+    "Trnitá": (49.1860, 16.6170),
+    "Tuřany": (49.1480, 16.6900),
+    "Útěchov": (49.2900, 16.6200),
+    "Veveří": (49.2050, 16.5960),
+    "Vinohrady": (49.2100, 16.6550),
+    "Zábrdovice": (49.1980, 16.6270),
+    "Žabovřesky": (49.2130, 16.5770),
+    "Žebětín": (49.2120, 16.4800),
+    "Židenice": (49.2020, 16.6470),
+}
+"""Přibližné středy městských částí a katastrálních území Brna"""
+
+_DISTRICTS_BY_KEY = {normalize_text(name): point for name, point in BRNO_DISTRICTS.items()}
+_HOUSE_NUMBER_RE = re.compile(r"\s*\d+[a-z]?(?:/\d+[a-z]?)?$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class GeoPoint:
+    lat: float
+    lon: float
+    source: str
+    """Odkud poloha pochází (`portal`, `cache`, `gazetteer`, `street`, `district`)"""
+
+
+def address_key(location: str) -> str:
+    return normalize_text(location)
+
+
+def _is_place(key: str, has_house_number: bool) -> bool:
+    """Část lokality je město, městská část nebo PSČ, ne ulice
+
+    Ulice se jménem městské části (`Veveří 12`) se pozná podle čísla domu.
+    """
+    words = key.split()
+    return (
+        "brno" in words
+        or words[0] == "okres"
+        or all(word.isdigit() for word in words)
+        or (key in _DISTRICTS_BY_KEY and not has_house_number)
+    )
+
+
+def street_key(location: str) -> str | None:
+    """Název ulice bez čísla popisného
+
+    Ulice je první část lokality (oddělené čárkou), která není městem ani městskou
+    částí, takže `Brno, Líšeň` ulici nemá a `Brno-Líšeň, Jírova 7` má ulici `jirova`.
+    """
+    if "," not in location:
+        return None
+
+    for part in location.split(","):
+        part = part.strip()
+        street = _HOUSE_NUMBER_RE.sub("", part)
+        key = normalize_text(street)
+        if key and not _is_place(key, street != part):
+            return key
+
+    return None
+
+
+def _district_point(location: str) -> tuple[float, float] | None:
+    # Nejdelší shoda, aby "Královo Pole" mělo přednost před "Pole"
+    normalized = f" {normalize_text(location)} "
+    matches = [key for key in _DISTRICTS_BY_KEY if f" {key} " in normalized]
+    return _DISTRICTS_BY_KEY[max(matches, key=len)] if matches else None
+
+
+def load_gazetteer(path: Path) -> dict[str, tuple[float, float]]:
+    """Načte ulice ze souboru s řádky `název;šířka;délka`"""
+    with open(path, newline="", encoding="utf-8") as gazetteer_file:
+        return {
+            normalize_text(row[0]): (float(row[1]), float(row[2]))
+            for row in csv.reader(gazetteer_file, delimiter=";")
+            if len(row) >= 3 and not row[0].startswith("#")
+        }
+
+
+class Geocoder:
+    """Určuje polohu nabídek a učí se ze souřadnic, které posílají servery"""
+
+    def __init__(
+        self, path: Path | str, gazetteer: dict[str, tuple[float, float]] | None = None
+    ):
+        self.path = path
+        """Cesta k databázi mezipaměti"""
+
+        self.gazetteer = gazetteer or {}
+        """Souřadnice ulic podle normalizovaného názvu"""
+
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS addresses (
+                address TEXT PRIMARY KEY,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS streets (
+                street TEXT PRIMARY KEY,
+                lat_sum REAL NOT NULL,
+                lon_sum REAL NOT NULL,
+                samples INTEGER NOT NULL
+            )
+            """
+        )
+
+    def close(self):
+        self._connection.close()
+
+    def _learn(self, location: str, lat: float, lon: float):
+        """Uloží souřadnice adresy a započítá je do průměru ulice"""
+        self._connection.execute(
+            "INSERT OR REPLACE INTO addresses (address, lat, lon, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            (address_key(location), lat, lon, time.time()),
+        )
+        if street := street_key(location):
+            self._connection.execute(
+                """
+                INSERT INTO streets (street, lat_sum, lon_sum, samples) VALUES (?, ?, ?, 1)
+                ON CONFLICT (street) DO UPDATE SET
+                    lat_sum = lat_sum + excluded.lat_sum,
+                    lon_sum = lon_sum + excluded.lon_sum,
+                    samples = samples + 1
+                """,
+                (street, lat, lon),
+            )
+
+    def geocode_offers(self, offers: list[RentalOffer]) -> list[GeoPoint | None]:
+        """Polohy nabídek (viz popis modulu), None pro nabídky, jejichž polohu nelze určit
+
+        Naučené adresy se uloží v jedné transakci.
+        """
+        with self._connection:
+            return [self._locate(offer) for offer in offers]
+
+    def _locate(self, offer: RentalOffer) -> GeoPoint | None:
+        cached = self._connection.execute(
+            "SELECT lat, lon FROM addresses WHERE address = ?", (address_key(offer.location),)
+        ).fetchone()
+
+        if offer.coordinates is not None:
+            # Stejná adresa se do průměru ulice započítá jen jednou
+            if cached is None:
+                self._learn(offer.location, *offer.coordinates)
+            return GeoPoint(*offer.coordinates, "portal")
+
+        if cached:
+            return GeoPoint(*cached, "cache")
+
+        if street := street_key(offer.location):
+            if street in self.gazetteer:
+                return GeoPoint(*self.gazetteer[street], "gazetteer")
+
+            row = self._connection.execute(
+                "SELECT lat_sum / samples, lon_sum / samples FROM streets WHERE street = ?",
+                (street,),
+            ).fetchone()
+            if row:
+                return GeoPoint(row[0], row[1], "street")
+
+        if point := _district_point(offer.location):
+            return GeoPoint(*point, "district")
+
+        return None
+
+
+_geocoder: Geocoder | None = None
+
+
+def get_geocoder() -> Geocoder:
+    global _geocoder
+    if _geocoder is None:
+        gazetteer = load_gazetteer(config.gazetteer_file) if config.gazetteer_file else None
+        _geocoder = Geocoder(
+            config.geocode_cache_file or data_path("geocode_cache.sqlite"), gazetteer
+        )
+    return _geocoder
@@ -0,0 +1,109 @@
+"""Hromadné porovnávání hashů obrázků
+
+Hash o velikosti 8x8 bitů se ukládá jako jedno `uint64`, pro každý druh hashe
+(aHash, dHash, pHash) jeden sloupec matice. Hammingova vzdálenost se počítá pro celou
+dávku nových hashů proti všem uloženým najednou (XOR + popcount v NumPy).
+"""
+import numpy as np
+
+HASH_FUNCTIONS = {
+    "average": "average_hash",
+    "difference": "dhash",
+    "perceptual": "phash",
+}
+"""Podporované druhy hashů a odpovídající funkce z knihovny imagehash"""
+
+MATCH_BLOCK_SIZE = 16384
+"""Počet uložených hashů porovnávaných v jednom kroku (omezuje velikost mezivýsledků)"""
+
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Počet nastavených bitů každého prvku pole `uint64`"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values)
+
+    bytes_view = values.view(np.uint8).reshape(values.shape + (8,))
+    return _POPCOUNT_TABLE[bytes_view].sum(axis=-1, dtype=np.uint8)
+
+
+def pack_hash(bits: np.ndarray) -> int:
+    """Převede 64 bitů hashe (`ImageHash.hash`) na jedno celé číslo"""
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), "big")
+
+
+class HashIndex:
+    """Rostoucí matice uložených hashů obrázků"""
+
+    def __init__(self, kinds: int, capacity: int = 1024):
+        self.kinds = kinds
+        """Počet druhů hashů na jeden obrázek"""
+
+        self._hashes = np.zeros((capacity, kinds), dtype=np.uint64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def hashes(self) -> np.ndarray:
+        """Uložené hashe, matice (počet, druhy)"""
+        return self._hashes[: self._size]
+
+    def add(self, packed: np.ndarray):
+        """Přidá hashe, matice (počet, druhy)"""
+        required = self._size + len(packed)
+        if required > len(self._hashes):
+            grown = np.zeros((max(required, 2 * len(self._hashes)), self.kinds), dtype=np.uint64)
+            grown[: self._size] = self.hashes
+            self._hashes = grown
+
+        self._hashes[self._size : required] = packed
+        self._size = required
+
+    def truncate_oldest(self, max_size: int):
+        """Ponechá jen `max_size` naposledy přidaných hashů"""
+        if self._size > max_size:
+            self._hashes[:max_size] = self._hashes[self._size - max_size : self._size]
+            self._size = max_size
+
+    def match(self, packed: np.ndarray, threshold: int) -> np.ndarray:
+        """Najde shody nových hashů s uloženými
+
+        Args:
+            packed (np.ndarray): Nové hashe, matice (počet, druhy)
+            threshold (int): Hashe jsou shodné, pokud je vzdálenost všech druhů menší
+
+        Returns:
+            np.ndarray: Pro každý nový hash index první shody v úložišti, jinak -1
+        """
+        first_match = np.full(len(packed), -1, dtype=np.int64)
+
+        for start in range(0, self._size, MATCH_BLOCK_SIZE):
+            unmatched = first_match < 0
+            if not unmatched.any():
+                break
+
+            block = self._hashes[start : min(start + MATCH_BLOCK_SIZE, self._size)]
+            within = match_matrix(packed[unmatched], block, threshold)
+            found = within.any(axis=1)
+
+            indices = np.flatnonzero(unmatched)[found]
+            first_match[indices] = start + within[found].argmax(axis=1)
+
+        return first_match
+
+
+def match_matrix(a: np.ndarray, b: np.ndarray, threshold: int) -> np.ndarray:
+    """Matice shod mezi dvěma sadami hashů, tvar (len(a), len(b))"""
+    within = popcount(a[:, None, 0] ^ b[None, :, 0]) < threshold
+
+    # Další druhy hashů se ověřují jen u kandidátů, kteří prošli prvním
+    for kind in range(1, a.shape[1]):
+        rows, columns = np.nonzero(within)
+        if not len(rows):
+            break
+        within[rows, columns] = popcount(a[rows, kind] ^ b[columns, kind]) < threshold
+
+    return within
@@ -0,0 +1,62 @@
+"""Zpracování staženého HTML mimo event loop
+
+BeautifulSoup parsuje synchronně a u velkých stránek by blokoval event loop
+(a s ním i heartbeat Discord gateway), proto běží ve vlákně nebo v procesu.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from config import config
+from scrapers.rental_offer import RentalOffer
+
+if TYPE_CHECKING:
+    from scrapers.scraper_base import ScraperBase
+
+_executor: Executor | None = None
+_executor_kind: str | None = None
+
+
+def _get_executor() -> Executor | None:
+    global _executor, _executor_kind
+
+    if config.parse_executor != _executor_kind:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+
+        if config.parse_executor == "process":
+            _executor = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+        elif config.parse_executor == "thread":
+            _executor = ThreadPoolExecutor(thread_name_prefix="parser")
+        else:
+            _executor = None
+
+        _executor_kind = config.parse_executor
+
+    return _executor
+
+
+def _parse(scraper: "ScraperBase", html: str) -> list[RentalOffer]:
+    return scraper._parse_offers(html)
+
+
+async def parse_offers(scraper: "ScraperBase", html: str) -> list[RentalOffer]:
+    """Zavolá `scraper._parse_offers(html)` podle `config.parse_executor`
+
+    - `thread` (výchozí) - ve vlákně, event loop zůstává volný
+    - `process` - v samostatném procesu, nezdržuje ani ostatní vlákna
+    - `inline` - přímo v event loopu
+    """
+    executor = _get_executor()
+    if executor is None:
+        return scraper._parse_offers(html)
+
+    offers = await asyncio.get_running_loop().run_in_executor(executor, _parse, scraper, html)
+
+    if isinstance(executor, ProcessPoolExecutor):
+        # Z jiného procesu se vrátí kopie scraperu, nabídky musí odkazovat na původní
+        for offer in offers:
+            offer.scraper = scraper
+
+    return offers
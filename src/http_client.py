@@ -0,0 +1,739 @@
+"""Sdílený HTTP klient pro scrapery, stahování obrázků a detailů nabídek
+
+Souběžné shodné požadavky (stejná metoda, URL a tělo) se slučují do jednoho
+(single-flight), ostatní volající dostanou stejnou odpověď.
+
+Odpovědi se vyžadují komprimované (gzip, deflate a podle dostupných knihoven i brotli
+a zstd). Pro hosty z `HTTP2_HOSTS` se požadavky posílají přes HTTP/2 (httpx), takže
+se mnoho malých požadavků na stejný server (obrázky z CDN) multiplexuje na jednom spojení.
+
+Požadavky na každý host omezuje `HostRateLimiter` (token bucket). Po odpovědi 429 nebo
+503 se na host nic neposílá po dobu z hlavičky Retry-After, jinak po rostoucí pauzu.
+"""
+import asyncio
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import ssl
+import zlib
+from collections.abc import Iterator
+from dataclasses import dataclass, field, fields
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+from fnmatch import fnmatch
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from aiohttp import ClientSession
+
+import json_decoding
+from config import config
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36"
+
+VOLATILE_PARAMS = {"tms"}
+"""Parametry URL, které se mění s každým požadavkem a pro porovnání URL se ignorují"""
+
+MAX_VALIDATORS = 64
+"""Počet adres, pro které se pamatuje ETag/Last-Modified a poslední odpověď"""
+
+THROTTLING_STATUSES = {429, 503}
+
+COOLDOWN_MIN_SECONDS = 5.0
+COOLDOWN_MAX_SECONDS = 600.0
+"""Pauza hostu po omezení bez Retry-After (zdvojuje se při opakovaném omezení)"""
+
+MAX_THROTTLE_RETRIES = 2
+MAX_THROTTLE_RETRY_SECONDS = 30.0
+"""GET omezený kratší pauzou se po ní zopakuje, delší pauza se projeví až dalším požadavkům"""
+
+
+def normalize_url(url: str) -> str:
+    """URL bez proměnlivých parametrů (`VOLATILE_PARAMS`)"""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in VOLATILE_PARAMS
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+@functools.cache
+def _decompressors() -> dict[str, Any]:
+    """Dekomprese podle hodnoty Content-Encoding, brotli a zstd jen pokud jsou nainstalované"""
+    decompressors: dict[str, Any] = {
+        "gzip": gzip.decompress,
+        "x-gzip": gzip.decompress,
+        "deflate": _inflate,
+    }
+    try:
+        import brotli
+
+        decompressors["br"] = brotli.decompress
+    except ImportError:
+        pass
+    try:
+        import zstandard
+
+        # decompressobj zvládne i rámce bez uvedené velikosti obsahu
+        decompressors["zstd"] = lambda body: (
+            zstandard.ZstdDecompressor().decompressobj().decompress(body)
+        )
+    except ImportError:
+        pass
+    return decompressors
+
+
+def _inflate(body: bytes) -> bytes:
+    # Některé servery posílají deflate bez zlib hlavičky
+    try:
+        return zlib.decompress(body)
+    except zlib.error:
+        return zlib.decompress(body, -zlib.MAX_WBITS)
+
+
+def accept_encoding() -> str:
+    """Hodnota hlavičky Accept-Encoding, nejúspornější kódování první"""
+    preferred = ("zstd", "br", "gzip", "deflate")
+    return ", ".join(e for e in preferred if e in _decompressors())
+
+
+def decode_body(body: bytes, content_encoding: str | None) -> bytes:
+    """Dekomprimuje tělo odpovědi podle hlavičky Content-Encoding
+
+    Raises:
+        ValueError: Server použil kódování, které neumíme dekódovat
+    """
+    if not body or not content_encoding:
+        return body
+
+    # Kódování se uvádějí v pořadí, v jakém byla použita
+    for encoding in reversed([e.strip().lower() for e in content_encoding.split(",")]):
+        if encoding in ("", "identity"):
+            continue
+        if encoding not in _decompressors():
+            raise ValueError(f"Unsupported content encoding '{encoding}'")
+        body = _decompressors()[encoding](body)
+    return body
+
+
+@dataclass
+class HttpResponse:
+    """Celá načtená odpověď serveru"""
+
+    status: int
+    url: str
+    headers: dict[str, str]
+    body: bytes
+    encoding: str = "utf-8"
+
+    wire_size: int | None = None
+    """Velikost těla přenesená po síti (před dekompresí), None pokud není známa"""
+
+    def text(self) -> str:
+        return self.body.decode(self.encoding, errors="replace")
+
+    def json(self) -> Any:
+        return json_decoding.loads(self.body)
+
+    def header(self, name: str) -> str | None:
+        """Hodnota hlavičky bez ohledu na velikost písmen"""
+        name = name.lower()
+        return next((v for k, v in self.headers.items() if k.lower() == name), None)
+
+    def iter_json_items(self, *path: str) -> Iterator[Any]:
+        """Prvky pole na cestě `path` v JSON odpovědi, viz `json_decoding.iter_items`"""
+        return json_decoding.iter_items(self.body, path)
+
+
+@dataclass
+class HttpStats:
+    """Počítadla HTTP klienta od posledního vynulování"""
+
+    requests: int = 0
+    """Požadavky skutečně odeslané na server"""
+
+    coalesced: int = 0
+    """Požadavky obsloužené již běžícím shodným požadavkem"""
+
+    not_modified: int = 0
+    """Podmíněné požadavky, na které server odpověděl 304 (použila se uložená odpověď)"""
+
+    bytes_received: int = 0
+    """Velikost těl odpovědí po dekompresi"""
+
+    bytes_transferred: int = 0
+    """Velikost těl odpovědí přenesená po síti"""
+
+    throttled: int = 0
+    """Odpovědi 429/503, po kterých se host na čas přestal dotazovat"""
+
+    rate_limit_wait: float = 0.0
+    """Celkový čas [s], který požadavky čekaly na omezovač rychlosti hostů"""
+
+    def summary(self) -> str:
+        return ", ".join(
+            f"{f.name}: {value:.1f}" if isinstance(value := getattr(self, f.name), float)
+            else f"{f.name}: {value}"
+            for f in fields(self)
+        )
+
+    def reset(self):
+        for f in fields(self):
+            setattr(self, f.name, 0)
+
+
+RequestKey = tuple[str, str, str | None, str | None, str | None]
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Počet sekund z hlavičky Retry-After (číslo nebo HTTP datum)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class HostBucket:
+    """Stav omezovače pro jeden host"""
+
+    rate: float
+    """Požadavků za sekundu, 0 = bez omezení"""
+
+    capacity: float
+    tokens: float
+    updated: float = field(default_factory=monotonic)
+
+    blocked_until: float = 0.0
+    """Do kdy (monotonic) se na host po omezení neposílají požadavky"""
+
+    cooldown: float = 0.0
+    """Poslední pauza po omezení, po úspěšné odpovědi se vynuluje"""
+
+    waited: float = 0.0
+    """Celkový čas [s], který požadavky na host čekaly"""
+
+
+class HostRateLimiter:
+    """Token bucket pro každý host a pauza po odpovědích 429/503
+
+    Args:
+        rate (float): Požadavků za sekundu na jeden host, 0 = bez omezení
+        burst (int): Kolik požadavků lze poslat najednou po delší nečinnosti
+        overrides (list[tuple[str, float]] | None): Vzory hostů (viz `fnmatch`)
+            s vlastní rychlostí, použije se první odpovídající
+    """
+
+    def __init__(
+        self, rate: float, burst: int, overrides: list[tuple[str, float]] | None = None
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or []
+        self.buckets: dict[str, HostBucket] = {}
+
+    def bucket(self, url: str) -> HostBucket:
+        host = (urlsplit(url).hostname or "").lower()
+        if host not in self.buckets:
+            rate = next((r for p, r in self.overrides if fnmatch(host, p)), self.rate)
+            capacity = max(1.0, float(self.burst))
+            self.buckets[host] = HostBucket(rate, capacity, capacity)
+        return self.buckets[host]
+
+    async def acquire(self, url: str) -> float:
+        """Počká, až je možné poslat požadavek na host
+
+        Returns:
+            float: Doba čekání v sekundách
+        """
+        bucket = self.bucket(url)
+        start = monotonic()
+
+        while True:
+            now = monotonic()
+            if bucket.blocked_until > now:
+                await asyncio.sleep(bucket.blocked_until - now)
+                continue
+
+            if not bucket.rate:
+                break
+
+            bucket.tokens = min(
+                bucket.capacity, bucket.tokens + (now - bucket.updated) * bucket.rate
+            )
+            bucket.updated = now
+            if bucket.tokens >= 1:
+                bucket.tokens -= 1
+                break
+            await asyncio.sleep((1 - bucket.tokens) / bucket.rate)
+
+        waited = monotonic() - start
+        bucket.waited += waited
+        return waited
+
+    def throttled(self, url: str, retry_after: float | None) -> float:
+        """Zaznamená omezení serverem a zastaví požadavky na host
+
+        Returns:
+            float: Délka pauzy v sekundách
+        """
+        bucket = self.bucket(url)
+        if retry_after is None:
+            retry_after = max(bucket.cooldown * 2, COOLDOWN_MIN_SECONDS)
+        bucket.cooldown = min(retry_after, COOLDOWN_MAX_SECONDS)
+        bucket.blocked_until = max(bucket.blocked_until, monotonic() + bucket.cooldown)
+        return bucket.cooldown
+
+    def succeeded(self, url: str):
+        self.bucket(url).cooldown = 0.0
+
+    def wait_summary(self) -> str:
+        """Hosty, na které se čekalo, od nejdelšího čekání"""
+        waits = sorted(
+            ((host, b.waited) for host, b in self.buckets.items() if b.waited >= 0.05),
+            key=lambda item: -item[1],
+        )
+        return ", ".join(f"{host}: {waited:.1f}s" for host, waited in waits)
+
+    def reset_stats(self):
+        for bucket in self.buckets.values():
+            bucket.waited = 0.0
+
+
+def create_rate_limiter() -> HostRateLimiter:
+    """Omezovač podle `config.host_rate_limit`, `host_rate_burst` a `host_rate_limits`"""
+    overrides = []
+    for item in (config.host_rate_limits or "").split(","):
+        if item.strip():
+            pattern, _, rate = item.partition("=")
+            overrides.append((pattern.strip().lower(), float(rate)))
+    return HostRateLimiter(config.host_rate_limit, config.host_rate_burst, overrides)
+
+
+class Transport:
+    """Způsob, jakým se požadavek skutečně odešle (síť, záznam, přehrání záznamu...)"""
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> HttpResponse:
+        raise NotImplementedError()
+
+    async def close(self):
+        pass
+
+
+class AiohttpTransport(Transport):
+    """Odesílání přes aiohttp (HTTP/1.1), spojení se vytvoří až při prvním požadavku
+
+    Odpovědi se dekomprimují až po načtení, aby byla známa velikost přenesených dat.
+    """
+
+    def __init__(self, headers: dict[str, str], encodings: str | None = None):
+        self.headers = {"Accept-Encoding": encodings or accept_encoding(), **headers}
+        self._session: ClientSession | None = None
+
+    def _get_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(headers=self.headers, auto_decompress=False)
+        return self._session
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> HttpResponse:
+        async with self._get_session().request(
+            method, url, data=data, headers=headers, cookies=cookies
+        ) as response:
+            body = await response.read()
+            return HttpResponse(
+                status=response.status,
+                url=str(response.url),
+                headers=dict(response.headers),
+                body=decode_body(body, response.headers.get("Content-Encoding")),
+                encoding=response.charset or "utf-8",
+                wire_size=len(body),
+            )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class HttpxTransport(Transport):
+    """Odesílání přes httpx s HTTP/2, požadavky na jeden server sdílí jedno spojení
+
+    httpx a h2 jsou volitelné závislosti (`pip install httpx[http2]`). HTTP/2 se
+    vyjedná přes TLS (ALPN), server bez podpory HTTP/2 se obslouží přes HTTP/1.1.
+    Přesměrování se sledují stejně jako v `AiohttpTransport`.
+
+    Args:
+        headers (dict[str, str]): Hlavičky posílané s každým požadavkem
+        verify (ssl.SSLContext | bool): Ověření certifikátu serveru (viz httpx)
+    """
+
+    def __init__(self, headers: dict[str, str], verify: ssl.SSLContext | bool = True):
+        import httpx  # noqa: F401 - chybějící závislost se ohlásí už při vytvoření
+        import h2  # noqa: F401
+
+        self.headers = {"Accept-Encoding": accept_encoding(), **headers}
+        self.verify = verify
+        self._client = None
+
+    def _get_client(self):
+        import httpx
+
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=True, headers=self.headers, follow_redirects=True, verify=self.verify
+            )
+        return self._client
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> HttpResponse:
+        if cookies:
+            cookie = "; ".join(f"{k}={v}" for k, v in cookies.items())
+            headers = {**(headers or {}), "Cookie": cookie}
+
+        response = await self._get_client().request(method, url, content=data, headers=headers)
+        # httpx dekomprimuje sám, num_bytes_downloaded je velikost před dekompresí
+        body = await response.aread()
+        return HttpResponse(
+            status=response.status_code,
+            url=str(response.url),
+            headers=dict(response.headers),
+            body=body,
+            encoding=response.charset_encoding or "utf-8",
+            wire_size=response.num_bytes_downloaded,
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class HostRoutingTransport(Transport):
+    """Vybírá transport podle hostu v URL
+
+    Args:
+        default (Transport): Transport pro hosty, které neodpovídají žádnému vzoru
+        routes (list[tuple[str, Transport]]): Vzory hostů (`*.sdn.cz`, viz `fnmatch`)
+            a jejich transporty, použije se první odpovídající
+    """
+
+    def __init__(self, default: Transport, routes: list[tuple[str, Transport]]):
+        self.default = default
+        self.routes = routes
+
+    def transport_for(self, url: str) -> Transport:
+        host = (urlsplit(url).hostname or "").lower()
+        return next((t for pattern, t in self.routes if fnmatch(host, pattern)), self.default)
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> HttpResponse:
+        return await self.transport_for(url).send(method, url, data, headers, cookies)
+
+    async def close(self):
+        transports = {id(t): t for t in [self.default, *(t for _, t in self.routes)]}
+        for transport in transports.values():
+            await transport.close()
+
+
+class HostOverrideTransport(Transport):
+    """Přesměruje všechny požadavky na jeden server, původní host se předá v cestě
+
+    Např. `https://www.sreality.cz/api/...` se odešle na `http://127.0.0.1:8080/www.sreality.cz/api/...`.
+    Slouží pro testy proti lokálnímu náhradnímu serveru (`synthetic_portal.py`).
+    """
+
+    def __init__(self, inner: Transport, target: str):
+        self.inner = inner
+        self.target = target.rstrip("/")
+
+    def rewrite_url(self, url: str) -> str:
+        parts = urlsplit(url)
+        return urlunsplit(
+            urlsplit(self.target)._replace(
+                path=f"/{parts.netloc}{parts.path or '/'}", query=parts.query
+            )
+        )
+
+    async def send(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> HttpResponse:
+        return await self.inner.send(method, self.rewrite_url(url), data, headers, cookies)
+
+    async def close(self):
+        await self.inner.close()
+
+
+class HttpClient:
+    """HTTP klient sdílený celou aplikací"""
+
+    def __init__(
+        self,
+        headers: dict[str, str] | None = None,
+        transport: Transport | None = None,
+        stats: HttpStats | None = None,
+        validators: dict[str, HttpResponse] | None = None,
+        rate_limiter: HostRateLimiter | None = None,
+    ):
+        self.headers = headers or {"User-Agent": USER_AGENT}
+        self.transport = transport or create_transport(self.headers)
+        self.stats = stats or HttpStats()
+
+        self.rate_limiter = rate_limiter
+        """Omezení požadavků na host, None = bez omezení (např. při přehrávání záznamu)"""
+
+        self.validators: dict[str, HttpResponse] = validators if validators is not None else {}
+        """Poslední odpovědi s ETag/Last-Modified podle URL (bez `VOLATILE_PARAMS`)"""
+
+        self._in_flight: dict[RequestKey, asyncio.Task[HttpResponse]] = {}
+
+    async def __aenter__(self) -> "HttpClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        await self.transport.close()
+
+    def with_transport(self, transport: Transport) -> "HttpClient":
+        """Klient se stejnými hlavičkami, statistikami a omezovačem, ale jiným způsobem
+        odesílání
+
+        Zavřením vráceného klienta se zavře jen `transport`.
+        """
+        return HttpClient(
+            self.headers, transport, self.stats, self.validators, self.rate_limiter
+        )
+
+    @staticmethod
+    def _request_key(
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> RequestKey:
+        return (
+            method,
+            url,
+            hashlib.sha1(data).hexdigest() if data else None,
+            json.dumps(headers, sort_keys=True) if headers else None,
+            json.dumps(cookies, sort_keys=True) if cookies else None,
+        )
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        data: bytes | None = None,
+        json_data: Any = None,
+        headers: dict[str, str] | None = None,
+        cookies: dict[str, str] | None = None,
+        conditional: bool = False,
+    ) -> HttpResponse:
+        """Odešle požadavek a načte celou odpověď
+
+        Pokud už běží shodný požadavek (včetně hlaviček), počká se na jeho výsledek místo
+        odeslání dalšího. Požadavek běží v samostatné úloze, takže zrušení kteréhokoli
+        volajícího neruší ostatní čekající.
+        Podmíněný GET požadavek pošle ETag/Last-Modified z poslední odpovědi a při
+        odpovědi 304 vrátí tuto uloženou odpověď.
+
+        Args:
+            method (str): HTTP metoda
+            url (str): Adresa
+            data (bytes | None): Tělo požadavku
+            json_data (Any): Tělo požadavku, které se zakóduje jako JSON
+            headers (dict[str, str] | None): Další hlavičky
+            cookies (dict[str, str] | None): Cookies
+            conditional (bool): Použít podmíněný požadavek (jen pro GET)
+
+        Returns:
+            HttpResponse: Odpověď serveru
+        """
+        if json_data is not None:
+            data = json.dumps(json_data).encode()
+            headers = {"Content-Type": "application/json", **(headers or {})}
+
+        key = self._request_key(method, url, data, headers, cookies)
+        task = self._in_flight.get(key)
+
+        if task is not None:
+            self.stats.coalesced += 1
+        else:
+            task = asyncio.create_task(
+                self._fetch(method, url, data, headers, cookies, conditional and method == "GET")
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._request_done(key, t))
+
+        return await asyncio.shield(task)
+
+    def _request_done(self, key: RequestKey, task: asyncio.Task[HttpResponse]):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Pokud byli všichni volající zrušeni, výjimku nikdo nepřevezme
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+        conditional: bool = False,
+    ) -> HttpResponse:
+        validator_key = normalize_url(url) if conditional else None
+        cached = self.validators.get(validator_key) if conditional else None
+        if cached is not None:
+            headers = {**(headers or {}), **self._conditional_headers(cached)}
+
+        response = await self._send_limited(method, url, data, headers, cookies)
+
+        if cached is not None and response.status == 304:
+            self.stats.not_modified += 1
+            return cached
+
+        if conditional and response.status == 200 and self._conditional_headers(response):
+            self.validators.pop(validator_key, None)
+            self.validators[validator_key] = response
+            while len(self.validators) > MAX_VALIDATORS:
+                del self.validators[next(iter(self.validators))]
+
+        return response
+
+    async def _send_limited(
+        self,
+        method: str,
+        url: str,
+        data: bytes | None,
+        headers: dict[str, str] | None,
+        cookies: dict[str, str] | None,
+    ) -> HttpResponse:
+        """Odešle požadavek přes omezovač, GET po krátké pauze za omezení zopakuje"""
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            if self.rate_limiter is not None:
+                self.stats.rate_limit_wait += await self.rate_limiter.acquire(url)
+
+            self.stats.requests += 1
+            logging.debug(f"{method} {url}")
+            response = await self.transport.send(method, url, data, headers, cookies)
+            self.stats.bytes_received += len(response.body)
+            self.stats.bytes_transferred += (
+                len(response.body) if response.wire_size is None else response.wire_size
+            )
+
+            if response.status not in THROTTLING_STATUSES:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.succeeded(url)
+                return response
+
+            self.stats.throttled += 1
+            if self.rate_limiter is None:
+                return response
+
+            cooldown = self.rate_limiter.throttled(
+                url, parse_retry_after(response.header("Retry-After"))
+            )
+            logging.warning(
+                f"{urlsplit(url).hostname} responded with {response.status}, "
+                f"pausing requests to it for {cooldown:.1f}s"
+            )
+
+            if method != "GET" or cooldown > MAX_THROTTLE_RETRY_SECONDS:
+                return response
+
+        return response
+
+    @staticmethod
+    def _conditional_headers(response: HttpResponse) -> dict[str, str]:
+        headers = {}
+        if etag := response.header("ETag"):
+            headers["If-None-Match"] = etag
+        if last_modified := response.header("Last-Modified"):
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    async def get(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HttpResponse:
+        return await self.request("POST", url, **kwargs)
+
+
+def create_transport(headers: dict[str, str]) -> Transport:
+    """Transport podle `config.http2_hosts`
+
+    Hosty z čárkami odděleného seznamu vzorů se obslouží přes HTTP/2, ostatní přes
+    aiohttp. Pokud httpx nebo h2 chybí, použije se pro všechny hosty aiohttp.
+    """
+    default = AiohttpTransport(headers)
+    if not config.http2_hosts:
+        return default
+
+    try:
+        http2 = HttpxTransport(headers)
+    except ImportError:
+        logging.warning("HTTP2_HOSTS is set but httpx[http2] is not installed, using HTTP/1.1")
+        return default
+
+    patterns = [p.strip().lower() for p in config.http2_hosts.split(",") if p.strip()]
+    return HostRoutingTransport(default, [(pattern, http2) for pattern in patterns])
+
+
+_http_client: HttpClient | None = None
+
+
+def get_http_client() -> HttpClient:
+    """Vrátí sdílenou instanci HTTP klienta pro tento proces"""
+    global _http_client
+    if _http_client is None:
+        _http_client = HttpClient(rate_limiter=create_rate_limiter())
+    return _http_client
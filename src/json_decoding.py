@@ -0,0 +1,141 @@
+"""Dekódování JSON odpovědí serverů
+
+Knihovna pro dekódování se volí přes `config.json_decoder` (`auto` použije nejrychlejší
+nainstalovanou: orjson, msgspec, jinak standardní `json`). Velká pole nabídek lze navíc
+procházet postupně bez sestavení celého stromu odpovědi (`iter_items`).
+"""
+import functools
+import json
+import re
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from config import config
+
+BACKENDS = ("orjson", "msgspec", "json")
+
+STREAMING_MIN_BYTES = 4 * 1024 * 1024
+"""Od jaké velikosti odpovědi `iter_items` prochází pole postupně (v režimu `auto`)
+
+U menších odpovědí je rychlejší dekódovat vše najednou (zvlášť s orjson), postupné
+procházení šetří hlavně paměť.
+"""
+
+_decoder = json.JSONDecoder()
+_WHITESPACE_RE = re.compile(r"[ \t\n\r]*")
+
+
+@functools.cache
+def _load_backend(name: str) -> Callable[[bytes], Any]:
+    if name == "orjson":
+        import orjson
+
+        return orjson.loads
+    if name == "msgspec":
+        import msgspec
+
+        return msgspec.json.Decoder().decode
+    if name == "json":
+        return json.loads
+
+    raise ValueError(f"Unknown JSON decoder '{name}'")
+
+
+@functools.cache
+def _resolve_backend(name: str) -> Callable[[bytes], Any]:
+    if name != "auto":
+        return _load_backend(name)
+
+    for backend in BACKENDS:
+        try:
+            return _load_backend(backend)
+        except ImportError:
+            continue
+
+    raise AssertionError("The json module is always available")
+
+
+def loads(body: bytes | str) -> Any:
+    """Dekóduje JSON knihovnou podle `config.json_decoder`"""
+    return _resolve_backend(config.json_decoder)(body)
+
+
+def iter_items(body: bytes, path: tuple[str, ...]) -> Iterator[Any]:
+    """Projde prvky pole na cestě `path` (klíče vnořených objektů)
+
+    Podle `config.json_streaming` se buď dekóduje celá odpověď, nebo se pole prochází
+    postupně: dekóduje se vždy jen jeden prvek a ostatní části odpovědi před polem se
+    přeskočí, takže se nikdy nedrží celý strom v paměti.
+
+    Args:
+        body (bytes): Tělo odpovědi
+        path (tuple[str, ...]): Cesta k poli, např. `("data", "offers")`
+
+    Returns:
+        Iterator[Any]: Dekódované prvky pole
+    """
+    streaming = config.json_streaming
+    if streaming == "auto":
+        streaming = len(body) >= STREAMING_MIN_BYTES
+
+    if not streaming:
+        data = loads(body)
+        for key in path:
+            data = data[key]
+        return iter(data)
+
+    return _stream_array(body.decode("utf-8"), path)
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _WHITESPACE_RE.match(text, pos).end()
+
+
+def _expect(text: str, pos: int, char: str):
+    if pos >= len(text) or text[pos] != char:
+        raise json.JSONDecodeError(f"Expecting '{char}'", text, pos)
+
+
+def _find_member(text: str, pos: int, key: str) -> int:
+    """Vrátí pozici hodnoty klíče `key` v objektu začínajícím na `pos`"""
+    _expect(text, pos, "{")
+    pos = _skip_whitespace(text, pos + 1)
+
+    while pos < len(text) and text[pos] != "}":
+        name, pos = _decoder.raw_decode(text, pos)
+        pos = _skip_whitespace(text, pos)
+        _expect(text, pos, ":")
+        pos = _skip_whitespace(text, pos + 1)
+
+        if name == key:
+            return pos
+
+        # Hodnoty ostatních klíčů se přeskočí (dekódují se v C a zahodí)
+        _, pos = _decoder.raw_decode(text, pos)
+        pos = _skip_whitespace(text, pos)
+        if pos < len(text) and text[pos] == ",":
+            pos = _skip_whitespace(text, pos + 1)
+
+    raise KeyError(key)
+
+
+def _stream_array(text: str, path: tuple[str, ...]) -> Iterator[Any]:
+    pos = _skip_whitespace(text, 0)
+    for key in path:
+        pos = _find_member(text, pos, key)
+
+    _expect(text, pos, "[")
+    pos = _skip_whitespace(text, pos + 1)
+    if pos < len(text) and text[pos] == "]":
+        return
+
+    while True:
+        item, pos = _decoder.raw_decode(text, pos)
+        yield item
+
+        pos = _skip_whitespace(text, pos)
+        if pos < len(text) and text[pos] == ",":
+            pos = _skip_whitespace(text, pos + 1)
+        else:
+            _expect(text, pos, "]")
+            return
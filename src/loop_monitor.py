@@ -0,0 +1,123 @@
+"""Sledování zpoždění event loopu
+
+Do event loopu se pravidelně plánuje krátký heartbeat. Samostatné vlákno hlídá, kdy
+heartbeat naposledy proběhl; pokud se zpozdí o víc než `config.loop_lag_threshold_ms`,
+zaloguje korutinu a místo v kódu, které loop právě blokuje. Po uvolnění loopu se zaloguje
+celková doba zablokování.
+"""
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, fields
+
+from config import config
+
+HEARTBEAT_INTERVAL_SECONDS = 0.1
+
+
+@dataclass
+class LoopLagStats:
+    """Statistiky zpoždění event loopu od posledního vynulování"""
+
+    max_lag_ms: float = 0
+    stalls: int = 0
+    """Kolikrát zpoždění překročilo `config.loop_lag_threshold_ms`"""
+
+    def summary(self) -> str:
+        return f"max lag: {self.max_lag_ms:.0f} ms, stalls: {self.stalls}"
+
+    def reset(self):
+        for f in fields(self):
+            setattr(self, f.name, 0)
+
+
+class LoopLagMonitor:
+    """Hlídá odezvu event loopu, ve kterém byl spuštěn"""
+
+    def __init__(self):
+        self.stats = LoopLagStats()
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._last_beat = time.monotonic()
+        self._reported_stall = False
+
+    def start(self):
+        """Spustí heartbeat v běžícím event loopu a hlídací vlákno"""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+
+        self._heartbeat_task = self._loop.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + HEARTBEAT_INTERVAL_SECONDS
+            await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+            now = time.monotonic()
+
+            lag_ms = (now - expected) * 1000
+            self.stats.max_lag_ms = max(self.stats.max_lag_ms, lag_ms)
+            self._last_beat = now
+
+            if self._reported_stall:
+                self._reported_stall = False
+                logging.warning(f"Event loop was blocked for {lag_ms:.0f} ms")
+
+    def _watch(self):
+        while not self._stopped.wait(HEARTBEAT_INTERVAL_SECONDS):
+            threshold_ms = config.loop_lag_threshold_ms
+            if threshold_ms <= 0 or self._reported_stall:
+                continue
+
+            lag_ms = (time.monotonic() - self._last_beat - HEARTBEAT_INTERVAL_SECONDS) * 1000
+            if lag_ms > threshold_ms:
+                self._reported_stall = True
+                self.stats.stalls += 1
+                logging.warning(
+                    f"Event loop blocked for {lag_ms:.0f} ms by {self._describe_blocker()}"
+                )
+
+    def _describe_blocker(self) -> str:
+        """Korutina běžící v event loopu a místo, kde se v kódu právě nachází"""
+        task = asyncio.current_task(self._loop) if self._loop else None
+        coroutine = task.get_coro() if task else None
+        name = getattr(coroutine, "__qualname__", None) or "unknown coroutine"
+
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return name
+
+        location = traceback.extract_stack(frame)[-1]
+        return f"{name} at {location.filename}:{location.lineno} ({location.name})"
+
+
+_loop_monitor: LoopLagMonitor | None = None
+
+
+def start_loop_monitor() -> LoopLagMonitor:
+    """Spustí sledování běžícího event loopu (jen jednou za proces)"""
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopLagMonitor()
+        _loop_monitor.start()
+    return _loop_monitor
+
+
+def get_loop_monitor() -> LoopLagMonitor | None:
+    return _loop_monitor
@@ -1,39 +1,66 @@
 #!/usr/bin/evn python3
 import logging
-from datetime import datetime, timezone
 from time import time
 
 import discord
 from discord.ext import tasks
 
 from config import config
-from transformations import deduplicate_offers, filter_offers
+from config_watcher import INTERVAL_FIELDS, SCRAPER_FIELDS, ConfigWatcher
+from digest import build_digest_embeds, create_digest_sender, digest_enabled
 from discord_logger import DiscordLogger
+from embeds import build_embed
+from http_client import get_http_client
+from distributed import create_coordinator
+from loop_monitor import start_loop_monitor
+from profiling import install_signal_handler
 from offers_storage import OffersStorage
-from scrapers_manager import create_scrapers, fetch_latest_offers
+from outbox import Outbox, OutboxSender
+from pipeline import get_outbox_path, get_refresh_interval, run_cycle
+from scrapers.rental_offer import RentalOffer
+from scrapers_manager import create_scrapers
+from snapshot import warm_start
 import asyncio
 
 
-def get_refresh_interval() -> int:
-    if datetime.now().hour in range(6, 22):
-        return config.refresh_interval_daytime_minutes
-    else:
-        return config.refresh_interval_nighttime_minutes
+class Client(discord.Client):
+    async def close(self):
+        await super().close()
+        await get_http_client().close()
 
 
-client = discord.Client(intents=discord.Intents.default())
+client = Client(intents=discord.Intents.default())
 interval_time = get_refresh_interval()
 
 scrapers = create_scrapers(config.dispositions)
+config_watcher = ConfigWatcher()
+started = False
 
 
 @client.event
 async def on_ready():
-    global channel, storage
+    global channel, storage, coordinator, outbox, sender, sender_task, started
 
     dev_channel = client.get_channel(config.discord_dev_channel)
     channel = client.get_channel(config.discord_offers_channel)
-    storage = OffersStorage(config.found_offers_file)
+
+    # on_ready přichází i po každém obnovení spojení s gateway, úlohy se spouští jen jednou
+    if started:
+        logging.info("Reconnected to Discord")
+        return
+    started = True
+
+    storage = OffersStorage(config.found_offers_file, warm_start())
+    coordinator = create_coordinator()
+    outbox = Outbox(get_outbox_path(), ["discord"])
+    if digest_enabled():
+        sender = create_digest_sender(outbox, "discord", send_digest, scrapers)
+    else:
+        sender = OutboxSender(outbox, "discord", send_offers, scrapers, config.embed_batch_size)
+    # Odešle i nabídky, které zůstaly ve frontě z minulého běhu
+    sender_task = asyncio.create_task(sender.run())
+    start_loop_monitor()
+    install_signal_handler()
 
     if not config.debug:
         discord_error_logger = DiscordLogger(client, dev_channel, logging.ERROR)
@@ -47,48 +74,56 @@ async def on_ready():
 
     process_latest_offers.start()
 
+    if config.config_reload_interval_seconds > 0:
+        watch_config.change_interval(seconds=config.config_reload_interval_seconds)
+        watch_config.start()
+
+
+@tasks.loop(seconds=30)
+async def watch_config():
+    # Výjimka by tasks.loop zastavila natrvalo a změny konfigurace by se přestaly načítat
+    try:
+        apply_config_changes(config_watcher.check())
+    except Exception:
+        logging.exception("Applying configuration changes failed, watching continues")
+
+
+def apply_config_changes(changed: set[str]):
+    if "debug" in changed:
+        logging.getLogger().setLevel(logging.DEBUG if config.debug else logging.INFO)
+
+    if changed & SCRAPER_FIELDS:
+        # Seznam se nahrazuje na místě, aby běžící smyčka viděla nové scrapery
+        try:
+            scrapers[:] = create_scrapers(config.dispositions)
+            logging.info("Scrapers rebuilt after configuration change")
+        except Exception:
+            logging.exception("Failed to rebuild scrapers, keeping the previous ones")
+
+    if changed & INTERVAL_FIELDS:
+        global interval_time
+        interval_time = get_refresh_interval()
+        logging.info("Fetching latest offers every {} minutes".format(interval_time))
+        process_latest_offers.change_interval(minutes=interval_time)
+
+    if "config_reload_interval_seconds" in changed:
+        if config.config_reload_interval_seconds > 0:
+            watch_config.change_interval(seconds=config.config_reload_interval_seconds)
+        else:
+            logging.info("Configuration watching disabled")
+            watch_config.stop()
+
 
 @tasks.loop(minutes=interval_time)
 async def process_latest_offers():
     logging.info("Fetching offers")
 
-    all_offers = await fetch_latest_offers(scrapers)
-    new_offers = [o for o in all_offers if not storage.contains(o)]
-    first_time = storage.first_time
-    storage.save_offers(new_offers)
-    filtered = filter_offers(new_offers)
-    deduplicated = await deduplicate_offers(filtered)
+    result = await run_cycle(scrapers, storage, coordinator, outbox)
 
-    logging.info(
-        f"Offers fetched (all: {len(all_offers)}, new: {len(new_offers)}, "
-        f"filtered: {len(filtered)}, deduplicated: {len(deduplicated)})"
-    )
+    logging.info(f"Offers fetched ({result.summary()})")
 
-    if not first_time:
-        for offer_batch in chunk_offers(deduplicated, config.embed_batch_size):
-            embeds = []
-
-            for offer in offer_batch:
-                embed = discord.Embed(
-                    title=offer.title,
-                    url=offer.link,
-                    description=offer.location,
-                    timestamp=datetime.now(tz=timezone.utc),
-                    color=offer.scraper.color,
-                )
-                embed.add_field(name="Cena", value=f"{offer.price} Kč")
-                embed.set_author(
-                    name=offer.scraper.name, icon_url=offer.scraper.logo_url
-                )
-                embed.set_image(url=offer.image_url)
-
-                for duplicate in offer.duplicate_offers:
-                    embed.add_field(name="Alternativní odkaz", value=duplicate.link)
-
-                embeds.append(embed)
-
-            await retry_until_successful_send(channel, embeds)
-            await asyncio.sleep(1.5)
+    if not result.first_time:
+        sender.wake()
     else:
         logging.info("No previous offers, first fetch is running silently")
 
@@ -101,29 +136,19 @@ async def process_latest_offers():
     await retry_until_successful_edit(channel, f"Last update <t:{int(time())}:R>")
 
 
-async def retry_until_successful_send(
-    channel: discord.TextChannel, embeds: list[discord.Embed], delay: float = 5.0
-):
-    """Retry sending a message with embeds until it succeeds."""
-    while True:
-        try:
-            await channel.send(embeds=embeds)
-            logging.info("Embeds successfully sent.")
-            return
-        except discord.errors.DiscordServerError as e:
-            logging.warning(
-                f"Discord server error while sending embeds: {e}. Retrying in {delay:.1f}s."
-            )
-        except discord.errors.HTTPException as e:
-            logging.warning(
-                f"HTTPException while sending embeds: {e}. Retrying in {delay:.1f}s."
-            )
-        except Exception as e:
-            logging.exception(
-                f"Unexpected error while sending embeds: {e}. Retrying in {delay:.1f}s."
-            )
-            raise e
-        await asyncio.sleep(delay)
+async def send_offers(offers: list[RentalOffer]):
+    """Send one batch of offers from the outbox, retries are handled by the sender."""
+    await channel.send(embeds=[discord.Embed.from_dict(build_embed(offer)) for offer in offers])
+    logging.info("Embeds successfully sent.")
+    await asyncio.sleep(1.5)
+
+
+async def send_digest(offers: list[RentalOffer]):
+    """Send one digest message, the sender splits queued offers into messages."""
+    embeds = build_digest_embeds(offers)
+    await channel.send(embeds=[discord.Embed.from_dict(embed) for embed in embeds])
+    logging.info(f"Digest of {len(offers)} offers successfully sent.")
+    await asyncio.sleep(1.5)
 
 
 async def retry_until_successful_edit(
@@ -151,11 +176,6 @@ async def retry_until_successful_edit(
         await asyncio.sleep(delay)
 
 
-def chunk_offers(offers, size):
-    for i in range(0, len(offers), size):
-        yield offers[i : i + size]
-
-
 if __name__ == "__main__":
     logging.basicConfig(
         level=(logging.DEBUG if config.debug else logging.INFO),
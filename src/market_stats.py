@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""Průběžné statistiky nájmů podle dispozice a lokality
+
+Statistiky se aktualizují při každém uložení nových nabídek, takže je není nutné počítat
+znovu z celé historie. Pro každou kombinaci dispozice a lokality (a souhrnně pro každou
+dispozici, lokalitu i celý trh) se drží jen několik čísel: počet, součet, minimum,
+maximum a odhad mediánu algoritmem P² (pět bodů na veličinu) pro:
+
+- cenu nájmu
+- cenu za m² (jen nabídky se známou plochou)
+- dobu, po kterou byla nabídka vidět ve výpisu serveru (od nalezení do zmizení z výpisu;
+  scrapery stahují jen nejnovější nabídky, jde tedy o dolní odhad doby na trhu)
+
+Pro měření doby ve výpisu se navíc pamatují nabídky, které jsou ve výpisu právě teď.
+
+Výpis: `python3 src/market_stats.py [--by disposition|district|both] [--format table|csv|json]`
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+
+from config import config, data_path
+from fingerprint import OfferFingerprint, parse_area, parse_disposition, parse_price
+from scrapers.rental_offer import RentalOffer
+
+ALL = "*"
+"""Souhrnný klíč pro všechny dispozice nebo lokality"""
+
+UNKNOWN = "?"
+"""Dispozice nebo lokalita, kterou nelze z nabídky zjistit"""
+
+STATS_VERSION = 1
+
+LISTED_MAX_AGE_SECONDS = 30 * 24 * 3600
+"""Nabídky scraperu, který už dlouho nic nevrátil, se přestanou sledovat (bez započtení)"""
+
+_DISTRICT_RE = re.compile(r"brno\s*[-–]\s*([^,]+)", re.IGNORECASE)
+
+
+def parse_district(location: str) -> str | None:
+    """Městská část z lokality ve tvaru `ulice, Brno - část` nebo `Brno-část`"""
+    match = _DISTRICT_RE.search(location)
+    if not match:
+        return None
+
+    district = match.group(1).strip()
+    if district.lower().startswith(("město", "mesto", "venkov")):
+        return None
+    return district
+
+
+class P2Quantile:
+    """Odhad kvantilu algoritmem P² (Jain, Chlamtac) v konstantní paměti
+
+    Prvních pět hodnot se ukládá přímo, dál se udržuje pět značek, jejichž výšky
+    se posouvají podle parabolické interpolace.
+    """
+
+    def __init__(self, p: float = 0.5):
+        self.p = p
+        self.heights: list[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float):
+        q, n = self.heights, self.positions
+
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self._increments[i]
+
+        for i in range(1, 4):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                height = self._parabolic(i, step)
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = height
+                n[i] += step
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self.heights, self.positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float | None:
+        if not self.heights:
+            return None
+        if len(self.heights) < 5:
+            return self.heights[round(self.p * (len(self.heights) - 1))]
+        return self.heights[2]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "p": self.p,
+            "heights": self.heights,
+            "positions": self.positions,
+            "desired": self.desired,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "P2Quantile":
+        quantile = cls(data["p"])
+        quantile.heights = data["heights"]
+        quantile.positions = data["positions"]
+        quantile.desired = data["desired"]
+        return quantile
+
+
+@dataclass
+class Summary:
+    """Počet, průměr, rozsah a medián jedné veličiny"""
+
+    count: int = 0
+    total: float = 0.0
+    minimum: float | None = None
+    maximum: float | None = None
+    median: P2Quantile = field(default_factory=P2Quantile)
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        self.median.add(value)
+
+    @property
+    def mean(self) -> float | None:
+        return self.total / self.count if self.count else None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "median": self.median.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Summary":
+        return cls(
+            data["count"],
+            data["total"],
+            data["minimum"],
+            data["maximum"],
+            P2Quantile.from_dict(data["median"]),
+        )
+
+
+@dataclass
+class BucketStats:
+    """Statistiky jedné kombinace dispozice a lokality"""
+
+    price: Summary = field(default_factory=Summary)
+    price_per_m2: Summary = field(default_factory=Summary)
+    days_listed: Summary = field(default_factory=Summary)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "price": self.price.to_dict(),
+            "price_per_m2": self.price_per_m2.to_dict(),
+            "days_listed": self.days_listed.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "BucketStats":
+        return cls(
+            Summary.from_dict(data["price"]),
+            Summary.from_dict(data["price_per_m2"]),
+            Summary.from_dict(data["days_listed"]),
+        )
+
+
+def _bucket_keys(disposition: str, district: str) -> list[tuple[str, str]]:
+    return [(disposition, district), (disposition, ALL), (ALL, district), (ALL, ALL)]
+
+
+class MarketStats:
+    """Statistiky trhu uložené v JSON souboru"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        """Cesta k souboru se statistikami"""
+
+        self.buckets: dict[tuple[str, str], BucketStats] = {}
+        self.since: float = time.time()
+        """Od kdy se statistiky sbírají"""
+
+        self._listed: dict[str, list] = {}
+        """Nabídky právě ve výpisu: odkaz -> [dispozice, lokalita, scraper, nalezena, naposledy]"""
+
+        try:
+            with open(path) as stats_file:
+                data = json.load(stats_file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Cannot read market stats from {path} ({e}), starting over")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != STATS_VERSION:
+            logging.warning(f"Unsupported market stats version in {path}, starting over")
+            return
+
+        try:
+            since = data["since"]
+            buckets = {
+                (b["disposition"], b["district"]): BucketStats.from_dict(b["stats"])
+                for b in data["buckets"]
+            }
+            listed = data["listed"]
+        except (KeyError, TypeError, ValueError) as e:
+            logging.warning(f"Invalid market stats in {path} ({e!r}), starting over")
+            return
+
+        self.since, self.buckets, self._listed = since, buckets, listed
+
+    def _bucket(self, disposition: str, district: str) -> BucketStats:
+        return self.buckets.setdefault((disposition, district), BucketStats())
+
+    def add_offers(self, offers: list[RentalOffer], now: float | None = None):
+        """Započítá nově nalezené nabídky
+
+        Stejná nabídka z více serverů v jedné dávce (shodný otisk) se započítá jen jednou.
+        """
+        now = time.time() if now is None else now
+        seen_scrapers: dict[tuple, set[str]] = {}
+
+        for offer in offers:
+            if offer.link in self._listed:
+                continue
+
+            # Stejná nabídka z jiného serveru se nezapočítá, dvě stejné nabídky jednoho
+            # serveru jsou dva různé byty
+            fingerprint_key = OfferFingerprint.of(offer).key
+            if fingerprint_key is not None:
+                scrapers = seen_scrapers.setdefault(fingerprint_key, set())
+                if scrapers and offer.scraper.name not in scrapers:
+                    scrapers.add(offer.scraper.name)
+                    continue
+                scrapers.add(offer.scraper.name)
+
+            disposition = parse_disposition(offer.title) or UNKNOWN
+            district = parse_district(offer.location) or UNKNOWN
+            price = parse_price(offer.price)
+            area = parse_area(offer.title)
+
+            self._listed[offer.link] = [
+                disposition, district, offer.scraper.name, now, now
+            ]
+            if price is None:
+                continue
+
+            for key in _bucket_keys(disposition, district):
+                bucket = self._bucket(*key)
+                bucket.price.add(price)
+                if area:
+                    bucket.price_per_m2.add(price / area)
+
+    def observe_listings(self, offers: list[RentalOffer], now: float | None = None):
+        """Zaznamená nabídky ve výpisu a započítá dobu těch, které z výpisu zmizely
+
+        Nabídky scraperu, který v tomto kole nic nevrátil (chyba), se neuzavírají.
+        """
+        now = time.time() if now is None else now
+        current = {offer.link for offer in offers}
+        active_scrapers = {offer.scraper.name for offer in offers}
+
+        for link, entry in list(self._listed.items()):
+            disposition, district, scraper, found_at, _ = entry
+            if link in current:
+                entry[4] = now
+            elif scraper in active_scrapers:
+                del self._listed[link]
+                days = (entry[4] - found_at) / 86400
+                for key in _bucket_keys(disposition, district):
+                    self._bucket(*key).days_listed.add(days)
+            elif now - entry[4] > LISTED_MAX_AGE_SECONDS:
+                del self._listed[link]
+
+    def save(self):
+        """Atomicky uloží statistiky"""
+        data = {
+            "version": STATS_VERSION,
+            "since": self.since,
+            "buckets": [
+                {"disposition": d, "district": l, "stats": s.to_dict()}
+                for (d, l), s in self.buckets.items()
+            ],
+            "listed": self._listed,
+        }
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "w") as stats_file:
+            json.dump(data, stats_file)
+        os.replace(temp_path, self.path)
+
+    def rows(self, by: str = "both") -> list[dict[str, Any]]:
+        """Statistiky jako řádky tabulky
+
+        Args:
+            by (str): `disposition`, `district` nebo `both` (každá kombinace zvlášť)
+        """
+        rows = []
+        for (disposition, district), stats in sorted(self.buckets.items()):
+            if by == "disposition" and district != ALL:
+                continue
+            if by == "district" and disposition != ALL:
+                continue
+            if by == "both" and (disposition == ALL) != (district == ALL):
+                continue
+
+            rows.append({
+                "disposition": disposition,
+                "district": district,
+                "offers": stats.price.count,
+                "price_mean": stats.price.mean,
+                "price_median": stats.price.median.value,
+                "price_min": stats.price.minimum,
+                "price_max": stats.price.maximum,
+                "price_per_m2_mean": stats.price_per_m2.mean,
+                "price_per_m2_median": stats.price_per_m2.median.value,
+                "days_listed_count": stats.days_listed.count,
+                "days_listed_median": stats.days_listed.median.value,
+            })
+        return rows
+
+
+_market_stats: MarketStats | None = None
+
+
+def get_market_stats() -> MarketStats:
+    global _market_stats
+    if _market_stats is None:
+        _market_stats = MarketStats(config.market_stats_file or data_path("market_stats.json"))
+    return _market_stats
+
+
+def update_market_stats(new_offers: list[RentalOffer], all_offers: list[RentalOffer]):
+    """Aktualizuje statistiky po uložení nových nabídek (volá se každé kolo)"""
+    stats = get_market_stats()
+    stats.add_offers(new_offers)
+    stats.observe_listings(all_offers)
+    stats.save()
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.1f}" if value < 100 else f"{value:.0f}"
+    return str(value)
+
+
+def print_table(rows: list[dict[str, Any]], output: TextIO = sys.stdout):
+    columns = [
+        ("disposition", "dispozice"),
+        ("district", "lokalita"),
+        ("offers", "počet"),
+        ("price_mean", "průměr Kč"),
+        ("price_median", "medián Kč"),
+        ("price_per_m2_median", "medián Kč/m²"),
+        ("days_listed_median", "medián dní"),
+    ]
+    widths = [
+        max(len(title), *(len(_format(r[key])) for r in rows)) if rows else len(title)
+        for key, title in columns
+    ]
+
+    print("  ".join(title.rjust(w) for (_, title), w in zip(columns, widths)), file=output)
+    for row in rows:
+        print(
+            "  ".join(_format(row[key]).rjust(w) for (key, _), w in zip(columns, widths)),
+            file=output,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--by", choices=["disposition", "district", "both"], default="disposition")
+    parser.add_argument("--format", choices=["table", "csv", "json"], default="table")
+    parser.add_argument("--output", type=Path, help="write to a file instead of stdout")
+    args = parser.parse_args()
+
+    stats = get_market_stats()
+    rows = stats.rows(args.by)
+
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    if args.format == "json":
+        json.dump({"since": stats.since, "rows": rows}, output, ensure_ascii=False, indent=2)
+    elif args.format == "csv":
+        writer = csv.DictWriter(output, fieldnames=list(rows[0]) if rows else ["disposition"])
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        print_table(rows, output)
+
+    if args.output:
+        output.close()
@@ -0,0 +1,70 @@
+"""Kanonická identita nabídky podle odkazu
+
+Servery stejnou nabídku občas vrátí pod jiným odkazem (jiný slug lokality u Sreality,
+sledovací parametry, http/https, `www.`, lomítko na konci). Nabídka se proto neporovnává
+podle odkazu, ale podle ID:
+
+- u serverů, jejichž odkaz obsahuje číslo nabídky, je ID `server:číslo`
+  (např. `sreality.cz:2841937484`)
+- u ostatních je ID normalizovaný odkaz bez schématu, `www.`, sledovacích parametrů
+  a fragmentu
+
+ID se počítá jen z odkazu, takže platí i pro odkazy dříve uložené v `FOUND_OFFERS_FILE`.
+"""
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+TRACKING_PARAMS = {"fbclid", "gclid", "msclkid", "ref", "source", "tms"}
+"""Parametry odkazu, které nemění nabídku (navíc všechny `utm_*`)"""
+
+_ID_RULES: dict[str, re.Pattern] = {
+    # /detail/pronajem/byt/2+kk/brno-zabovresky-ulice/2841937484
+    "sreality.cz": re.compile(r"/detail/(?:[^/]+/)*(\d+)"),
+    # /nemovitosti-byty-domy/912345-nabidka-pronajem-bytu-...
+    "bezrealitky.cz": re.compile(r"/nemovitosti-byty-domy/(\d+)(?:-[^/]*)?"),
+    # /pronajem/byt-2+kk-brno/24070123
+    "realingo.cz": re.compile(r"(?:/[^/]+)*/(\d+)"),
+    # /inzerat/pronajem-bytu-2-kk-brno/4789311
+    "ulovdomov.cz": re.compile(r"/inzerat/(?:[^/]+/)*(\d+)"),
+    # /detail/pronajem/byt/brno-zabovresky/6543a1b2c3d4e5f6a7b8c9d0
+    "reality.idnes.cz": re.compile(r"/detail/(?:[^/]+/)*([0-9a-f]{24}|\d+)"),
+    # /reality/detail/123456/pronajem-bytu-2-kk-...
+    "remax-czech.cz": re.compile(r"/reality/detail/(\d+)(?:/[^/]*)?"),
+    # /detail/123456/pronajem-bytu-...
+    "eurobydleni.cz": re.compile(r"/detail/(\d+)(?:/[^/]*)?"),
+}
+"""Celá cesta odkazu s číslem nabídky podle serveru"""
+
+
+def _host(netloc: str) -> str:
+    host = netloc.lower().rsplit("@", 1)[-1].split(":", 1)[0]
+    return host.removeprefix("www.")
+
+
+def normalize_link(link: str) -> str:
+    """Odkaz bez schématu, `www.`, sledovacích parametrů, fragmentu a lomítka na konci"""
+    parts = urlsplit(link.strip())
+    query = sorted(
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k not in TRACKING_PARAMS and not k.startswith("utm_")
+    )
+
+    normalized = _host(parts.netloc) + (parts.path.rstrip("/") or "/")
+    if query:
+        normalized += "?" + urlencode(query)
+    return normalized
+
+
+def offer_id(link: str) -> str:
+    """Kanonické ID nabídky, viz popis modulu"""
+    parts = urlsplit(link.strip())
+    host = _host(parts.netloc)
+    rule = _ID_RULES.get(host)
+
+    if rule is not None:
+        match = rule.fullmatch(parts.path.rstrip("/"))
+        if match:
+            return f"{host}:{match.group(1)}"
+
+    return normalize_link(link)
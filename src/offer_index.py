@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Dotazovatelný index nalezených nabídek
+
+`FOUND_OFFERS_FILE` obsahuje jen odkazy. Index si k nim v SQLite databázi ukládá
+i údaje nabídky (scraper, cena, dispozice, plocha, městská část, čas nalezení
+a skupinu duplicit) se sekundárními indexy, takže dotaz typu „2+kk do 18 000 Kč
+za poslední týden“ nemusí procházet soubory ani znovu stahovat servery.
+Index se plní od okamžiku zapnutí, starší nabídky v něm nejsou.
+
+Dotazy (jen pro čtení):
+
+- `python3 src/offer_index.py query --disposition 2+kk --max-price 18000 --since 7d`
+- `python3 src/offer_index.py serve [--port 8091]` a `GET /offers?disposition=2%2Bkk&max_price=18000&since=7d`
+"""
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from config import config, data_path
+from fingerprint import parse_area, parse_disposition, parse_price
+from market_stats import parse_district
+from scrapers.rental_offer import RentalOffer
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+_DURATION_RE = re.compile(r"(\d+)\s*([dhm])")
+_DURATION_UNITS = {"d": 86400, "h": 3600, "m": 60}
+
+_COLUMNS = (
+    "link", "scraper", "title", "location", "district", "disposition", "area", "price",
+    "image_url", "first_seen", "duplicate_group",
+)
+
+
+def get_offer_index_path() -> Path:
+    return config.offer_index_file or data_path("offer_index.sqlite")
+
+
+def parse_time(value: str, now: float | None = None) -> float:
+    """Čas jako stáří (`7d`, `12h`, `30m`) nebo datum ve formátu ISO 8601
+
+    Raises:
+        ValueError: Neznámý formát
+    """
+    now = time.time() if now is None else now
+    if match := _DURATION_RE.fullmatch(value.strip()):
+        return now - int(match.group(1)) * _DURATION_UNITS[match.group(2)]
+    return datetime.fromisoformat(value).timestamp()
+
+
+class OfferIndex:
+    """Index nalezených nabídek v SQLite databázi"""
+
+    def __init__(self, path: Path | str, read_only: bool = False):
+        self.path = path
+        """Cesta k databázi indexu"""
+
+        if read_only:
+            self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            return
+
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS offers (
+                link TEXT PRIMARY KEY,
+                scraper TEXT NOT NULL,
+                title TEXT NOT NULL,
+                location TEXT NOT NULL,
+                district TEXT,
+                disposition TEXT,
+                area INTEGER,
+                price INTEGER,
+                image_url TEXT,
+                first_seen REAL NOT NULL,
+                duplicate_group TEXT NOT NULL
+            )
+            """
+        )
+        for name, columns in (
+            ("offers_disposition_price", "disposition, price"),
+            ("offers_scraper_seen", "scraper, first_seen"),
+            ("offers_seen", "first_seen"),
+            ("offers_price", "price"),
+            ("offers_district", "district, price"),
+            ("offers_group", "duplicate_group"),
+        ):
+            self._connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON offers ({columns})")
+
+    def close(self):
+        self._connection.close()
+
+    def add_offers(
+        self,
+        offers: list[RentalOffer],
+        groups: list[RentalOffer] | None = None,
+        now: float | None = None,
+    ):
+        """Zaindexuje nově nalezené nabídky v jedné transakci
+
+        Args:
+            offers (list[RentalOffer]): Nově nalezené nabídky
+            groups (list[RentalOffer] | None): Nabídky po deduplikaci, jejich
+                `duplicate_offers` patří do stejné skupiny duplicit (pojmenované odkazem
+                první nabídky)
+            now (float | None): Čas nalezení
+        """
+        now = time.time() if now is None else now
+        group_of = {d.link: o.link for o in groups or [] for d in o.duplicate_offers}
+
+        rows = [
+            (
+                offer.link,
+                offer.scraper.name,
+                offer.title,
+                offer.location,
+                parse_district(offer.location),
+                parse_disposition(offer.title),
+                parse_area(offer.title),
+                parse_price(offer.price),
+                offer.image_url or None,
+                now,
+                group_of.get(offer.link, offer.link),
+            )
+            for offer in offers
+        ]
+
+        with self._connection:
+            self._connection.executemany(
+                f"INSERT OR IGNORE INTO offers ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                rows,
+            )
+
+    def query(
+        self,
+        scraper: str | None = None,
+        disposition: str | None = None,
+        district: str | None = None,
+        min_price: int | None = None,
+        max_price: int | None = None,
+        since: float | None = None,
+        until: float | None = None,
+        group: str | None = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> list[dict[str, Any]]:
+        """Nabídky odpovídající všem zadaným podmínkám, od nejnovější
+
+        Args:
+            scraper (str | None): Název serveru (`Sreality`, `BRAVIS`...)
+            disposition (str | None): Dispozice ve tvaru `2+kk`
+            district (str | None): Městská část
+            min_price (int | None): Nejnižší cena
+            max_price (int | None): Nejvyšší cena
+            since (float | None): Nalezeny nejdříve v tento čas (unix timestamp)
+            until (float | None): Nalezeny nejpozději v tento čas
+            group (str | None): Odkaz libovolné nabídky, vrátí celou její skupinu duplicit
+            limit (int): Nejvyšší počet výsledků
+        """
+        conditions = []
+        params: list[Any] = []
+
+        for column, operator, value in (
+            ("scraper", "=", scraper),
+            ("disposition", "=", disposition),
+            ("district", "=", district),
+            ("price", ">=", min_price),
+            ("price", "<=", max_price),
+            ("first_seen", ">=", since),
+            ("first_seen", "<=", until),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+
+        if group is not None:
+            conditions.append(
+                "duplicate_group = (SELECT duplicate_group FROM offers WHERE link = ?)"
+            )
+            params.append(group)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self._connection.execute(
+            f"SELECT {', '.join(_COLUMNS)} FROM offers {where} "
+            "ORDER BY first_seen DESC LIMIT ?",
+            (*params, min(limit, MAX_LIMIT)),
+        ).fetchall()
+
+        offers = [dict(zip(_COLUMNS, row)) for row in rows]
+        for offer in offers:
+            offer["first_seen"] = datetime.fromtimestamp(offer["first_seen"]).isoformat()
+        return offers
+
+
+_offer_index: OfferIndex | None = None
+
+
+def get_offer_index() -> OfferIndex:
+    global _offer_index
+    if _offer_index is None:
+        _offer_index = OfferIndex(get_offer_index_path())
+    return _offer_index
+
+
+def _query_arguments(values: dict[str, str | None]) -> dict[str, Any]:
+    """Převede parametry z příkazové řádky nebo URL na argumenty `OfferIndex.query`
+
+    Raises:
+        ValueError: Neplatná hodnota parametru
+    """
+    arguments: dict[str, Any] = {}
+
+    for name in ("scraper", "disposition", "district", "group"):
+        if values.get(name):
+            arguments[name] = values[name]
+    for name in ("min_price", "max_price", "limit"):
+        if values.get(name):
+            arguments[name] = int(values[name])
+    for name in ("since", "until"):
+        if values.get(name):
+            arguments[name] = parse_time(values[name])
+
+    return arguments
+
+
+def serve(port: int):
+    from aiohttp import web
+
+    index = OfferIndex(get_offer_index_path(), read_only=True)
+
+    async def offers(request: web.Request) -> web.Response:
+        try:
+            arguments = _query_arguments(dict(request.query))
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response(index.query(**arguments))
+
+    app = web.Application()
+    app.router.add_get("/offers", offers)
+    print(f"Serving offer index on http://127.0.0.1:{port}/offers")
+    web.run_app(app, host="127.0.0.1", port=port, print=None)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    query = commands.add_parser("query", help="print matching offers as JSON lines")
+    query.add_argument("--scraper")
+    query.add_argument("--disposition", help="e.g. 2+kk")
+    query.add_argument("--district")
+    query.add_argument("--min-price")
+    query.add_argument("--max-price")
+    query.add_argument("--since", help="age (7d, 12h, 30m) or ISO date")
+    query.add_argument("--until", help="age (7d, 12h, 30m) or ISO date")
+    query.add_argument("--group", metavar="LINK", help="all duplicates of the offer")
+    query.add_argument("--limit", default=str(DEFAULT_LIMIT))
+
+    server = commands.add_parser("serve", help="read-only HTTP API, GET /offers?...")
+    server.add_argument("--port", type=int, default=8091)
+
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.command == "serve":
+        serve(args.port)
+        raise SystemExit()
+
+    try:
+        arguments = _query_arguments(vars(args))
+    except ValueError as e:
+        raise SystemExit(f"Invalid query: {e}")
+
+    index = OfferIndex(get_offer_index_path(), read_only=True)
+    for offer in index.query(**arguments):
+        sys.stdout.write(json.dumps(offer, ensure_ascii=False) + "\n")
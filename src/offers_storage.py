@@ -1,25 +1,45 @@
 import os
+from typing import TYPE_CHECKING
 
+from offer_identity import offer_id
 from scrapers.rental_offer import RentalOffer
 
+if TYPE_CHECKING:
+    import numpy as np
+
+    from snapshot import Snapshot
+
 
 class OffersStorage:
-    """Úložiště dříve nalezených nabídek"""
+    """Úložiště dříve nalezených nabídek
 
-    def __init__(self, path: str):
+    Soubor obsahuje odkazy, nabídky se ale porovnávají podle kanonického ID
+    (`offer_identity.offer_id`), takže jiná varianta odkazu není nová nabídka.
+    """
+
+    def __init__(self, path: str, snapshot: "Snapshot | None" = None):
         self.path = path
         """Cesta k uloženým odkazům"""
 
         self.first_time = False
         """Neproběhl pokus o uložení nabídek (soubor neexistuje)"""
 
-        self._links: set[str] = set()
-        """Seznam URL odkazů na všechny nalezené nabídky"""
+        self._ids: set[str] = set()
+        """Kanonická ID všech nalezených nabídek"""
+
+        self._id_hashes: "np.ndarray | None" = None
+        """Seřazené hashe ID ze snímku stavu (nabídky uložené před snímkem)"""
 
         try:
-            with open(self.path) as file:
+            with open(self.path, 'rb') as file:
+                if snapshot is not None:
+                    # Ze souboru se dočtou jen odkazy uložené po vytvoření snímku
+                    self._id_hashes = snapshot.seen_links
+                    file.seek(snapshot.found_offers_size)
+
                 for line in file:
-                    self._links.add(line.strip())
+                    if link := line.decode().strip():
+                        self._ids.add(offer_id(link))
         except FileNotFoundError:
             self.first_time = True
 
@@ -33,7 +53,21 @@ class OffersStorage:
         Returns:
             bool: Jde o starou nabídku
         """
-        return offer.link in self._links
+        identity = offer_id(offer.link)
+        if identity in self._ids:
+            return True
+
+        if self._id_hashes is None or not len(self._id_hashes):
+            return False
+
+        # NumPy a snímek jsou v tuto chvíli už načtené (hashe pocházejí ze snímku)
+        import numpy as np
+
+        from snapshot import link_hash
+
+        value = np.uint64(link_hash(identity))
+        index = np.searchsorted(self._id_hashes, value)
+        return bool(index < len(self._id_hashes) and self._id_hashes[index] == value)
 
 
     def save_offers(self, offers: list[RentalOffer]):
@@ -44,7 +78,18 @@ class OffersStorage:
         """
         with open(self.path, 'a+') as file_object:
             for offer in offers:
-                self._links.add(offer.link)
+                self._ids.add(offer_id(offer.link))
                 file_object.write(offer.link + os.linesep)
 
             self.first_time = False
+
+
+    def link_hashes(self) -> "np.ndarray":
+        """Seřazené hashe ID všech nalezených nabídek (pro snímek stavu)"""
+        import numpy as np
+
+        from snapshot import hash_links
+
+        if self._id_hashes is None:
+            return hash_links(self._ids)
+        return np.union1d(self._id_hashes, hash_links(self._ids))
@@ -0,0 +1,300 @@
+"""Trvalá fronta nabídek k odeslání
+
+Nové nabídky se do fronty zapíší dřív, než se uloží jako nalezené. Pokud program spadne
+mezi oběma kroky, nabídky se v dalším kole najdou znovu a opakované vložení se díky
+unikátnímu odkazu ignoruje. Nabídka se tak neztratí ani neodešle dvakrát.
+
+Každý cíl (Discord kanál, sink headless režimu) má vlastní řádek a potvrzuje se zvlášť.
+Odesílá se po dávkách, potvrzená dávka se označí jako odeslaná. Při chybě zůstane
+ve frontě a `OutboxSender` to zkusí znovu s rostoucím odstupem, i po restartu programu.
+Nabídku, kterou cíl trvale odmítl (např. neplatný embed), fronta vyřadí, aby neblokovala
+ostatní.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from scrapers.rental_offer import RentalOffer
+from scrapers.scraper_base import ScraperBase
+
+RETENTION_SECONDS = 7 * 24 * 3600
+"""Jak dlouho se uchovávají odeslané nabídky (brání opakovanému odeslání)"""
+
+RETRY_MIN_SECONDS = 5.0
+RETRY_MAX_SECONDS = 300.0
+
+REJECTED_STATUSES = {400, 413}
+"""HTTP stavy, kterými cíl odmítá obsah zprávy; opakování by skončilo stejně.
+Chyby oprávnění nebo neexistujícího kanálu se opakují, dají se opravit v konfiguraci."""
+
+
+def is_rejected(error: Exception) -> bool:
+    """Cíl odmítl obsah zprávy (`discord.HTTPException` i `DiscordWebhookError` mají `status`)"""
+    return getattr(error, "status", None) in REJECTED_STATUSES
+
+
+@dataclass
+class OutboxEntry:
+    """Nabídka čekající na odeslání do jednoho cíle"""
+
+    id: int
+    target: str
+    link: str
+    offer: dict
+    attempts: int
+
+
+class Outbox:
+    """Fronta nabídek k odeslání v SQLite databázi"""
+
+    def __init__(self, path: Path | str, targets: list[str]):
+        self.path = path
+        """Cesta k databázi fronty"""
+
+        self.targets = targets
+        """Cíle, do kterých se každá nabídka odesílá"""
+
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                target TEXT NOT NULL,
+                link TEXT NOT NULL,
+                offer TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                enqueued_at REAL NOT NULL,
+                sent_at REAL,
+                UNIQUE (target, link)
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (target, status, id)"
+        )
+
+    def close(self):
+        self._connection.close()
+
+    def enqueue(self, offers: list[RentalOffer]) -> int:
+        """Vloží nabídky do fronty všech cílů v jedné transakci
+
+        Args:
+            offers (list[RentalOffer]): Nabídky k odeslání
+
+        Returns:
+            int: Počet skutečně vložených řádků (už zařazené nabídky se přeskočí)
+        """
+        now = time.time()
+        rows = [
+            (target, offer.link, json.dumps(offer.to_dict(), ensure_ascii=False), now)
+            for target in self.targets
+            for offer in offers
+        ]
+
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO outbox (target, link, offer, enqueued_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            inserted = self._connection.total_changes - before
+            self._connection.execute(
+                "DELETE FROM outbox WHERE status = 'sent' AND sent_at < ?",
+                (now - RETENTION_SECONDS,),
+            )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+        return inserted
+
+    def pending(self, target: str, limit: int) -> list[OutboxEntry]:
+        """Nejstarší neodeslané nabídky cíle"""
+        rows = self._connection.execute(
+            """
+            SELECT id, target, link, offer, attempts FROM outbox
+            WHERE target = ? AND status = 'pending'
+            ORDER BY id LIMIT ?
+            """,
+            (target, limit),
+        ).fetchall()
+
+        return [OutboxEntry(r[0], r[1], r[2], json.loads(r[3]), r[4]) for r in rows]
+
+    def oldest_pending(self, target: str) -> float | None:
+        """Čas zařazení nejstarší neodeslané nabídky cíle"""
+        return self._connection.execute(
+            "SELECT MIN(enqueued_at) FROM outbox WHERE target = ? AND status = 'pending'",
+            (target,),
+        ).fetchone()[0]
+
+    def pending_count(self, target: str) -> int:
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM outbox WHERE target = ? AND status = 'pending'",
+            (target,),
+        ).fetchone()[0]
+
+    def ack(self, ids: list[int]):
+        """Označí nabídky jako odeslané"""
+        self._connection.executemany(
+            "UPDATE outbox SET status = 'sent', sent_at = ? WHERE id = ?",
+            [(time.time(), i) for i in ids],
+        )
+
+    def fail(self, ids: list[int], error: str):
+        """Zaznamená neúspěšný pokus, nabídky zůstávají ve frontě"""
+        self._connection.executemany(
+            "UPDATE outbox SET attempts = attempts + 1, last_error = ? WHERE id = ?",
+            [(error, i) for i in ids],
+        )
+
+    def discard(self, ids: list[int], error: str):
+        """Vyřadí nabídky, které nelze odeslat (např. jejich scraper už neexistuje)"""
+        self._connection.executemany(
+            "UPDATE outbox SET status = 'discarded', last_error = ? WHERE id = ?",
+            [(error, i) for i in ids],
+        )
+
+
+class OutboxSender:
+    """Odesílá nabídky jednoho cíle z fronty po dávkách a potvrzuje je"""
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        target: str,
+        send: Callable[[list[RentalOffer]], Awaitable[None]],
+        scrapers: list[ScraperBase],
+        batch_size: int,
+        window_seconds: float = 0,
+        split: Callable[[list[RentalOffer]], list[list[RentalOffer]]] | None = None,
+    ):
+        self.outbox = outbox
+        self.target = target
+        self.send = send
+        """Odešle dávku nabídek, při neúspěchu vyhodí výjimku"""
+
+        self.scrapers = scrapers
+        """Scrapery pro obnovení nabídek z fronty (seznam se může měnit na místě)"""
+
+        self.batch_size = batch_size
+        """Kolik nabídek se najednou načte z fronty"""
+
+        self.window_seconds = window_seconds
+        """Jak dlouho nechat nabídky ve frontě, aby se odeslaly společně (0 = hned)"""
+
+        self.split = split
+        """Rozdělí načtené nabídky na dávky pro `send`, bez něj je dávkou celé načtení.
+        Nabídky sloučené do `duplicate_offers` jiné nabídky se potvrdí s ní."""
+
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+
+    def wake(self):
+        """Upozorní běžící `run` na nové nabídky ve frontě"""
+        self._wakeup.set()
+
+    async def drain(self) -> bool:
+        """Odešle všechny čekající nabídky
+
+        Returns:
+            bool: Fronta je prázdná (False, pokud odeslání selhalo)
+        """
+        async with self._lock:
+            while entries := self.outbox.pending(self.target, self.batch_size):
+                scrapers_by_name = {s.name: s for s in self.scrapers}
+                unknown = [e.id for e in entries if e.offer["scraper"] not in scrapers_by_name]
+                if unknown:
+                    self.outbox.discard(unknown, "scraper is no longer configured")
+                    logging.warning(f"Discarded {len(unknown)} queued offers of removed scrapers")
+                    continue
+
+                offers = [RentalOffer.from_dict(e.offer, scrapers_by_name) for e in entries]
+                entry_ids = {id(offer): e.id for offer, e in zip(offers, entries)}
+
+                for batch in self.split(offers) if self.split else [offers]:
+                    if not await self._deliver(batch, entry_ids):
+                        return False
+
+        return True
+
+    async def _deliver(self, batch: list[RentalOffer], entry_ids: dict[int, int]) -> bool:
+        """Odešle dávku a potvrdí ji, odmítnuté nabídky vyřadí
+
+        Returns:
+            bool: Dávka je vyřízená (False při chybě, po které se má odesílání opakovat)
+        """
+        ids = [
+            entry_ids[id(o)]
+            for o in batch + [d for o in batch for d in o.duplicate_offers]
+            if id(o) in entry_ids
+        ]
+
+        try:
+            await self.send(batch)
+        except Exception as e:
+            if not is_rejected(e):
+                self.outbox.fail(ids, repr(e))
+                logging.warning(
+                    f"Sending offers to {self.target} failed: {e!r}, "
+                    f"{self.outbox.pending_count(self.target)} offers stay queued"
+                )
+                return False
+
+            if len(batch) > 1:
+                # Není jasné, kterou nabídku cíl odmítl, zkusí se každá zvlášť
+                for offer in batch:
+                    if not await self._deliver([offer], entry_ids):
+                        return False
+                return True
+
+            self.outbox.discard(ids, repr(e))
+            logging.error(f"{self.target} rejected offer {batch[0].link}, discarding it: {e!r}")
+            return True
+
+        self.outbox.ack(ids)
+        return True
+
+    def _window_remaining(self) -> float:
+        if not self.window_seconds:
+            return 0
+        oldest = self.outbox.oldest_pending(self.target)
+        if oldest is None:
+            return 0
+        return max(0.0, oldest + self.window_seconds - time.time())
+
+    async def run(self):
+        """Odesílá nabídky, jakmile se objeví ve frontě; po chybě čeká a zkouší znovu"""
+        delay = RETRY_MIN_SECONDS
+
+        while True:
+            self._wakeup.clear()
+
+            if remaining := self._window_remaining():
+                # Nabídky se odešlou společně, až nejstarší z nich počká celé okno
+                logging.info(f"Sending queued offers to {self.target} in {remaining:.0f}s")
+                await asyncio.sleep(remaining)
+
+            if await self.drain():
+                delay = RETRY_MIN_SECONDS
+                await self._wakeup.wait()
+                continue
+
+            logging.info(f"Retrying delivery to {self.target} in {delay:.0f}s")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, RETRY_MAX_SECONDS)
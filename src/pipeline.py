@@ -0,0 +1,158 @@
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from config import config, data_path
+from http_client import get_http_client
+from loop_monitor import get_loop_monitor
+from market_stats import update_market_stats
+from offer_index import get_offer_index
+from offers_storage import OffersStorage
+from profiling import profile_cycle
+from scrapers.rental_offer import RentalOffer
+from scrapers.scraper_base import ScraperBase
+from scrapers_manager import fetch_latest_offers
+from snapshot import save_cycle_state
+from transformations import deduplicate_offers, filter_offers, get_image_hashes
+
+if TYPE_CHECKING:
+    from distributed import Coordinator
+    from enrichment import DetailCache
+    from outbox import Outbox
+
+_detail_cache: "DetailCache | None" = None
+
+
+@dataclass
+class CycleResult:
+    """Výsledek jednoho kola stahování nabídek"""
+
+    all_offers: list[RentalOffer]
+    """Všechny stažené nabídky"""
+
+    new_offers: list[RentalOffer]
+    """Nabídky, které dosud nebyly uloženy"""
+
+    filtered: list[RentalOffer]
+    """Nové nabídky odpovídající filtrům"""
+
+    deduplicated: list[RentalOffer]
+    """Vyfiltrované nabídky bez duplicit, určené k odeslání"""
+
+    first_time: bool
+    """Šlo o první stažení (nabídky se neodesílají)"""
+
+    def summary(self) -> str:
+        return (
+            f"all: {len(self.all_offers)}, new: {len(self.new_offers)}, "
+            f"filtered: {len(self.filtered)}, deduplicated: {len(self.deduplicated)}"
+        )
+
+
+def get_refresh_interval() -> int:
+    if datetime.now().hour in range(6, 22):
+        return config.refresh_interval_daytime_minutes
+    else:
+        return config.refresh_interval_nighttime_minutes
+
+
+async def run_cycle(
+    scrapers: list[ScraperBase],
+    storage: OffersStorage,
+    coordinator: "Coordinator | None" = None,
+    outbox: "Outbox | None" = None,
+) -> CycleResult:
+    """Stáhne nejnovější nabídky, uloží nové a vrátí ty, které se mají odeslat
+
+    Args:
+        scrapers (list[ScraperBase]): Použité scrapery
+        storage (OffersStorage): Úložiště dříve nalezených nabídek
+        coordinator (Coordinator | None): Rozesílá stahování a hashování workerům
+        outbox (Outbox | None): Fronta k odeslání, do které se nabídky zařadí dřív,
+            než se uloží jako nalezené
+
+    Returns:
+        CycleResult: Výsledek kola
+    """
+    async with profile_cycle():
+        return await _run_cycle(scrapers, storage, coordinator, outbox)
+
+
+def get_outbox_path() -> Path:
+    return config.outbox_file or data_path("outbox.sqlite")
+
+
+async def _run_cycle(
+    scrapers: list[ScraperBase],
+    storage: OffersStorage,
+    coordinator: "Coordinator | None",
+    outbox: "Outbox | None",
+) -> CycleResult:
+    if coordinator:
+        all_offers = await coordinator.fetch_latest_offers(scrapers)
+    else:
+        all_offers = await fetch_latest_offers(scrapers)
+
+    new_offers = [o for o in all_offers if not storage.contains(o)]
+    first_time = storage.first_time
+    filtered = filter_offers(new_offers)
+    deduplicated = await deduplicate_offers(
+        filtered, coordinator.get_image_hashes if coordinator else get_image_hashes
+    )
+
+    if config.detail_enrichment and not first_time:
+        await _enrich(deduplicated)
+
+    # Nabídky se zařadí k odeslání dřív, než se uloží jako nalezené, aby se po pádu
+    # mezi oběma kroky neztratily (opakované zařazení fronta ignoruje)
+    if outbox is not None and not first_time:
+        outbox.enqueue(deduplicated)
+    storage.save_offers(new_offers)
+
+    # Nabídky jsou už uložené, chyba statistik nesmí zastavit další kola
+    if config.market_stats:
+        try:
+            update_market_stats(new_offers, all_offers)
+        except Exception:
+            logging.exception("Updating market statistics failed")
+
+    if config.offer_index:
+        try:
+            get_offer_index().add_offers(new_offers, deduplicated)
+        except Exception:
+            logging.exception("Updating the offer index failed")
+
+    http_client = get_http_client()
+    logging.info(f"HTTP requests ({http_client.stats.summary()})")
+    http_client.stats.reset()
+    if http_client.rate_limiter is not None:
+        if waits := http_client.rate_limiter.wait_summary():
+            logging.info(f"Waited for host rate limits ({waits})")
+        http_client.rate_limiter.reset_stats()
+
+    if loop_monitor := get_loop_monitor():
+        logging.info(f"Event loop ({loop_monitor.stats.summary()})")
+        loop_monitor.stats.reset()
+
+    if config.state_snapshot:
+        # Bez snímku se příští start jen načte pomaleji, stahování pokračuje
+        try:
+            save_cycle_state(storage, all_offers)
+        except Exception:
+            logging.exception("Saving the state snapshot failed")
+
+    return CycleResult(all_offers, new_offers, filtered, deduplicated, first_time)
+
+
+async def _enrich(offers: list[RentalOffer]):
+    from enrichment import DetailCache, enrich_offers
+
+    global _detail_cache
+    if _detail_cache is None:
+        _detail_cache = DetailCache(
+            config.detail_cache_file or data_path("detail_cache.sqlite")
+        )
+
+    await enrich_offers(offers, _detail_cache, config.detail_concurrency)
@@ -0,0 +1,151 @@
+"""Profilování jednoho kola stahování
+
+Kolo se profiluje na vyžádání signálem `SIGUSR1` (`kill -USR1 <pid>`) nebo automaticky
+každé N-té kolo (`config.profile_every_n_cycles`). Do složky `profiles` se uloží:
+
+- `<název>.prof` - výstup cProfile (`python3 -m pstats`, snakeviz...)
+- `<název>.collapsed` - vzorkované zásobníky event loopu ve formátu pro flamegraph.pl
+  nebo speedscope (jeden řádek `funkce;funkce;funkce počet`)
+- `<název>.alloc.txt` - místa v kódu s největšími alokacemi paměti během kola (tracemalloc)
+"""
+import cProfile
+import logging
+import os
+import signal
+import sys
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+
+from config import config, data_path
+
+SAMPLE_INTERVAL_SECONDS = 0.005
+TOP_ALLOCATIONS = 30
+TRACEMALLOC_FRAMES = 10
+
+_requested = False
+_cycle_counter = 0
+
+
+def request_profile():
+    """Příští kolo se bude profilovat"""
+    # Volá se i z obsluhy signálu, proto jen nastaví příznak
+    global _requested
+    _requested = True
+
+
+def install_signal_handler():
+    """Profilování příštího kola na signál `SIGUSR1` (jen na systémech, které ho mají)"""
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: request_profile())
+
+
+def _should_profile() -> bool:
+    global _requested, _cycle_counter
+
+    _cycle_counter += 1
+    every = config.profile_every_n_cycles
+
+    if _requested or (every > 0 and _cycle_counter % every == 0):
+        _requested = False
+        return True
+
+    return False
+
+
+class StackSampler:
+    """Vlákno, které pravidelně zaznamenává zásobník volání sledovaného vlákna"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter[tuple[str, ...]] = Counter()
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[self._stack(frame)] += 1
+
+    @staticmethod
+    def _stack(frame: FrameType | None) -> tuple[str, ...]:
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            file_name = os.path.basename(code.co_filename)
+            stack.append(f"{code.co_name} ({file_name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def write_collapsed(self, path: Path):
+        with open(path, "w") as collapsed_file:
+            for stack, count in self.samples.most_common():
+                collapsed_file.write(";".join(stack) + f" {count}\n")
+
+
+def _write_allocations(snapshot: tracemalloc.Snapshot, path: Path):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ])
+    statistics = snapshot.statistics("traceback")
+    total = sum(stat.size for stat in statistics)
+
+    with open(path, "w") as report_file:
+        report_file.write(f"Allocated during cycle and still alive: {total / 1024:.1f} KiB\n\n")
+        for stat in statistics[:TOP_ALLOCATIONS]:
+            report_file.write(f"{stat.size / 1024:.1f} KiB in {stat.count} blocks\n")
+            for line in stat.traceback.format():
+                report_file.write(f"  {line}\n")
+            report_file.write("\n")
+
+
+@asynccontextmanager
+async def profile_cycle():
+    """Obalí kolo stahování profilováním, pokud bylo vyžádáno"""
+    if not _should_profile():
+        yield
+        return
+
+    directory = config.profile_dir or data_path("profiles")
+    directory.mkdir(parents=True, exist_ok=True)
+    base_path = directory / f"cycle-{datetime.now():%Y%m%d-%H%M%S}"
+    logging.info("Profiling this cycle")
+
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    sampler = StackSampler(threading.get_ident())
+    profiler = cProfile.Profile()
+
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        profiler.dump_stats(base_path.with_suffix(".prof"))
+        sampler.write_collapsed(base_path.with_suffix(".collapsed"))
+        _write_allocations(snapshot, base_path.with_suffix(".alloc.txt"))
+
+        logging.info(f"Cycle profile written to {base_path}.*")
@@ -0,0 +1,45 @@
+from dataclasses import dataclass
+from enum import Flag, auto
+
+from config import config
+from disposition import Disposition
+
+
+class FilterCapability(Flag):
+    """Filtry, které služba umí použít přímo ve vyhledávání na serveru"""
+
+    NONE        = 0
+    DISPOSITION = auto()
+    PRICE       = auto()
+    AREA        = auto()
+
+
+@dataclass(frozen=True)
+class QueryFilter:
+    """Filtry nabídek posílané serverům v dotazu"""
+
+    dispositions: Disposition
+    min_price: int | None = None
+    max_price: int | None = None
+    min_area: int | None = None
+    max_area: int | None = None
+
+    @classmethod
+    def from_config(cls, dispositions: Disposition) -> "QueryFilter":
+        return cls(
+            dispositions=dispositions,
+            min_price=config.min_price,
+            max_price=config.max_price,
+            min_area=config.min_area,
+            max_area=config.max_area,
+        )
+
+    @property
+    def requested(self) -> FilterCapability:
+        """Filtry, které jsou v konfiguraci skutečně nastavené"""
+        requested = FilterCapability.DISPOSITION
+        if self.min_price or self.max_price:
+            requested |= FilterCapability.PRICE
+        if self.min_area or self.max_area:
+            requested |= FilterCapability.AREA
+        return requested
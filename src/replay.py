@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Přehrání zaznamenaného kola stahování bez přístupu k síti
+
+Scrapery se vytvoří se stejnými filtry, jaké platily při záznamu, a místo serverů
+dostanou odpovědi z archivu (viz `CAPTURE_RESPONSES`). Vypíše počet nabídek a dobu
+zpracování každého scraperu.
+
+Spuštění: `python3 src/replay.py [archiv] [--repeat N]` (výchozí je poslední archiv)
+"""
+import argparse
+import asyncio
+import logging
+from time import perf_counter
+
+from capture import ReplayTransport, get_capture_store
+from disposition import Disposition
+from http_client import HttpClient
+from query_filter import QueryFilter
+from scrapers_manager import create_scraper
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("archive", nargs="?", help="archive file name from the captures index")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the cycle N times")
+    parser.add_argument("--list", action="store_true", help="list captured archives and exit")
+    return parser.parse_args()
+
+
+async def replay(archive_name: str, repeat: int):
+    header, exchanges = get_capture_store().load(archive_name)
+
+    filter_data = dict(header["query_filter"])
+    dispositions = Disposition(filter_data.pop("dispositions"))
+    query_filter = QueryFilter(dispositions, **filter_data)
+
+    names = list(dict.fromkeys(e.scraper for e in exchanges if e.scraper))
+    scrapers = [create_scraper(name, dispositions, query_filter) for name in names]
+
+    print(f"{archive_name}: {len(exchanges)} responses captured at {header['started_at']}")
+    print(f"{'scraper':>15} {'offers':>7} {'time [ms]':>10}")
+
+    for _ in range(repeat):
+        async with HttpClient(transport=ReplayTransport(exchanges)) as client:
+            for scraper in scrapers:
+                start = perf_counter()
+                try:
+                    offers = await scraper.get_latest_offers(client)
+                except Exception as e:
+                    logging.error(f"{scraper.registry_name} failed on captured response: {e!r}")
+                    continue
+                elapsed = perf_counter() - start
+                print(f"{scraper.registry_name:>15} {len(offers):>7} {elapsed * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    archives = get_capture_store().archives()
+    if args.list:
+        for archive in archives:
+            statuses = sorted({e["status"] for e in archive["exchanges"]})
+            print(f"{archive['file']}  {len(archive['exchanges'])} responses, status {statuses}")
+        raise SystemExit()
+
+    if not args.archive and not archives:
+        raise SystemExit("No captured archives, enable CAPTURE_RESPONSES first")
+
+    asyncio.run(replay(args.archive or archives[-1]["file"], args.repeat))
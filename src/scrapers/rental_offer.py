@@ -28,3 +28,48 @@ class RentalOffer:
     """Odkaz na instanci srapera, ze kterého tato nabídka pochází"""
 
     duplicate_offers: list["RentalOffer"] = field(default_factory=list)
+    """Stejné nabídky nalezené na jiných serverech"""
+
+    details: dict[str, str] = field(default_factory=dict)
+    """Doplňující údaje z detailu nabídky (název údaje -> hodnota)"""
+
+    coordinates: tuple[float, float] | None = None
+    """Zeměpisná šířka a délka (WGS84), pokud je server uvádí"""
+
+    def to_dict(self) -> dict:
+        """Převede nabídku na slovník vhodný pro serializaci do JSON"""
+        return {
+            "link": self.link,
+            "title": self.title,
+            "location": self.location,
+            "price": self.price,
+            "image_url": self.image_url,
+            "scraper": self.scraper.name,
+            "duplicate_offers": [o.to_dict() for o in self.duplicate_offers],
+            "details": self.details,
+            "coordinates": self.coordinates,
+        }
+
+    @classmethod
+    def from_dict(
+        cls, data: dict, scrapers: dict[str, "ScraperBase"]
+    ) -> "RentalOffer":
+        """Vytvoří nabídku ze slovníku z `to_dict`
+
+        Args:
+            data (dict): Serializovaná nabídka
+            scrapers (dict[str, ScraperBase]): Instance scraperů podle názvu
+        """
+        return cls(
+            link=data["link"],
+            title=data["title"],
+            location=data["location"],
+            price=data["price"],
+            image_url=data["image_url"],
+            scraper=scrapers[data["scraper"]],
+            duplicate_offers=[
+                cls.from_dict(d, scrapers) for d in data.get("duplicate_offers", [])
+            ],
+            details=data.get("details", {}),
+            coordinates=tuple(data["coordinates"]) if data.get("coordinates") else None,
+        )
@@ -0,0 +1,83 @@
+import functools
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from posixpath import dirname
+from typing import Any
+from urllib.parse import urlencode
+
+from http_client import HttpClient, HttpResponse
+
+
+@functools.cache
+def load_graphql_query(name: str) -> str:
+    """Načte GraphQL dotaz ze složky `graphql` (soubor se čte jen jednou za běh)
+
+    Args:
+        name (str): Název souboru bez přípony
+
+    Returns:
+        str: Text dotazu
+    """
+    file_path = Path(dirname(__file__)) / f"../../graphql/{name}.graphql"
+
+    with open(file_path) as query_file:
+        return query_file.read()
+
+
+@dataclass(frozen=True)
+class RequestTemplate:
+    """Předpřipravený požadavek na server
+
+    Statické části (URL, zakódované tělo, hlavičky) se sestaví jednou při vytvoření
+    scraperu, při každém stažení se doplní jen proměnlivé parametry URL (např. `tms`).
+    """
+
+    method: str
+    url: str
+    body: bytes | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+    cookies: dict[str, str] = field(default_factory=dict)
+
+    @classmethod
+    def get(cls, url: str) -> "RequestTemplate":
+        return cls("GET", url)
+
+    @classmethod
+    def post_json(cls, url: str, payload: Any) -> "RequestTemplate":
+        return cls(
+            "POST",
+            url,
+            json.dumps(payload, separators=(",", ":")).encode(),
+            {"Content-Type": "application/json"},
+        )
+
+    @classmethod
+    def post_form(
+        cls, url: str, fields: dict[str, Any], cookies: dict[str, str] | None = None
+    ) -> "RequestTemplate":
+        return cls(
+            "POST",
+            url,
+            urlencode(fields, doseq=True).encode(),
+            {"Content-Type": "application/x-www-form-urlencoded"},
+            cookies or {},
+        )
+
+    def build_url(self, params: dict[str, Any]) -> str:
+        if not params:
+            return self.url
+
+        separator = "&" if "?" in self.url else "?"
+        return self.url + separator + urlencode(params)
+
+    async def send(self, client: HttpClient, **params: Any) -> HttpResponse:
+        """Odešle požadavek, `params` se připojí do URL jako proměnlivé parametry"""
+        return await client.request(
+            self.method,
+            self.build_url(params),
+            data=self.body,
+            headers=self.headers or None,
+            cookies=self.cookies or None,
+            conditional=self.method == "GET",
+        )
@@ -1,10 +1,13 @@
 from abc import abstractmethod
+from functools import cached_property
 from typing import Any
 
-from aiohttp import ClientSession
-
+import html_parsing
 from disposition import Disposition
+from http_client import HttpClient
+from query_filter import FilterCapability, QueryFilter
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate
 from utils import flatten
 
 
@@ -31,14 +34,40 @@ class ScraperBase:
     def disposition_mapping(self) -> dict[Disposition, Any]:
         pass
 
-    def __init__(self, disposition: Disposition) -> None:
+    pushdown: FilterCapability = FilterCapability.DISPOSITION
+    """Filtry, které scraper posílá přímo v dotazu na server (ostatní se filtrují až po stažení)"""
+
+    supports_details: bool = False
+    """Umí scraper stáhnout doplňující údaje z detailu nabídky (`get_offer_details`)"""
+
+    registry_name: str | None = None
+    """Název scraperu v registru `scrapers_manager.SCRAPER_REGISTRY` (pokud z něj byl vytvořen)"""
+
+    def __init__(
+        self, disposition: Disposition, query_filter: QueryFilter | None = None
+    ) -> None:
         self.disposition = disposition
+        self.query_filter = query_filter or QueryFilter.from_config(disposition)
 
-    def get_dispositions_data(self) -> list:
+    @cached_property
+    def _dispositions_data(self) -> list:
         return list(flatten([self.disposition_mapping[d] for d in self.disposition]))
 
+    def get_dispositions_data(self) -> list:
+        return self._dispositions_data
+
+    @cached_property
+    def request_template(self) -> RequestTemplate:
+        """Požadavek na seznam nabídek, sestavený jednou pro instanci scraperu"""
+        return self._build_request_template()
+
+    @abstractmethod
+    def _build_request_template(self) -> RequestTemplate:
+        """Sestaví statickou část požadavku na seznam nejnovějších nabídek"""
+        raise NotImplementedError("Request template is not implemented")
+
     @abstractmethod
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
         """Načte a vrátí seznam nejnovějších nabídek bytů k pronájmu z dané služby
 
         Raises:
@@ -48,3 +77,27 @@ class ScraperBase:
             list[RentalOffer]: Seznam nabízených bytů k pronájmu
         """
         raise NotImplementedError("Fetching new results is not implemeneted")
+
+    def _parse_offers(self, html: str) -> list[RentalOffer]:
+        """Zpracuje stažené HTML se seznamem nabídek (jen pro služby bez API)
+
+        Volá se přes `parse_offers` mimo event loop, nesmí proto používat síť ani sdílený stav.
+        """
+        raise NotImplementedError("Parsing HTML is not implemented")
+
+    async def parse_offers(self, html: str) -> list[RentalOffer]:
+        """Zpracuje HTML metodou `_parse_offers` ve vlákně nebo procesu (`config.parse_executor`)"""
+        return await html_parsing.parse_offers(self, html)
+
+    async def get_offer_details(
+        self, client: HttpClient, offer: RentalOffer
+    ) -> dict[str, str]:
+        """Stáhne doplňující údaje z detailu nabídky (patro, plocha, vybavení, ...)
+
+        Raises:
+            NotImplementedError: Pokud služba detail nepodporuje (`supports_details`)
+
+        Returns:
+            dict[str, str]: Název údaje -> hodnota
+        """
+        raise NotImplementedError("Fetching offer details is not implemented")
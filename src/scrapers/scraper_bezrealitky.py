@@ -3,22 +3,21 @@ author: Mark Barzali
 """
 
 from abc import ABC as abstract
-from pathlib import Path
-from posixpath import dirname
 from typing import ClassVar
 
-from aiohttp import ClientSession
-
-from config import config
 from disposition import Disposition
+from http_client import HttpClient
+from query_filter import FilterCapability
 from scrapers.scraper_base import ScraperBase
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate, load_graphql_query
 
 
 class ScraperBezrealitky(ScraperBase):
     name = "BezRealitky"
     logo_url = "https://www.bezrealitky.cz/manifest-icon-192.maskable.png"
     color = 0x00CC00
+    pushdown = FilterCapability.DISPOSITION | FilterCapability.PRICE | FilterCapability.AREA
     base_url = "https://www.bezrealitky.cz"
 
     API: ClassVar[str] = "https://api.bezrealitky.cz/"
@@ -44,7 +43,6 @@ class ScraperBezrealitky(ScraperBase):
     }
 
     def _build_query(self) -> dict:
-        file_path = Path(dirname(__file__)) / "../../graphql/bezreality.graphql"
         variables = {
             "limit": 15,
             "offset": 0,
@@ -56,28 +54,33 @@ class ScraperBezrealitky(ScraperBase):
             "regionOsmIds": [self.BRNO],
         }
 
-        if config.min_price:
-            variables["priceFrom"] = config.min_price
-        if config.max_price:
-            variables["priceTo"] = config.max_price
+        if self.query_filter.min_price:
+            variables["priceFrom"] = self.query_filter.min_price
+        if self.query_filter.max_price:
+            variables["priceTo"] = self.query_filter.max_price
+        if self.query_filter.min_area:
+            variables["surfaceFrom"] = self.query_filter.min_area
+        if self.query_filter.max_area:
+            variables["surfaceTo"] = self.query_filter.max_area
 
-        with open(file_path) as query_file:
-            return {
-                "operationName": "AdvertList",
-                "query": query_file.read(),
-                "variables": variables,
-            }
+        return {
+            "operationName": "AdvertList",
+            "query": load_graphql_query("bezreality"),
+            "variables": variables,
+        }
+
+    def _build_request_template(self) -> RequestTemplate:
+        return RequestTemplate.post_json(
+            f"{ScraperBezrealitky.API}{ScraperBezrealitky.Routes.GRAPHQL}",
+            self._build_query(),
+        )
 
     @staticmethod
     def _create_link_to_offer(item: dict) -> str:
         return f"{ScraperBezrealitky.base_url}/{ScraperBezrealitky.Routes.OFFERS}{item}"
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
-        async with session.post(
-            f"{ScraperBezrealitky.API}{ScraperBezrealitky.Routes.GRAPHQL}",
-            json=self._build_query(),
-        ) as response:
-            data = await response.json()
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client)
 
         return [  # type: list[RentalOffer]
             RentalOffer(
@@ -88,5 +91,5 @@ class ScraperBezrealitky(ScraperBase):
                 price=f"{item['price']} / {item['charges']}",
                 image_url=item["mainImage"]["url"] if item["mainImage"] else "",
             )
-            for item in data["data"]["listAdverts"]["list"]
+            for item in response.iter_json_items("data", "listAdverts", "list")
         ]
@@ -1,11 +1,12 @@
 import re
 from urllib.parse import urljoin
 
-from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 
 from disposition import Disposition
+from http_client import HttpClient
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate
 from scrapers.scraper_base import ScraperBase
 
 
@@ -44,9 +45,15 @@ class ScraperBravis(ScraperBase):
         url += "typ-nabidky=pronajem-bytu&lokalita=cele-brno&vybavenost=nezalezi&q=&action=search&s=1-20-order-0"
         return url
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
-        async with session.get(self._get_url()) as response:
-            soup = BeautifulSoup(await response.text(), "html.parser")
+    def _build_request_template(self) -> RequestTemplate:
+        return RequestTemplate.get(self._get_url())
+
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client)
+        return await self.parse_offers(response.text())
+
+    def _parse_offers(self, html: str) -> list[RentalOffer]:
+        soup = BeautifulSoup(html, "html.parser")
 
         items: list[RentalOffer] = []
 
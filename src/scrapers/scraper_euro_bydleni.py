@@ -1,12 +1,13 @@
 import re
 from urllib.parse import urljoin
 
-from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 
-from config import config
 from disposition import Disposition
+from http_client import HttpClient
+from query_filter import FilterCapability
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate
 from scrapers.scraper_base import ScraperBase
 
 
@@ -14,6 +15,7 @@ class ScraperEuroBydleni(ScraperBase):
     name = "Eurobydlení"
     logo_url = "https://files.janchaloupka.cz/eurobydleni.png"
     color = 0xFA0F54
+    pushdown = FilterCapability.DISPOSITION | FilterCapability.PRICE | FilterCapability.AREA
     base_url = "https://www.eurobydleni.cz/search-form"
 
     cookies = {"listing-sort": "sort-added"}
@@ -35,10 +37,10 @@ class ScraperEuroBydleni(ScraperBase):
             "sql[advert_type_eu][]": 7,
             "sql[advert_subtype_eu][]": self.get_dispositions_data(),
             "sql[advert_function_eu][]": 3,
-            "sql[advert_price_min]": str(config.min_price) or "",
-            "sql[advert_price_max]": str(config.max_price) or "",
-            "sql[usable_area_min]": "",
-            "sql[usable_area_max]": "",
+            "sql[advert_price_min]": str(self.query_filter.min_price or ""),
+            "sql[advert_price_max]": str(self.query_filter.max_price or ""),
+            "sql[usable_area_min]": str(self.query_filter.min_area or ""),
+            "sql[usable_area_max]": str(self.query_filter.max_area or ""),
             "sql[estate_area_min]": "",
             "sql[estate_area_max]": "",
             "sql[locality][locality][input]": "Brno, Česko",
@@ -57,11 +59,15 @@ class ScraperEuroBydleni(ScraperBase):
             "sql[poptavka][telefon]": "",
         }
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
-        async with session.post(
-            self.base_url, cookies=self.cookies, data=self._get_data()
-        ) as response:
-            soup = BeautifulSoup(await response.text(), "html.parser")
+    def _build_request_template(self) -> RequestTemplate:
+        return RequestTemplate.post_form(self.base_url, self._get_data(), self.cookies)
+
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client)
+        return await self.parse_offers(response.text())
+
+    def _parse_offers(self, html: str) -> list[RentalOffer]:
+        soup = BeautifulSoup(html, "html.parser")
 
         items: list[RentalOffer] = []
 
@@ -1,11 +1,12 @@
 import re
 
-from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 
-from config import config
 from disposition import Disposition
+from http_client import HttpClient
+from query_filter import FilterCapability
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate
 from scrapers.scraper_base import ScraperBase
 
 
@@ -14,6 +15,7 @@ class ScraperIdnesReality(ScraperBase):
     name = "iDNES Reality"
     logo_url = "https://sta-reality2.1gr.cz/ui/image/favicons/favicon-32x32.png"
     color = 0x1D80D7
+    pushdown = FilterCapability.DISPOSITION | FilterCapability.PRICE
 
     disposition_mapping = {
         Disposition.FLAT_1KK: "s-qc%5BsubtypeFlat%5D%5B%5D=1k",
@@ -35,19 +37,28 @@ class ScraperIdnesReality(ScraperBase):
     def _get_url(self) -> str:
         url = "https://reality.idnes.cz/s/pronajem/byty"
 
-        if config.min_price and config.max_price:
-            url += f"/nad-{config.min_price}-do-{config.max_price}-za-mesic"
-        elif config.min_price:
-            url += f"/nad-{config.min_price}-za-mesic"
-        elif config.max_price:
-            url += f"/do-{config.max_price}-za-mesic"
+        min_price = self.query_filter.min_price
+        max_price = self.query_filter.max_price
+
+        if min_price and max_price:
+            url += f"/nad-{min_price}-do-{max_price}-za-mesic"
+        elif min_price:
+            url += f"/nad-{min_price}-za-mesic"
+        elif max_price:
+            url += f"/do-{max_price}-za-mesic"
 
         url += "/brno-mesto/?" + "&".join(self.get_dispositions_data())
         return url
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
-        async with session.get(self._get_url()) as response:
-            soup = BeautifulSoup(await response.text(), 'html.parser')
+    def _build_request_template(self) -> RequestTemplate:
+        return RequestTemplate.get(self._get_url())
+
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client)
+        return await self.parse_offers(response.text())
+
+    def _parse_offers(self, html: str) -> list[RentalOffer]:
+        soup = BeautifulSoup(html, 'html.parser')
 
         items: list[RentalOffer] = []
 
@@ -2,11 +2,12 @@ import json
 import re
 from urllib.parse import quote_plus
 
-from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 
 from disposition import Disposition
+from http_client import HttpClient
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate
 from scrapers.scraper_base import ScraperBase
 
 
@@ -41,11 +42,17 @@ class ScraperRealcity(ScraperBase):
         }
         return quote_plus(json.dumps(filters))
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
-        url = f"https://www.realcity.cz/pronajem-bytu/brno-mesto-68/?sp={self._get_filters()}"
+    def _build_request_template(self) -> RequestTemplate:
+        return RequestTemplate.get(
+            f"https://www.realcity.cz/pronajem-bytu/brno-mesto-68/?sp={self._get_filters()}"
+        )
 
-        async with session.get(url) as response:
-            soup = BeautifulSoup(await response.text(), "html.parser")
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client)
+        return await self.parse_offers(response.text())
+
+    def _parse_offers(self, html: str) -> list[RentalOffer]:
+        soup = BeautifulSoup(html, "html.parser")
 
         items: list[RentalOffer] = []
 
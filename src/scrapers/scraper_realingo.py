@@ -1,13 +1,11 @@
-from pathlib import Path
-from posixpath import dirname
 from typing import Any
 from urllib.parse import urljoin
 
-from aiohttp import ClientSession
-
-from config import config
 from disposition import Disposition
+from http_client import HttpClient
+from query_filter import FilterCapability
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate, load_graphql_query
 from scrapers.scraper_base import ScraperBase
 
 
@@ -16,6 +14,7 @@ class ScraperRealingo(ScraperBase):
     name = "realingo"
     logo_url = "https://www.realingo.cz/_next/static/media/images/android-chrome-144x144-cf1233ce.png"
     color = 0x00BC78
+    pushdown = FilterCapability.DISPOSITION | FilterCapability.PRICE | FilterCapability.AREA
     base_url = "https://www.realingo.cz/graphql"
 
     disposition_mapping = {
@@ -32,27 +31,31 @@ class ScraperRealingo(ScraperBase):
     }
 
     def _build_query(self) -> dict[str, Any]:
-        file_path = Path(dirname(__file__)) / "../../graphql/realingo.graphql"
-
-        with open(file_path) as query_file:
-            return {
-                "query": query_file.read(),
-                "operationName": "SearchOffer",
-                "variables": {
-                    "purpose": "RENT",
-                    "property": "FLAT",
-                    "address": "Brno",
-                    "saved": False,
-                    "categories": self.get_dispositions_data(),
-                    "sort": "NEWEST",
-                    "first": 300,
-                    "skip": 0,
-                    "price": {
-                        "from": config.min_price,
-                        "to": config.max_price,
-                    }
-                }
+        return {
+            "query": load_graphql_query("realingo"),
+            "operationName": "SearchOffer",
+            "variables": {
+                "purpose": "RENT",
+                "property": "FLAT",
+                "address": "Brno",
+                "saved": False,
+                "categories": self.get_dispositions_data(),
+                "sort": "NEWEST",
+                "first": 300,
+                "skip": 0,
+                "price": {
+                    "from": self.query_filter.min_price,
+                    "to": self.query_filter.max_price,
+                },
+                "area": {
+                    "from": self.query_filter.min_area,
+                    "to": self.query_filter.max_area,
+                },
             }
+        }
+
+    def _build_request_template(self) -> RequestTemplate:
+        return RequestTemplate.post_json(self.base_url, self._build_query())
 
     def category_to_string(self, id) -> str:
         return {
@@ -94,20 +97,26 @@ class ScraperRealingo(ScraperBase):
         }.get(id, "")
 
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
-        async with session.post(self.base_url, json=self._build_query()) as response:
-            data = await response.json()
+    @staticmethod
+    def _coordinates(location: dict) -> tuple[float, float] | None:
+        if location.get("latitude") is None or location.get("longitude") is None:
+            return None
+        return (location["latitude"], location["longitude"])
+
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client)
 
         items: list[RentalOffer] = []
 
-        for offer in data["data"]["searchOffer"]["items"]:
+        for offer in response.iter_json_items("data", "searchOffer", "items"):
             items.append(RentalOffer(
                 scraper = self,
                 link = urljoin(self.base_url, offer["url"]),
                 title = self.category_to_string(offer["category"]) + ", " + str(offer["area"]["main"]) + " m²",
                 location = offer["location"]["address"],
                 price = offer["price"]["total"],
-                image_url = urljoin(self.base_url, "/static/images/" + (offer["photos"]["main"] or ""))
+                image_url = urljoin(self.base_url, "/static/images/" + (offer["photos"]["main"] or "")),
+                coordinates = self._coordinates(offer["location"])
             ))
 
         return items
@@ -1,12 +1,13 @@
 import re
 from urllib.parse import urljoin
 
-from aiohttp import ClientSession
 from bs4 import BeautifulSoup
 
-from config import config
 from disposition import Disposition
+from http_client import HttpClient
+from query_filter import FilterCapability
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate
 from scrapers.scraper_base import ScraperBase
 
 
@@ -15,6 +16,7 @@ class ScraperRemax(ScraperBase):
     name = "Remax"
     logo_url = "https://www.remax-czech.cz/apple-touch-icon.png"
     color = 0x003DA5
+    pushdown = FilterCapability.DISPOSITION | FilterCapability.PRICE
     base_url = "https://www.remax-czech.cz/reality/vyhledavani/"
 
     disposition_mapping = {
@@ -40,18 +42,24 @@ class ScraperRemax(ScraperBase):
         ),
     }
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
+    def _build_request_template(self) -> RequestTemplate:
         url = self.base_url + "?regions%5B116%5D%5B3702%5D=on&sale=2"
         url += "".join(self.get_dispositions_data())
         url += "&order_by_published_date=0"
 
-        if config.min_price:
-            url += f"&price_from={config.min_price}"
-        if config.max_price:
-            url += f"&price_to={config.max_price}"
+        if self.query_filter.min_price:
+            url += f"&price_from={self.query_filter.min_price}"
+        if self.query_filter.max_price:
+            url += f"&price_to={self.query_filter.max_price}"
 
-        async with session.get(url) as response:
-            soup = BeautifulSoup(await response.text(), 'html.parser')
+        return RequestTemplate.get(url)
+
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client)
+        return await self.parse_offers(response.text())
+
+    def _parse_offers(self, html: str) -> list[RentalOffer]:
+        soup = BeautifulSoup(html, 'html.parser')
 
         items: list[RentalOffer] = []
 
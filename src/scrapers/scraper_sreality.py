@@ -1,10 +1,11 @@
 from time import time
 from urllib.parse import urljoin
 
-from aiohttp import ClientSession
-
 from disposition import Disposition
+from http_client import HttpClient
+from query_filter import FilterCapability
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate
 from scrapers.scraper_base import ScraperBase
 
 
@@ -13,7 +14,19 @@ class ScraperSreality(ScraperBase):
     name = "Sreality"
     logo_url = "https://www.sreality.cz/img/icons/android-chrome-192x192.png"
     color = 0xCC0000
+    pushdown = FilterCapability.DISPOSITION | FilterCapability.PRICE | FilterCapability.AREA
     base_url = "https://www.sreality.cz"
+    supports_details = True
+
+    _detail_items = {
+        "Užitná plocha": "Plocha",
+        "Podlaží": "Podlaží",
+        "Stavba": "Stavba",
+        "Stav objektu": "Stav",
+        "Vybavení": "Vybavení",
+        "Poznámka k ceně": "Poplatky",
+    }
+    """Údaje z detailu nabídky, které se zobrazují (název v API -> zobrazený název)"""
 
     disposition_mapping = {
         Disposition.FLAT_1KK: "2",
@@ -101,19 +114,26 @@ class ScraperSreality(ScraperBase):
             "/" + offer["seo"]["locality"] +
             "/" + str(offer["hash_id"]))
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
+    def _build_request_template(self) -> RequestTemplate:
         url = self.base_url + "/api/cs/v2/estates?category_main_cb=1&category_sub_cb="
-        # TODO: price
         url += "|".join(self.get_dispositions_data())
         url += "&category_type_cb=2&locality_district_id=72&locality_region_id=14&per_page=20"
-        url += "&tms=" + str(int(time()))
 
-        async with session.get(url) as response:
-            data = await response.json()
+        # Rozsah "od|do", horní mez nelze vynechat
+        query_filter = self.query_filter
+        if query_filter.min_price or query_filter.max_price:
+            url += f"&czk_price_summary_order2={query_filter.min_price or 0}|{query_filter.max_price or 10000000000}"
+        if query_filter.min_area or query_filter.max_area:
+            url += f"&usable_area={query_filter.min_area or 0}|{query_filter.max_area or 10000000000}"
+
+        return RequestTemplate.get(url)
+
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client, tms=int(time()))
 
         items: list[RentalOffer] = []
 
-        for item in data["_embedded"]["estates"]:
+        for item in response.iter_json_items("_embedded", "estates"):
             # Ignorovat "tip" nabídky, které úplně neodpovídají filtrům a mění se s každým vyhledáváním
             if item["region_tip"] > 0:
                 continue
@@ -124,7 +144,36 @@ class ScraperSreality(ScraperBase):
                 title = item["name"],
                 location = item["locality"],
                 price = item["price_czk"]["value_raw"],
-                image_url = item["_links"]["image_middle2"][0]["href"]
+                image_url = item["_links"]["image_middle2"][0]["href"],
+                coordinates = (item["gps"]["lat"], item["gps"]["lon"]) if item.get("gps") else None
             ))
 
         return items
+
+    async def get_offer_details(
+        self, client: HttpClient, offer: RentalOffer
+    ) -> dict[str, str]:
+        hash_id = offer.link.rstrip("/").rsplit("/", 1)[-1]
+
+        response = await client.get(f"{self.base_url}/api/cs/v2/estates/{hash_id}")
+        data = response.json()
+
+        details: dict[str, str] = {}
+        for item in data.get("items", []):
+            if item["name"] not in self._detail_items:
+                continue
+
+            value = item["value"]
+            if isinstance(value, list):
+                value = ", ".join(str(v["value"]) for v in value)
+            elif isinstance(value, bool):
+                value = "ano" if value else "ne"
+            # Discord odmítne embed s prázdnou hodnotou pole
+            if value is None or not str(value).strip():
+                continue
+            if item.get("unit"):
+                value = f"{value} {item['unit']}"
+
+            details[self._detail_items[item["name"]]] = str(value)
+
+        return details
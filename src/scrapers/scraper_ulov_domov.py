@@ -1,10 +1,10 @@
 from typing import Any
 
-from aiohttp import ClientSession
-
-from config import config
 from disposition import Disposition
+from http_client import HttpClient
+from query_filter import FilterCapability
 from scrapers.rental_offer import RentalOffer
+from scrapers.request_template import RequestTemplate
 from scrapers.scraper_base import ScraperBase
 
 
@@ -12,6 +12,7 @@ class ScraperUlovDomov(ScraperBase):
     name = "UlovDomov"
     logo_url = "https://www.ulovdomov.cz/favicon.png"
     color = 0xFFFFFF
+    pushdown = FilterCapability.DISPOSITION | FilterCapability.PRICE
     base_url = (
         "https://ud.api.ulovdomov.cz/v1/offer/find?page=1&perPage=20&sorting=latest"
     )
@@ -47,10 +48,10 @@ class ScraperUlovDomov(ScraperBase):
 
     def _get_data(self) -> dict[str, Any]:
         price_cfg = {}
-        if config.min_price:
-            price_cfg["min"] = config.min_price
-        if config.max_price:
-            price_cfg["max"] = config.max_price
+        if self.query_filter.min_price:
+            price_cfg["min"] = self.query_filter.min_price
+        if self.query_filter.max_price:
+            price_cfg["max"] = self.query_filter.max_price
 
         return {
             "bounds": {
@@ -60,15 +61,24 @@ class ScraperUlovDomov(ScraperBase):
             "offerType": "rent",
             "propertyType": "flat",
             "disposition": self.get_dispositions_data(),
-            "price": {"min": 10000, "max": 20000},
+            "price": price_cfg,
         }
 
-    async def get_latest_offers(self, session: ClientSession) -> list[RentalOffer]:
-        async with session.post(self.base_url, json=self._get_data()) as response:
-            data = await response.json()
+    def _build_request_template(self) -> RequestTemplate:
+        return RequestTemplate.post_json(self.base_url, self._get_data())
+
+    @staticmethod
+    def _coordinates(offer: dict) -> tuple[float, float] | None:
+        gps = offer.get("geoCoordinates") or {}
+        if gps.get("lat") is None or gps.get("lng") is None:
+            return None
+        return (gps["lat"], gps["lng"])
+
+    async def get_latest_offers(self, client: HttpClient) -> list[RentalOffer]:
+        response = await self.request_template.send(client)
 
         items: list[RentalOffer] = []
-        for offer in data["data"]["offers"]:
+        for offer in response.iter_json_items("data", "offers"):
             location = offer["village"]["title"]
             if offer["street"] is not None:
                 location = offer["street"]["title"] + ", " + location
@@ -85,6 +95,7 @@ class ScraperUlovDomov(ScraperBase):
                     location=location,
                     price=offer["rentalPrice"]["value"],
                     image_url=offer["photos"][0]["path"],
+                    coordinates=self._coordinates(offer),
                 )
             )
 
@@ -1,47 +1,97 @@
 import asyncio
+import importlib
 import logging
 import traceback
 
-from aiohttp import ClientSession
-
+from config import config
 from disposition import Disposition
+from http_client import HttpClient, get_http_client
+from query_filter import QueryFilter
 from scrapers.rental_offer import RentalOffer
 from scrapers.scraper_base import ScraperBase
-from scrapers.scraper_bravis import ScraperBravis
-from scrapers.scraper_euro_bydleni import ScraperEuroBydleni
-from scrapers.scraper_idnes_reality import ScraperIdnesReality
-from scrapers.scraper_realcity import ScraperRealcity
-from scrapers.scraper_realingo import ScraperRealingo
-from scrapers.scraper_remax import ScraperRemax
-from scrapers.scraper_sreality import ScraperSreality
-from scrapers.scraper_ulov_domov import ScraperUlovDomov
-from scrapers.scraper_bezrealitky import ScraperBezrealitky
 from utils import flatten
 
+SCRAPER_REGISTRY: dict[str, str] = {
+    "bravis": "scrapers.scraper_bravis:ScraperBravis",
+    "euro_bydleni": "scrapers.scraper_euro_bydleni:ScraperEuroBydleni",
+    "idnes_reality": "scrapers.scraper_idnes_reality:ScraperIdnesReality",
+    "realcity": "scrapers.scraper_realcity:ScraperRealcity",
+    "realingo": "scrapers.scraper_realingo:ScraperRealingo",
+    "remax": "scrapers.scraper_remax:ScraperRemax",
+    "sreality": "scrapers.scraper_sreality:ScraperSreality",
+    "ulov_domov": "scrapers.scraper_ulov_domov:ScraperUlovDomov",
+    "bezrealitky": "scrapers.scraper_bezrealitky:ScraperBezrealitky",
+}
+"""Dostupné scrapery, klíč je název použitelný v konfiguraci `SCRAPERS`
+
+Moduly scraperů se importují až při vytvoření, takže se nenačítají závislosti
+(např. BeautifulSoup) scraperů, které nejsou zapnuté.
+"""
+
+
+def get_enabled_scrapers() -> list[str]:
+    """Vrátí názvy zapnutých scraperů podle konfigurace (ve výchozím stavu všechny)"""
+    if not config.scrapers or config.scrapers.strip() == "all":
+        return list(SCRAPER_REGISTRY)
+
+    return [name.strip() for name in config.scrapers.split(",") if name.strip()]
+
+
+def load_scraper_class(name: str) -> type[ScraperBase]:
+    """Naimportuje třídu scraperu
+
+    Args:
+        name (str): Klíč z `SCRAPER_REGISTRY` nebo přímo cesta `modul:Třída` (pro vlastní scrapery)
+
+    Returns:
+        type[ScraperBase]: Třída scraperu
+    """
+    target = SCRAPER_REGISTRY.get(name, name)
+    module_name, _, class_name = target.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown scraper: {name}")
+
+    return getattr(importlib.import_module(module_name), class_name)
+
 
 def create_scrapers(dispositions: Disposition) -> list[ScraperBase]:
-    return [
-        ScraperBravis(dispositions),
-        ScraperEuroBydleni(dispositions),
-        ScraperIdnesReality(dispositions),
-        ScraperRealcity(dispositions),
-        ScraperRealingo(dispositions),
-        ScraperRemax(dispositions),
-        ScraperSreality(dispositions),
-        ScraperUlovDomov(dispositions),
-        ScraperBezrealitky(dispositions),
+    """Scrapery zapnuté v konfiguraci
+
+    Filtry ceny a plochy se z konfigurace převezmou jen teď (jsou součástí předem
+    sestavených dotazů), po jejich změně je potřeba scrapery vytvořit znovu.
+    """
+    query_filter = QueryFilter.from_config(dispositions)
+    scrapers = [
+        create_scraper(name, dispositions, query_filter)
+        for name in get_enabled_scrapers()
     ]
 
+    for scraper in scrapers:
+        client_side = query_filter.requested & ~scraper.pushdown
+        if client_side:
+            logging.debug(f"{scraper.name} filters {client_side} only after download")
+
+    return scrapers
+
+
+def create_scraper(
+    name: str, dispositions: Disposition, query_filter: QueryFilter | None = None
+) -> ScraperBase:
+    scraper = load_scraper_class(name)(dispositions, query_filter)
+    scraper.registry_name = name
+    return scraper
+
 
 async def _fetch_offers(
-    session: ClientSession, scraper: ScraperBase
+    client: HttpClient, scraper: ScraperBase
 ) -> list[RentalOffer]:
     try:
-        data = await scraper.get_latest_offers(session)
+        data = await scraper.get_latest_offers(client)
         logging.info(f"Fetched {len(data)} offers from {scraper.name}")
         return data
     except Exception:
         logging.error(traceback.format_exc())
+        return []
 
 
 async def fetch_latest_offers(scrapers: list[ScraperBase]) -> list[RentalOffer]:
@@ -51,10 +101,35 @@ async def fetch_latest_offers(scrapers: list[ScraperBase]) -> list[RentalOffer]:
         list[RentalOffer]: Seznam nabídek
     """
 
-    user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/111.0.0.0 Safari/537.36"
-    headers = {"User-Agent": user_agent}
+    client = get_http_client()
+
+    if config.capture_responses and scrapers:
+        return await _fetch_and_capture(client, scrapers)
+
+    offers = await asyncio.gather(*[_fetch_offers(client, s) for s in scrapers])
 
-    async with ClientSession(headers=headers) as session:
-        offers = await asyncio.gather(*[_fetch_offers(session, s) for s in scrapers])
+    return list(flatten(offers))
+
+
+async def _fetch_and_capture(
+    client: HttpClient, scrapers: list[ScraperBase]
+) -> list[RentalOffer]:
+    """Stáhne nabídky a všechny odpovědi serverů uloží do archivu tohoto kola"""
+    from capture import RecordingTransport, get_capture_store
+
+    archive = get_capture_store().start_cycle(scrapers[0].query_filter)
+    try:
+        offers = await asyncio.gather(*[
+            _fetch_offers(
+                client.with_transport(
+                    RecordingTransport(client.transport, archive, s.registry_name)
+                ),
+                s,
+            )
+            for s in scrapers
+        ])
+    finally:
+        archive.close()
 
+    logging.info(f"Captured {len(archive.entries)} responses to {archive.path}")
     return list(flatten(offers))
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import sys
+from abc import abstractmethod
+from time import time
+from typing import TextIO
+
+from config import data_path
+from http_client import get_http_client
+from scrapers.rental_offer import RentalOffer
+
+
+class SinkError(Exception):
+    """Nabídky se nepodařilo předat, zůstávají ve frontě k odeslání"""
+
+
+class OfferSink:
+    """Cíl, kam headless režim posílá nalezené nabídky"""
+
+    digest: bool = False
+    """Posílat nabídky souhrnně po oknech `DIGEST_WINDOW_MINUTES` (viz `digest.py`)"""
+
+    @abstractmethod
+    async def emit(self, offers: list[RentalOffer]):
+        """Předá dávku nabídek z fronty k odeslání, při neúspěchu vyhodí výjimku
+
+        Args:
+            offers (list[RentalOffer]): Nové vyfiltrované nabídky bez duplicit
+        """
+        raise NotImplementedError("Emitting offers is not implemented")
+
+    async def cycle_finished(self):
+        """Zavolá se jednou po každém kole stahování, i když nic nového nenašlo"""
+
+    async def close(self):
+        pass
+
+
+class JsonLinesSink(OfferSink):
+    """Zapisuje každou nabídku jako jeden řádek JSON"""
+
+    def __init__(self, stream: TextIO, close_stream: bool = False):
+        self.stream = stream
+        self.close_stream = close_stream
+
+    async def emit(self, offers: list[RentalOffer]):
+        for offer in offers:
+            self.stream.write(json.dumps(offer.to_dict(), ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+    async def close(self):
+        if self.close_stream:
+            self.stream.close()
+
+
+class WebhookSink(OfferSink):
+    """Posílá nabídky metodou POST jako JSON `{"offers": [...]}` na zadanou URL"""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    async def emit(self, offers: list[RentalOffer]):
+        if not offers:
+            return
+
+        payload = {"offers": [o.to_dict() for o in offers]}
+        response = await get_http_client().post(self.url, json_data=payload)
+        if response.status > 299:
+            raise SinkError(f"Webhook {self.url} responded with status {response.status}")
+
+
+class DiscordWebhookSink(OfferSink):
+    """Posílá nabídky jako embedy přes Discord webhook (bez připojení ke gateway)"""
+
+    def __init__(self, url: str):
+        from digest import digest_enabled
+        from discord_webhook import DiscordWebhook
+
+        self.webhook = DiscordWebhook(url, data_path("discord_webhook_status"))
+        self.digest = digest_enabled()
+
+    async def emit(self, offers: list[RentalOffer]):
+        from digest import build_digest_embeds
+        from embeds import build_embed
+
+        if self.digest:
+            await self.webhook.send(build_digest_embeds(offers))
+        else:
+            await self.webhook.send([build_embed(offer) for offer in offers])
+
+    async def cycle_finished(self):
+        # Obdoba tématu kanálu, které bot mění po každém kole
+        await self.webhook.update_status(f"Last update <t:{int(time())}:R>")
+
+
+def sink_target(spec: str) -> str:
+    """Název cíle ve frontě k odeslání, URL (mohou obsahovat token) se nahradí hashem"""
+    kind, _, target = spec.partition(":")
+    if kind in ("webhook", "discord"):
+        return f"{kind}:{hashlib.sha1(target.encode()).hexdigest()[:10]}"
+    return spec
+
+
+def create_sink(spec: str) -> OfferSink:
+    """Vytvoří cíl podle zápisu z příkazové řádky
+
+    Args:
+        spec (str): `stdout`, `file:CESTA`, `webhook:URL` nebo `discord:URL_WEBHOOKU`
+
+    Returns:
+        OfferSink: Cíl pro nabídky
+    """
+    kind, _, target = spec.partition(":")
+
+    if kind == "stdout":
+        return JsonLinesSink(sys.stdout)
+    if kind == "file" and target:
+        return JsonLinesSink(open(target, "a", encoding="utf-8"), close_stream=True)
+    if kind == "webhook" and target:
+        return WebhookSink(target)
+    if kind == "discord" and target:
+        return DiscordWebhookSink(target)
+
+    raise ValueError(f"Unknown sink: {spec}")
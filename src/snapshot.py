@@ -0,0 +1,240 @@
+"""Snímek stavu aplikace pro rychlý start po restartu
+
+Na konci každého kola se do složky `state` uloží:
+
+- `seen_links.<generace>.npy` - seřazené 64bitové hashe ID dříve nalezených nabídek
+  (`offer_identity.offer_id`), po startu se jen namapují do paměti
+  (`np.load(mmap_mode="r")`) místo čtení celého `FOUND_OFFERS_FILE`
+- `image_hashes.<generace>.npy` - historie hashů obrázků (`IMAGE_DEDUPLICATION_HISTORY`)
+- `state.json` - odkaz na aktuální generaci, velikost `FOUND_OFFERS_FILE` v okamžiku
+  snímku, poslední stažení jednotlivých scraperů a ETag/Last-Modified odpovědí serverů
+
+`state.json` se zapisuje jako poslední a atomicky, takže po pádu uprostřed zápisu zůstává
+platný předchozí snímek.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from config import config, data_path
+from http_client import HttpResponse, get_http_client
+from scrapers.rental_offer import RentalOffer
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from offers_storage import OffersStorage
+
+SNAPSHOT_VERSION = 2
+STATE_FILE = "state.json"
+
+_scraper_markers: dict[str, dict[str, Any]] = {}
+"""Poslední stažení jednotlivých scraperů, viz `scraper_markers`"""
+
+
+def link_hash(link: str) -> int:
+    """64bitový hash odkazu nebo ID nabídky pro index dříve nalezených nabídek"""
+    return int.from_bytes(hashlib.blake2b(link.encode(), digest_size=8).digest(), "little")
+
+
+def hash_links(links: set[str] | list[str]) -> "np.ndarray":
+    """Seřazené hashe odkazů bez duplicit"""
+    # NumPy se načítá až při práci se snímkem, start bez snímku ho nepotřebuje
+    import numpy as np
+
+    return np.unique(np.fromiter((link_hash(link) for link in links), np.uint64, len(links)))
+
+
+@dataclass
+class Snapshot:
+    """Načtený snímek stavu"""
+
+    seen_links: "np.ndarray"
+    """Seřazené hashe ID nabídek (namapované ze souboru, jen pro čtení)"""
+
+    found_offers_size: int
+    """Velikost `FOUND_OFFERS_FILE` v okamžiku snímku, novější řádky se dočtou ze souboru"""
+
+    image_hashes: "np.ndarray | None" = None
+    scrapers: dict[str, dict[str, Any]] = field(default_factory=dict)
+    validators: dict[str, HttpResponse] = field(default_factory=dict)
+    created_at: str | None = None
+
+
+def get_snapshot_dir() -> Path:
+    return config.snapshot_dir or data_path("state")
+
+
+def _encode_response(response: HttpResponse) -> dict[str, Any]:
+    return {
+        "status": response.status,
+        "url": response.url,
+        "headers": response.headers,
+        "body": base64.b64encode(response.body).decode(),
+        "encoding": response.encoding,
+    }
+
+
+def _decode_response(data: dict[str, Any]) -> HttpResponse:
+    return HttpResponse(
+        status=data["status"],
+        url=data["url"],
+        headers=data["headers"],
+        body=base64.b64decode(data["body"]),
+        encoding=data["encoding"],
+    )
+
+
+def load_snapshot(directory: Path | None = None) -> Snapshot | None:
+    """Načte poslední snímek, pokud existuje a odpovídá aktuálnímu `FOUND_OFFERS_FILE`"""
+    directory = directory or get_snapshot_dir()
+
+    try:
+        with open(directory / STATE_FILE) as state_file:
+            state = json.load(state_file)
+    except FileNotFoundError:
+        return None
+
+    if state.get("version") != SNAPSHOT_VERSION:
+        return None
+
+    try:
+        found_offers_size = os.path.getsize(config.found_offers_file)
+    except FileNotFoundError:
+        found_offers_size = -1
+
+    if found_offers_size < state["found_offers_size"]:
+        # Soubor s nabídkami byl smazán nebo zkrácen, snímek už neplatí
+        logging.info("Found offers file changed since the state snapshot, ignoring it")
+        return None
+
+    import numpy as np
+
+    generation = state["generation"]
+    image_hashes_path = directory / f"image_hashes.{generation}.npy"
+
+    return Snapshot(
+        seen_links=np.load(directory / f"seen_links.{generation}.npy", mmap_mode="r"),
+        found_offers_size=state["found_offers_size"],
+        image_hashes=np.load(image_hashes_path) if image_hashes_path.exists() else None,
+        scrapers=state["scrapers"],
+        validators={url: _decode_response(r) for url, r in state["validators"].items()},
+        created_at=state["created_at"],
+    )
+
+
+def write_snapshot(
+    seen_links: "np.ndarray",
+    found_offers_size: int,
+    image_hashes: "np.ndarray | None",
+    scrapers: dict[str, dict[str, Any]],
+    directory: Path | None = None,
+):
+    """Atomicky uloží snímek stavu a smaže soubory předchozích generací"""
+    import numpy as np
+
+    directory = directory or get_snapshot_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    generation = datetime.now().strftime("%Y%m%d%H%M%S%f")
+
+    np.save(directory / f"seen_links.{generation}.npy", seen_links)
+    if image_hashes is not None:
+        np.save(directory / f"image_hashes.{generation}.npy", image_hashes)
+
+    state = {
+        "version": SNAPSHOT_VERSION,
+        "generation": generation,
+        "created_at": datetime.now().isoformat(),
+        "found_offers_size": found_offers_size,
+        "scrapers": scrapers,
+        "validators": {
+            url: _encode_response(r) for url, r in get_http_client().validators.items()
+        },
+    }
+
+    temp_path = directory / f"{STATE_FILE}.tmp"
+    with open(temp_path, "w") as state_file:
+        json.dump(state, state_file)
+        state_file.flush()
+        os.fsync(state_file.fileno())
+    os.replace(temp_path, directory / STATE_FILE)
+
+    for path in directory.glob("*.npy"):
+        if path.name.split(".")[1] != generation:
+            path.unlink(missing_ok=True)
+
+
+def scraper_markers(
+    offers: list[RentalOffer], previous: dict[str, dict[str, Any]]
+) -> dict[str, dict[str, Any]]:
+    """Poslední úspěšné stažení každého scraperu (čas, počet a nejnovější odkaz)
+
+    Scrapery, které v tomto kole nic nevrátily, si ponechají předchozí záznam.
+    """
+    markers = dict(previous)
+    fetched_at = datetime.now().isoformat()
+
+    by_scraper: dict[str, list[RentalOffer]] = {}
+    for offer in offers:
+        name = offer.scraper.registry_name or offer.scraper.name
+        by_scraper.setdefault(name, []).append(offer)
+
+    for name, scraper_offers in by_scraper.items():
+        markers[name] = {
+            "fetched_at": fetched_at,
+            "offers": len(scraper_offers),
+            "newest_link": scraper_offers[0].link,
+        }
+
+    return markers
+
+
+def warm_start() -> Snapshot | None:
+    """Načte snímek a obnoví z něj historii hashů obrázků a ETag/Last-Modified odpovědí
+
+    `OffersStorage` si ze snímku načte odkazy samo, viz `OffersStorage(path, snapshot)`.
+    """
+    if not config.state_snapshot:
+        return None
+
+    start = perf_counter()
+    snapshot = load_snapshot()
+    if snapshot is None:
+        return None
+
+    get_http_client().validators.update(snapshot.validators)
+    _scraper_markers.update(snapshot.scrapers)
+
+    if snapshot.image_hashes is not None:
+        from transformations import restore_hash_history
+
+        restore_hash_history(snapshot.image_hashes)
+
+    logging.info(
+        f"Warm start from snapshot of {snapshot.created_at}: {len(snapshot.seen_links)} links, "
+        f"{len(snapshot.scrapers)} scrapers, loaded in {(perf_counter() - start) * 1000:.1f} ms"
+    )
+    return snapshot
+
+
+def save_cycle_state(storage: "OffersStorage", offers: list[RentalOffer]):
+    """Uloží snímek stavu na konci kola stahování"""
+    from transformations import get_hash_history
+
+    start = perf_counter()
+    _scraper_markers.update(scraper_markers(offers, _scraper_markers))
+
+    write_snapshot(
+        storage.link_hashes(),
+        os.path.getsize(storage.path) if os.path.exists(storage.path) else 0,
+        get_hash_history(),
+        _scraper_markers,
+    )
+    logging.debug(f"State snapshot written in {(perf_counter() - start) * 1000:.1f} ms")
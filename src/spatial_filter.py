@@ -0,0 +1,178 @@
+"""Filtr nabídek podle polohy (okruh kolem bodu nebo mnohoúhelník)
+
+Oblast se při vytvoření filtru rozdělí na mřížku (nejvýše `MAX_GRID_CELLS` buněk na
+stranu). Každá buňka je celá uvnitř, celá venku, nebo na hranici. Pro bod uvnitř nebo
+venku stačí spočítat jeho buňku, přesný výpočet (vzdálenost, paprsek přes hrany
+mnohoúhelníku) se dělá jen v buňkách na hranici. Souřadnice se převádějí na kilometry
+rovnoběžkovým zobrazením kolem středu oblasti, což v měřítku města stačí.
+"""
+import math
+from bisect import bisect_right
+from functools import lru_cache
+
+from config import config
+
+EARTH_RADIUS_KM = 6371.0
+MAX_GRID_CELLS = 256
+MIN_CELL_KM = 0.02
+
+_OUTSIDE, _INSIDE, _BOUNDARY = 0, 1, 2
+
+
+def parse_point(text: str) -> tuple[float, float]:
+    """Bod ve tvaru `šířka,délka`
+
+    Raises:
+        ValueError: Neplatný zápis
+    """
+    lat, lon = (float(part) for part in text.split(","))
+    return lat, lon
+
+
+def parse_polygon(text: str) -> list[tuple[float, float]]:
+    """Mnohoúhelník ve tvaru `šířka,délka;šířka,délka;...` (alespoň tři body)
+
+    Raises:
+        ValueError: Neplatný zápis
+    """
+    points = [parse_point(part) for part in text.split(";") if part.strip()]
+    if len(points) < 3:
+        raise ValueError("Polygon needs at least three points")
+    return points
+
+
+class SpatialFilter:
+    """Oblast, ve které musí nabídka ležet"""
+
+    def __init__(
+        self,
+        center: tuple[float, float] | None = None,
+        radius_km: float | None = None,
+        polygon: list[tuple[float, float]] | None = None,
+    ):
+        if polygon is None and (center is None or not radius_km):
+            raise ValueError("Either a polygon or a center with a radius is required")
+
+        self.radius_km = radius_km
+        self.center = center or (
+            sum(p[0] for p in polygon) / len(polygon),
+            sum(p[1] for p in polygon) / len(polygon),
+        )
+        self._km_per_lon = math.radians(1) * EARTH_RADIUS_KM * math.cos(math.radians(self.center[0]))
+        self._km_per_lat = math.radians(1) * EARTH_RADIUS_KM
+
+        self.polygon = [self._project(*p) for p in polygon] if polygon else None
+
+        if self.polygon:
+            xs, ys = [p[0] for p in self.polygon], [p[1] for p in self.polygon]
+            self._min_x, self._min_y = min(xs), min(ys)
+            extent = max(max(xs) - self._min_x, max(ys) - self._min_y)
+        else:
+            self._min_x = self._min_y = -radius_km
+            extent = 2 * radius_km
+
+        self.cell_km = max(extent / MAX_GRID_CELLS, MIN_CELL_KM)
+        self.size = math.ceil(extent / self.cell_km) + 1
+        self._cells = self._build_grid()
+
+    def _project(self, lat: float, lon: float) -> tuple[float, float]:
+        return (
+            (lon - self.center[1]) * self._km_per_lon,
+            (lat - self.center[0]) * self._km_per_lat,
+        )
+
+    def _exact(self, x: float, y: float) -> bool:
+        if self.polygon is None:
+            return math.hypot(x, y) <= self.radius_km
+
+        # Paprsek ve směru osy x, lichý počet průsečíků s hranami znamená bod uvnitř
+        inside = False
+        points = self.polygon
+        for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+            if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+    def _row_inside(self, y: float, xs: list[float]) -> list[bool]:
+        """Které body `xs` na vodorovné přímce `y` leží uvnitř (stejně jako `_exact`)"""
+        if self.polygon is None:
+            return [math.hypot(x, y) <= self.radius_km for x in xs]
+
+        # Průsečíky přímky s hranami se spočítají jednou pro celou řadu, bod je uvnitř,
+        # když jich napravo od něj leží lichý počet
+        points = self.polygon
+        crossings = sorted(
+            x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1])
+            if (y1 > y) != (y2 > y)
+        )
+        return [(len(crossings) - bisect_right(crossings, x)) % 2 == 1 for x in xs]
+
+    def _build_grid(self) -> bytearray:
+        cells = bytearray(self.size * self.size)
+
+        # Rohy buněk tvoří mřížku o jeden bod větší, sousední buňky je sdílí
+        xs = [self._min_x + i * self.cell_km for i in range(self.size + 1)]
+        corners = [
+            self._row_inside(self._min_y + j * self.cell_km, xs) for j in range(self.size + 1)
+        ]
+
+        for j in range(self.size):
+            below, above = corners[j], corners[j + 1]
+            for i in range(self.size):
+                inside = below[i] + below[i + 1] + above[i] + above[i + 1]
+                if inside == 4:
+                    cells[j * self.size + i] = _INSIDE
+                elif inside:
+                    cells[j * self.size + i] = _BOUNDARY
+
+        if self.polygon is not None:
+            self._mark_polygon_edges(cells)
+
+        return cells
+
+    def _mark_polygon_edges(self, cells: bytearray):
+        # Hrana může buňkou projít, i když jsou všechny rohy na stejné straně
+        # (úzký výběžek), proto se buňky podél hran a jejich sousedé označí jako hranice
+        points = self.polygon
+        for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+            steps = max(1, math.ceil(math.hypot(x2 - x1, y2 - y1) / (self.cell_km / 2)))
+            for step in range(steps + 1):
+                t = step / steps
+                i = int((x1 + t * (x2 - x1) - self._min_x) / self.cell_km)
+                j = int((y1 + t * (y2 - y1) - self._min_y) / self.cell_km)
+                for nj in range(max(j - 1, 0), min(j + 2, self.size)):
+                    for ni in range(max(i - 1, 0), min(i + 2, self.size)):
+                        cells[nj * self.size + ni] = _BOUNDARY
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Leží bod v oblasti?"""
+        x, y = self._project(lat, lon)
+        i = int((x - self._min_x) // self.cell_km)
+        j = int((y - self._min_y) // self.cell_km)
+
+        if not (0 <= i < self.size and 0 <= j < self.size):
+            return False
+
+        state = self._cells[j * self.size + i]
+        if state == _BOUNDARY:
+            return self._exact(x, y)
+        return state == _INSIDE
+
+
+@lru_cache(maxsize=4)
+def _create_filter(
+    center: str | None, radius_km: float | None, polygon: str | None
+) -> SpatialFilter:
+    return SpatialFilter(
+        parse_point(center) if center else None,
+        radius_km,
+        parse_polygon(polygon) if polygon else None,
+    )
+
+
+def get_spatial_filter() -> SpatialFilter | None:
+    """Filtr podle aktuální konfigurace, None pokud není nastaven"""
+    if not config.filter_polygon and not (config.filter_center and config.filter_radius_km):
+        return None
+    return _create_filter(config.filter_center, config.filter_radius_km, config.filter_polygon)
@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""Lokální náhradní server realitních serverů se syntetickými nabídkami
+
+Odpovídá ve stejném tvaru (JSON nebo HTML), jaký zpracovávají scrapery, pro všech devět
+serverů. Požadavky se na něj přesměrují přes `HostOverrideTransport`, původní host je
+první část cesty (`/www.sreality.cz/api/...`). Obrázky nabídek server generuje také.
+
+Každý server vrací `volume` nabídek od nejnovější. Při přechodu na další kolo
+(`POST /_control/cycle?n=N`) přibude `new_rate` nových nabídek. Část nabídek
+(`duplicate_rate`) je shodná s nabídkou stejného pořadí na jiném serveru (stejná adresa,
+plocha, cena i obrázek), obrázek má jen část nabídek (`image_rate`). Stránky a JSON
+se komprimují podle Accept-Encoding (zstd, brotli nebo gzip) jako na skutečných serverech.
+
+Spuštění: `python3 src/synthetic_portal.py [--port 8080] [--volume 20] ...`
+"""
+import argparse
+import asyncio
+import functools
+import gzip
+import html
+import io
+import json
+import random
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from aiohttp import web
+
+PORTALS = {
+    "www.sreality.cz": "sreality",
+    "ud.api.ulovdomov.cz": "ulov_domov",
+    "www.realingo.cz": "realingo",
+    "api.bezrealitky.cz": "bezrealitky",
+    "www.bravis.cz": "bravis",
+    "www.eurobydleni.cz": "euro_bydleni",
+    "reality.idnes.cz": "idnes_reality",
+    "www.realcity.cz": "realcity",
+    "www.remax-czech.cz": "remax",
+}
+"""Host serveru a název scraperu, který ho zpracovává"""
+
+DISPOSITIONS = [
+    # (text, Realingo, UlovDomov, Sreality category_sub_cb)
+    ("1+kk", "FLAT1_KK", "onePlusKk", 2),
+    ("1+1", "FLAT11", "onePlusOne", 3),
+    ("2+kk", "FLAT2_KK", "twoPlusKk", 4),
+    ("2+1", "FLAT21", "twoPlusOne", 5),
+    ("3+kk", "FLAT3_KK", "threePlusKk", 6),
+    ("3+1", "FLAT31", "threePlusOne", 7),
+]
+
+STREETS = [
+    "Veveří", "Kounicova", "Purkyňova", "Palackého třída", "Štefánikova", "Lidická",
+    "Cejl", "Křenová", "Masarykova", "Kotlářská", "Botanická", "Údolní", "Husitská",
+]
+DISTRICTS = [
+    "Královo Pole", "Žabovřesky", "Líšeň", "Bystrc", "Veveří", "Černá Pole", "Komín",
+    "Židenice", "Trnitá", "Ponava",
+]
+
+_IMAGE_RE = re.compile(r"synthetic-(\d+)\.png$")
+
+
+@dataclass
+class PortalOptions:
+    volume: int = 20
+    """Počet nabídek v odpovědi každého serveru"""
+
+    new_rate: float = 0.2
+    """Podíl nových nabídek v každém dalším kole"""
+
+    duplicate_rate: float = 0.1
+    """Podíl nabídek shodných s nabídkou na jiném serveru"""
+
+    image_rate: float = 0.8
+    """Podíl nabídek s obrázkem"""
+
+    delay_ms: int = 0
+    """Umělé zpoždění každé odpovědi"""
+
+    seed: int = 42
+
+
+@dataclass
+class Listing:
+    id: int
+    disposition: tuple[str, str, str, int]
+    area: int
+    price: int
+    street: str
+    district: str
+    image: int | None
+    coordinates: tuple[float, float]
+
+    @property
+    def title(self) -> str:
+        return f"Pronájem bytu {self.disposition[0]} {self.area} m²"
+
+    @property
+    def address(self) -> str:
+        return f"{self.street}, Brno - {self.district}"
+
+    def image_url(self, host: str) -> str:
+        if self.image is None:
+            return f"https://{host}/img/missing.png"
+        return f"https://{host}/img/synthetic-{self.image}.png"
+
+
+class ListingGenerator:
+    """Deterministicky generované nabídky, stejné kolo vrací vždy stejné nabídky"""
+
+    def __init__(self, options: PortalOptions):
+        self.options = options
+        self.cycle = 0
+
+    def listings(self, portal: str) -> list[Listing]:
+        portal_index = list(PORTALS.values()).index(portal)
+        new_per_cycle = round(self.options.volume * self.options.new_rate)
+        newest = self.cycle * new_per_cycle + self.options.volume
+
+        return [
+            self._listing(portal_index, number)
+            for number in range(newest - 1, newest - 1 - self.options.volume, -1)
+        ]
+
+    def _listing(self, portal_index: int, number: int) -> Listing:
+        rng = random.Random(f"{self.options.seed}:{portal_index}:{number}")
+        is_duplicate = portal_index > 0 and rng.random() < self.options.duplicate_rate
+
+        # Duplicita přebírá údaje nabídky stejného pořadí z prvního serveru
+        attributes = random.Random(
+            f"{self.options.seed}:{0 if is_duplicate else portal_index}:{number}:attributes"
+        )
+        has_image = attributes.random() < self.options.image_rate
+
+        return Listing(
+            id=portal_index * 10_000_000 + number,
+            disposition=attributes.choice(DISPOSITIONS),
+            area=attributes.randint(25, 95),
+            price=attributes.randrange(8_000, 35_000, 100),
+            street=f"{attributes.choice(STREETS)} {attributes.randint(1, 120)}",
+            district=attributes.choice(DISTRICTS),
+            image=attributes.getrandbits(31) if has_image else None,
+            coordinates=(attributes.uniform(49.15, 49.26), attributes.uniform(16.52, 16.70)),
+        )
+
+
+def _price_text(price: int) -> str:
+    return f"{price:,}".replace(",", " ") + " Kč"
+
+
+def render_sreality(listings: list[Listing]) -> dict:
+    return {"_embedded": {"estates": [
+        {
+            "region_tip": 0,
+            "hash_id": listing.id,
+            "name": listing.title,
+            "locality": listing.address,
+            "price_czk": {"value_raw": listing.price},
+            "_links": {"image_middle2": [{"href": listing.image_url("www.sreality.cz")}]},
+            "gps": {"lat": listing.coordinates[0], "lon": listing.coordinates[1]},
+            "seo": {
+                "category_type_cb": 2,
+                "category_main_cb": 1,
+                "category_sub_cb": listing.disposition[3],
+                "locality": "brno-" + re.sub(r"\W+", "-", listing.district.lower()),
+            },
+        }
+        for listing in listings
+    ]}}
+
+
+def render_ulov_domov(listings: list[Listing]) -> dict:
+    return {"data": {"offers": [
+        {
+            "absoluteUrl": f"https://www.ulovdomov.cz/inzerat/{listing.id}",
+            "disposition": listing.disposition[2],
+            "area": listing.area,
+            "village": {"title": "Brno"},
+            "street": {"title": listing.street},
+            "villagePart": {"title": listing.district},
+            "rentalPrice": {"value": listing.price},
+            "photos": [{"path": listing.image_url("ud.api.ulovdomov.cz")}],
+            "geoCoordinates": {"lat": listing.coordinates[0], "lng": listing.coordinates[1]},
+        }
+        for listing in listings
+    ]}}
+
+
+def render_realingo(listings: list[Listing]) -> dict:
+    return {"data": {"searchOffer": {"items": [
+        {
+            "url": f"/pronajem/{listing.id}",
+            "category": listing.disposition[1],
+            "area": {"main": listing.area},
+            "location": {
+                "address": listing.address,
+                "latitude": listing.coordinates[0],
+                "longitude": listing.coordinates[1],
+            },
+            "price": {"total": listing.price},
+            "photos": {"main": f"synthetic-{listing.image}.png" if listing.image is not None else None},
+        }
+        for listing in listings
+    ]}}}
+
+
+def render_bezrealitky(listings: list[Listing]) -> dict:
+    return {"data": {"listAdverts": {"list": [
+        {
+            "uri": f"{listing.id}-nabidka-pronajem-bytu",
+            "imageAltText": listing.title,
+            "address": listing.address,
+            "price": listing.price,
+            "charges": 2500,
+            "mainImage": (
+                {"url": listing.image_url("api.bezrealitky.cz")} if listing.image is not None else None
+            ),
+        }
+        for listing in listings
+    ]}}}
+
+
+def render_bravis(listings: list[Listing]) -> str:
+    items = "".join(
+        f'<div class="item"><a href="/pronajem-bytu/{listing.id}">'
+        f'<picture><img src="{listing.image_url("www.bravis.cz")}"></picture>'
+        f'<ul class="params"><li>bytu {listing.disposition[0]}</li><li>{listing.area} m²</li></ul>'
+        f'<div class="location">{html.escape(listing.address)}</div>'
+        f'<div class="price">{_price_text(listing.price)} <small>+ poplatky</small></div>'
+        f"</a></div>"
+        for listing in listings
+    )
+    return (
+        '<html><body><div id="search"><div class="in"><content>'
+        f'<div class="itemslist">{items}</div></content></div></div></body></html>'
+    )
+
+
+def render_euro_bydleni(listings: list[Listing]) -> str:
+    items = "".join(
+        '<li class="list-items__item">'
+        '<ul class="list-items__item__image__wrap">'
+        f'<li><img src="{listing.image_url("www.eurobydleni.cz").removeprefix("https:")}"></li></ul>'
+        '<div class="list-items__content__1">'
+        f'<h2 class="list-items__item__title"><a href="/detail/{listing.id}/">{listing.title}</a></h2>'
+        f"<ul><li>{_price_text(listing.price)}</li><li>{html.escape(listing.address)}</li></ul>"
+        "</div></li>"
+        for listing in listings
+    )
+    return f'<html><body><div id="properties-box"><ul>{items}</ul></div></body></html>'
+
+
+def render_idnes_reality(listings: list[Listing]) -> str:
+    items = "".join(
+        '<div class="c-products__item">'
+        f'<a class="c-products__link" href="https://reality.idnes.cz/detail/{listing.id}/"></a>'
+        f'<h2 class="c-products__title">{listing.title}</h2>'
+        f'<p class="c-products__info">{html.escape(listing.address)}</p>'
+        f'<p class="c-products__price">{_price_text(listing.price)}</p>'
+        f'<img data-src="{listing.image_url("reality.idnes.cz")}">'
+        "</div>"
+        for listing in listings
+    )
+    return f'<html><body><div id="snippet-s-result-articles">{items}</div></body></html>'
+
+
+def render_realcity(listings: list[Listing]) -> str:
+    items = "".join(
+        '<div class="media advertise item">'
+        f'<div class="pull-left image"><img src="{listing.image_url("www.realcity.cz").removeprefix("https:")}"></div>'
+        '<div class="media-body">'
+        f'<div class="title"><a href="/pronajem/{listing.id}">{listing.title}</a></div>'
+        f'<div class="address">{html.escape(listing.address)}</div>'
+        f'<div class="price">{_price_text(listing.price)}</div>'
+        "</div></div>"
+        for listing in listings
+    )
+    return f'<html><body><div id="rc-advertise-result">{items}</div></body></html>'
+
+
+def render_remax(listings: list[Listing]) -> str:
+    items = "".join(
+        f'<div class="pl-items__item" data-url="/reality/detail/{listing.id}/"'
+        f' data-title="{listing.title}" data-display-address="{html.escape(listing.address)}"'
+        f' data-price="{_price_text(listing.price)}"'
+        f' data-img="{listing.image_url("www.remax-czech.cz")}"></div>'
+        for listing in listings
+    )
+    return (
+        '<html><body><div id="list"><div class="container-fluid">'
+        f'<div class="pl-items">{items}</div></div></div></body></html>'
+    )
+
+
+RENDERERS = {
+    "sreality": render_sreality,
+    "ulov_domov": render_ulov_domov,
+    "realingo": render_realingo,
+    "bezrealitky": render_bezrealitky,
+    "bravis": render_bravis,
+    "euro_bydleni": render_euro_bydleni,
+    "idnes_reality": render_idnes_reality,
+    "realcity": render_realcity,
+    "remax": render_remax,
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def render_image(image_id: int) -> bytes:
+    """Náhodný obrázek 32x32 (různé obrázky mají různé hashe)"""
+    from PIL import Image
+
+    rng = random.Random(image_id)
+    image = Image.new("L", (8, 8))
+    image.putdata([rng.randrange(256) for _ in range(64)])
+
+    output = io.BytesIO()
+    image.resize((32, 32)).save(output, "PNG")
+    return output.getvalue()
+
+
+@functools.cache
+def _compressors() -> dict[str, Callable[[bytes], bytes]]:
+    compressors: dict[str, Callable[[bytes], bytes]] = {}
+    try:
+        import zstandard
+
+        compressors["zstd"] = zstandard.ZstdCompressor(level=3).compress
+    except ImportError:
+        pass
+    try:
+        import brotli
+
+        compressors["br"] = functools.partial(brotli.compress, quality=5)
+    except ImportError:
+        pass
+    compressors["gzip"] = functools.partial(gzip.compress, compresslevel=6)
+    return compressors
+
+
+def compressed_response(request: web.Request, body: bytes, content_type: str) -> web.Response:
+    """Odpověď komprimovaná prvním kódováním, které klient přijímá (zstd, br, gzip)"""
+    accepted = {e.split(";")[0].strip() for e in request.headers.get("Accept-Encoding", "").split(",")}
+    for encoding, compress in _compressors().items():
+        if encoding in accepted:
+            return web.Response(
+                body=compress(body),
+                content_type=content_type,
+                charset="utf-8",
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+    return web.Response(body=body, content_type=content_type, charset="utf-8")
+
+
+def create_app(options: PortalOptions) -> web.Application:
+    generator = ListingGenerator(options)
+
+    async def control_cycle(request: web.Request) -> web.Response:
+        generator.cycle = int(request.query["n"])
+        return web.json_response({"cycle": generator.cycle})
+
+    async def handle(request: web.Request) -> web.Response:
+        if options.delay_ms:
+            await asyncio.sleep(options.delay_ms / 1000)
+
+        host, path = request.match_info["host"], request.match_info["path"]
+
+        if "/img/" in f"/{path}" or path.startswith("static/images/"):
+            match = _IMAGE_RE.search(path)
+            if not match:
+                raise web.HTTPNotFound()
+            return web.Response(body=render_image(int(match.group(1))), content_type="image/png")
+
+        if host not in PORTALS:
+            raise web.HTTPNotFound()
+
+        portal = PORTALS[host]
+        content = RENDERERS[portal](generator.listings(portal))
+        if isinstance(content, str):
+            return compressed_response(request, content.encode(), "text/html")
+        return compressed_response(request, json.dumps(content).encode(), "application/json")
+
+    app = web.Application()
+    app.router.add_post("/_control/cycle", control_cycle)
+    app.router.add_route("*", "/{host}/{path:.*}", handle)
+    return app
+
+
+def serve(port: int, options: PortalOptions):
+    web.run_app(create_app(options), host="127.0.0.1", port=port, print=None)
+
+
+def add_options_arguments(parser: argparse.ArgumentParser):
+    defaults = PortalOptions()
+    parser.add_argument("--volume", type=int, default=defaults.volume, help="offers per portal")
+    parser.add_argument("--new-rate", type=float, default=defaults.new_rate, help="share of new offers per cycle")
+    parser.add_argument("--duplicate-rate", type=float, default=defaults.duplicate_rate, help="share of cross-portal duplicates")
+    parser.add_argument("--image-rate", type=float, default=defaults.image_rate, help="share of offers with an image")
+    parser.add_argument("--delay-ms", type=int, default=defaults.delay_ms, help="artificial response delay")
+
+
+def options_from_args(args: argparse.Namespace) -> PortalOptions:
+    return PortalOptions(
+        volume=args.volume,
+        new_rate=args.new_rate,
+        duplicate_rate=args.duplicate_rate,
+        image_rate=args.image_rate,
+        delay_ms=args.delay_ms,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8080)
+    add_options_arguments(parser)
+    args = parser.parse_args()
+
+    print(f"Serving synthetic portals on http://127.0.0.1:{args.port}/<host>/...")
+    serve(args.port, options_from_args(args))
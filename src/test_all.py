@@ -7,13 +7,13 @@ from config import config
 from transformations import deduplicate_offers, filter_offers
 from scrapers_manager import create_scrapers, fetch_latest_offers
 
-scrapers = create_scrapers(config.dispositions)
-
 
 async def test_fetch_all_offers():
     logging.info("Fetching offers")
     config.min_price = 10000
     config.max_price = 20000
+    # Filtry se do dotazů na servery přebírají při vytvoření scraperů
+    scrapers = create_scrapers(config.dispositions)
 
     try:
         all_offers = await fetch_latest_offers(scrapers)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Kontrola určení ulice a polohy z různých tvarů lokality
+
+Spuštění: `python3 src/test_geocoding.py` nebo `python3 -m pytest src/test_geocoding.py`
+"""
+import logging
+
+from geocoding import BRNO_DISTRICTS, Geocoder, street_key
+from scrapers.rental_offer import RentalOffer
+
+
+def create_offer(location: str, coordinates: tuple[float, float] | None = None) -> RentalOffer:
+    return RentalOffer(
+        scraper=None,
+        link=f"https://example.com/{location}",
+        title="Pronájem bytu 2+kk",
+        location=location,
+        price=15000,
+        image_url=None,
+        coordinates=coordinates,
+    )
+
+
+def test_street_key():
+    assert street_key("Jírova 7, Brno - Líšeň") == "jirova"
+    assert street_key("Brno-Líšeň, Jírova 7") == "jirova"
+    assert street_key("Veveří 12, Brno - Veveří") == "veveri"
+    assert street_key("Pekařská, 602 00 Brno") == "pekarska"
+    assert street_key("Brno, Žabovřesky") is None
+    assert street_key("Brno 2, Líšeň") is None
+    assert street_key("Líšeň, Brno") is None
+    assert street_key("Kounicova") is None
+
+
+def test_district_is_not_learned_as_street():
+    geocoder = Geocoder(":memory:")
+    geocoder.geocode_offers([create_offer("Brno, Žabovřesky", (49.213, 16.577))])
+
+    point = geocoder.geocode_offers([create_offer("Brno, Líšeň")])[0]
+    assert point.source == "district"
+    assert (point.lat, point.lon) == BRNO_DISTRICTS["Líšeň"]
+
+    point = geocoder.geocode_offers([create_offer("Brno-Líšeň, Vlasty Jirové 5")])[0]
+    assert point.source == "district"
+    assert (point.lat, point.lon) == BRNO_DISTRICTS["Líšeň"]
+
+
+def test_street_is_learned():
+    geocoder = Geocoder(":memory:")
+    geocoder.geocode_offers([create_offer("Jírova 7, Brno - Líšeň", (49.21, 16.69))])
+
+    point = geocoder.geocode_offers([create_offer("Brno-Líšeň, Jírova 12")])[0]
+    assert point.source == "street"
+    assert (point.lat, point.lon) == (49.21, 16.69)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - [%(levelname)s] %(message)s")
+
+    test_street_key()
+    test_district_is_not_learned_as_street()
+    test_street_is_learned()
+    logging.info("Geocoding tests passed")
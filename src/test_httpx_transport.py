@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Kontrola převodu odpovědí httpx na `HttpResponse` proti lokálnímu HTTPS serveru
+
+Server s certifikátem podepsaným sám sebou (vytvoří ho `openssl`) vrací komprimované
+tělo se znakovou sadou, přesměrování a opis poslaných cookies a dat. Bez httpx[http2]
+nebo openssl se kontrola přeskočí.
+
+Spuštění: `python3 src/test_httpx_transport.py` nebo `python3 -m pytest src/test_httpx_transport.py`
+"""
+import asyncio
+import gzip
+import logging
+import shutil
+import ssl
+import subprocess
+import tempfile
+from pathlib import Path
+
+from aiohttp import web
+
+from bench_load import free_port
+from http_client import USER_AGENT, HttpxTransport
+
+BODY = "Pronájem bytu 2+kk, Žižkov".encode("windows-1250")
+
+
+def create_ssl_context(directory: Path) -> tuple[ssl.SSLContext, ssl.SSLContext]:
+    """Kontext serveru s novým certifikátem pro 127.0.0.1 a kontext klienta, který mu věří"""
+    cert, key = directory / "cert.pem", directory / "key.pem"
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+            "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+            "-keyout", str(key), "-out", str(cert),
+        ],
+        check=True,
+        capture_output=True,
+    )
+
+    server = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server.load_cert_chain(cert, key)
+    client = ssl.create_default_context(cafile=cert)
+    return server, client
+
+
+def create_app() -> web.Application:
+    async def offers(request: web.Request) -> web.Response:
+        return web.Response(
+            body=gzip.compress(BODY),
+            headers={
+                "Content-Type": "text/plain; charset=windows-1250",
+                "Content-Encoding": "gzip",
+                "ETag": '"v1"',
+            },
+        )
+
+    async def moved(request: web.Request) -> web.Response:
+        raise web.HTTPFound("/offers")
+
+    async def echo(request: web.Request) -> web.Response:
+        return web.json_response({
+            "cookie": request.headers.get("Cookie"),
+            "user_agent": request.headers.get("User-Agent"),
+            "data": (await request.read()).decode(),
+        })
+
+    app = web.Application()
+    app.router.add_get("/offers", offers)
+    app.router.add_get("/moved", moved)
+    app.router.add_post("/echo", echo)
+    return app
+
+
+def missing_requirement() -> str | None:
+    try:
+        HttpxTransport({})
+    except ImportError:
+        return "httpx[http2] is not installed"
+    if shutil.which("openssl") is None:
+        return "openssl is not available"
+    return None
+
+
+def test_httpx_transport():
+    if reason := missing_requirement():
+        logging.warning(f"{reason}, skipping")
+        return
+
+    asyncio.run(check_httpx_transport())
+
+
+async def check_httpx_transport():
+    with tempfile.TemporaryDirectory() as directory:
+        server_context, client_context = create_ssl_context(Path(directory))
+
+        runner = web.AppRunner(create_app())
+        await runner.setup()
+        port = free_port()
+        await web.TCPSite(runner, "127.0.0.1", port, ssl_context=server_context).start()
+        base_url = f"https://127.0.0.1:{port}"
+
+        transport = HttpxTransport({"User-Agent": USER_AGENT}, verify=client_context)
+        try:
+            response = await transport.send("GET", f"{base_url}/offers", None, None, None)
+            assert response.status == 200, response.status
+            assert response.url == f"{base_url}/offers", response.url
+            assert response.body == BODY, "body is not decompressed"
+            assert response.text() == BODY.decode("windows-1250"), response.encoding
+            assert response.wire_size == len(gzip.compress(BODY)), response.wire_size
+            assert response.header("etag") == '"v1"', response.headers
+
+            response = await transport.send("GET", f"{base_url}/moved", None, None, None)
+            assert response.status == 200, "redirect is not followed"
+            assert response.url == f"{base_url}/offers", response.url
+
+            response = await transport.send(
+                "POST", f"{base_url}/echo", b"page=2", {"X-Test": "1"}, {"session": "abc"}
+            )
+            assert response.json() == {
+                "cookie": "session=abc", "user_agent": USER_AGENT, "data": "page=2"
+            }, response.json()
+        finally:
+            await transport.close()
+            await runner.cleanup()
+
+    logging.info("HttpxTransport maps responses correctly")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - [%(levelname)s] %(message)s")
+
+    test_httpx_transport()
@@ -1,55 +1,164 @@
 import asyncio
+import logging
 from io import BytesIO
-
-from aiohttp import ClientSession
-from imagehash import ImageHash, average_hash
-from PIL import Image
+from typing import TYPE_CHECKING, Awaitable, Callable
 
 from config import config
+from fingerprint import deduplicate_by_fingerprint, parse_area
+from http_client import HttpClient, get_http_client
 from scrapers.rental_offer import RentalOffer
+from spatial_filter import SpatialFilter, get_spatial_filter
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from geocoding import GeoPoint
+    from hash_index import HashIndex
+
+
+ImageHashes = tuple[int, ...]
+"""Hashe jednoho obrázku, jedno 64bitové číslo pro každý druh z `config.image_hash_kinds`"""
+
+_hash_history: "HashIndex | None" = None
+"""Hashe obrázků dříve odeslaných nabídek (pokud je zapnuté `image_deduplication_history`)"""
+
+
+def get_hash_kinds() -> list[str]:
+    return [kind.strip() for kind in config.image_hash_kinds.split(",") if kind.strip()]
+
+
+def get_hash_history() -> "np.ndarray | None":
+    """Kopie historie hashů obrázků, matice (počet, druhy)"""
+    return _hash_history.hashes.copy() if _hash_history is not None else None
+
+
+def restore_hash_history(hashes: "np.ndarray"):
+    """Obnoví historii hashů obrázků, např. ze snímku stavu po restartu"""
+    from hash_index import HashIndex
+
+    global _hash_history
+    _hash_history = HashIndex(hashes.shape[1], max(len(hashes), 1024))
+    _hash_history.add(hashes)
+
+
+async def _get_image_hash(
+    client: HttpClient, image_url: str
+) -> ImageHashes | None:
+    # PIL a imagehash se načítají až při prvním použití deduplikace
+    import imagehash
+    from PIL import Image
+
+    from hash_index import HASH_FUNCTIONS, pack_hash
+
+    if not image_url:
+        return None
+
+    response = await client.get(image_url)
+    if response.status > 299:
+        return None
+
+    def compute_hashes() -> ImageHashes:
+        image = Image.open(BytesIO(response.body))
+        return tuple(
+            pack_hash(getattr(imagehash, HASH_FUNCTIONS[kind])(image).hash)
+            for kind in get_hash_kinds()
+        )
+
+    # Dekódování obrázku a výpočet hashů by blokovaly event loop
+    return await asyncio.to_thread(compute_hashes)
 
 
-async def _get_hash(
-    session: ClientSession, offer: RentalOffer
-) -> tuple[RentalOffer, ImageHash | None]:
-    if not offer.image_url:
-        return offer, None
+async def get_image_hashes(
+    offers: list[RentalOffer],
+) -> list[tuple[RentalOffer, ImageHashes | None]]:
+    client = get_http_client()
+    hashes = await asyncio.gather(
+        *[_get_image_hash(client, offer.image_url) for offer in offers]
+    )
 
-    async with session.get(offer.image_url) as response:
-        if response.status > 299:
-            return offer, None
+    return list(zip(offers, hashes))
 
-        data = BytesIO(await response.content.read())
-        image = Image.open(data)
-        return offer, average_hash(image)
 
+def match_duplicates(
+    hashes: list[tuple[RentalOffer, ImageHashes | None]]
+) -> list[RentalOffer]:
+    import numpy as np
 
-async def deduplicate_offers(offers: list[RentalOffer]) -> list[RentalOffer]:
-    hashes: list[tuple[RentalOffer, ImageHash | None]] = []
-    deduplicated: list[tuple[RentalOffer, ImageHash | None]] = []
+    from hash_index import HashIndex, match_matrix
 
-    async with ClientSession() as session:
-        hashes = await asyncio.gather(*[_get_hash(session, offer) for offer in offers])
+    global _hash_history
 
-    for offer, photo_hash in hashes:
-        matched = False
+    kinds = len(get_hash_kinds())
+    threshold = config.image_deduplication_threshold
 
-        for existing_offer, existing_hash in deduplicated:
-            if (
-                existing_hash
-                and photo_hash
-                and existing_hash - photo_hash < config.image_deduplication_threshold
-            ):
-                existing_offer.duplicate_offers.append(offer)
-                matched = True
+    # Řádek v matici hashů pro každou nabídku, která má obrázek
+    rows = {i: row for row, i in enumerate(i for i, (_, h) in enumerate(hashes) if h)}
+    packed = np.array(
+        [h for _, h in hashes if h], dtype=np.uint64
+    ).reshape(len(rows), kinds)
+    within = match_matrix(packed, packed, threshold)
 
-        if not matched:
-            deduplicated.append((offer, photo_hash))
+    use_history = config.image_deduplication_history > 0
+    if use_history:
+        if _hash_history is None or _hash_history.kinds != kinds:
+            _hash_history = HashIndex(kinds)
+        previous = _hash_history.match(packed, threshold)
 
-    return [o for o, _ in deduplicated]
+    deduplicated: list[RentalOffer] = []
+    kept_offers: list[RentalOffer] = []
+    kept_rows: list[int] = []
+
+    for i, (offer, _) in enumerate(hashes):
+        row = rows.get(i)
+
+        if row is None:
+            deduplicated.append(offer)
+            continue
+
+        if use_history and previous[row] >= 0:
+            logging.info(f"Skipping {offer.link}, its image matches an earlier offer")
+            continue
+
+        matches = np.flatnonzero(within[row, kept_rows])
+        for match in matches:
+            kept_offers[match].duplicate_offers.append(offer)
+
+        if not len(matches):
+            deduplicated.append(offer)
+            kept_offers.append(offer)
+            kept_rows.append(row)
+
+    if use_history:
+        _hash_history.add(packed[kept_rows])
+        _hash_history.truncate_oldest(config.image_deduplication_history)
+
+    return deduplicated
+
+
+async def deduplicate_offers(
+    offers: list[RentalOffer],
+    get_hashes: Callable[
+        [list[RentalOffer]], Awaitable[list[tuple[RentalOffer, ImageHashes | None]]]
+    ] = get_image_hashes,
+) -> list[RentalOffer]:
+    if config.metadata_deduplication:
+        offers = deduplicate_by_fingerprint(offers, config.metadata_similarity_threshold)
+
+    if not config.image_deduplication:
+        return offers
+
+    return match_duplicates(await get_hashes(offers))
 
 
 def _filter_offer(offer: RentalOffer) -> bool:
+    area = parse_area(offer.title)
+    if area is not None:
+        if config.min_area and area < config.min_area:
+            return False
+
+        if config.max_area and area > config.max_area:
+            return False
+
     try:
         price = int(offer.price)
     except (TypeError, ValueError):
@@ -64,5 +173,24 @@ def _filter_offer(offer: RentalOffer) -> bool:
     return True
 
 
+def _filter_location(point: "GeoPoint | None", spatial_filter: SpatialFilter) -> bool:
+    if point is None:
+        return config.filter_unknown_location
+
+    return spatial_filter.contains(point.lat, point.lon)
+
+
 def filter_offers(offers: list[RentalOffer]) -> list[RentalOffer]:
-    return [offer for offer in offers if _filter_offer(offer)]
+    offers = [offer for offer in offers if _filter_offer(offer)]
+
+    if spatial_filter := get_spatial_filter():
+        from geocoding import get_geocoder
+
+        points = get_geocoder().geocode_offers(offers)
+        offers = [
+            offer
+            for offer, point in zip(offers, points)
+            if _filter_location(point, spatial_filter)
+        ]
+
+    return offers
@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+CLAIM_TIMEOUT_SECONDS = 60
+"""Po jaké době se úloha zabraná workerem, který ji nedokončil, vrací zpět do fronty"""
+
+
+@dataclass
+class Job:
+    """Úloha ve sdílené frontě"""
+
+    id: int
+    batch: str
+    kind: str
+    payload: dict
+    status: str
+    result: dict | list | None = None
+
+
+class WorkQueue:
+    """Sdílená fronta úloh v SQLite databázi
+
+    Koordinátor do ní vkládá úlohy a libovolný počet workerů (procesů) si je atomicky
+    zabírá a ukládá k nim výsledky.
+    """
+
+    def __init__(self, path: Path | str):
+        self.path = path
+        """Cesta k databázi fronty"""
+
+        self._connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                batch TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                result TEXT,
+                worker TEXT,
+                claimed_at REAL
+            )
+            """
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_batch ON jobs (batch)"
+        )
+
+    def close(self):
+        self._connection.close()
+
+    def enqueue(self, batch: str, kind: str, payloads: list[dict]):
+        """Vloží úlohy do fronty
+
+        Args:
+            batch (str): Identifikátor dávky (jednoho kola stahování)
+            kind (str): Druh úlohy
+            payloads (list[dict]): Data jednotlivých úloh
+        """
+        self._connection.execute("BEGIN")
+        self._connection.executemany(
+            "INSERT INTO jobs (batch, kind, payload) VALUES (?, ?, ?)",
+            [(batch, kind, json.dumps(p)) for p in payloads],
+        )
+        self._connection.execute("COMMIT")
+
+    def claim(self, worker: str) -> Job | None:
+        """Atomicky zabere nejstarší čekající úlohu
+
+        Args:
+            worker (str): Identifikátor workeru
+
+        Returns:
+            Job | None: Zabraná úloha nebo None, pokud je fronta prázdná
+        """
+        now = time.time()
+
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._connection.execute(
+                """
+                SELECT id, batch, kind, payload FROM jobs
+                WHERE status = 'pending' OR (status = 'claimed' AND claimed_at < ?)
+                ORDER BY id LIMIT 1
+                """,
+                (now - CLAIM_TIMEOUT_SECONDS,),
+            ).fetchone()
+
+            if row is None:
+                self._connection.execute("COMMIT")
+                return None
+
+            self._connection.execute(
+                "UPDATE jobs SET status = 'claimed', worker = ?, claimed_at = ? WHERE id = ?",
+                (worker, now, row[0]),
+            )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+        return Job(row[0], row[1], row[2], json.loads(row[3]), "claimed")
+
+    def complete(self, job_id: int, result: dict | list):
+        self._connection.execute(
+            "UPDATE jobs SET status = 'done', result = ? WHERE id = ?",
+            (json.dumps(result), job_id),
+        )
+
+    def fail(self, job_id: int, error: str):
+        self._connection.execute(
+            "UPDATE jobs SET status = 'failed', result = ? WHERE id = ?",
+            (json.dumps({"error": error}), job_id),
+        )
+
+    def unfinished_count(self, batch: str) -> int:
+        return self._connection.execute(
+            "SELECT COUNT(*) FROM jobs WHERE batch = ? AND status IN ('pending', 'claimed')",
+            (batch,),
+        ).fetchone()[0]
+
+    def results(self, batch: str) -> list[Job]:
+        """Vrátí všechny úlohy dávky včetně výsledků (v pořadí vložení)"""
+        rows = self._connection.execute(
+            "SELECT id, batch, kind, payload, status, result FROM jobs WHERE batch = ? ORDER BY id",
+            (batch,),
+        ).fetchall()
+
+        return [
+            Job(r[0], r[1], r[2], json.loads(r[3]), r[4], json.loads(r[5]) if r[5] else None)
+            for r in rows
+        ]
+
+    def delete_batch(self, batch: str):
+        self._connection.execute("DELETE FROM jobs WHERE batch = ?", (batch,))
+
+    def purge(self):
+        """Smaže všechny úlohy (např. nedokončené dávky po pádu koordinátoru)"""
+        self._connection.execute("DELETE FROM jobs")